@@ -0,0 +1,44 @@
+"""cache entries
+
+Revision ID: 3b7c1d2e9a40
+Revises: 626e988788aa
+Create Date: 2025-05-05 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3b7c1d2e9a40"
+down_revision: Union[str, None] = "626e988788aa"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cache_entries",
+        sa.Column("key", sa.Text(), nullable=False),
+        sa.Column(
+            "value", postgresql.JSONB(astext_type=sa.Text()), nullable=False
+        ),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+        prefixes=["UNLOGGED"],
+    )
+    op.create_index(
+        "ix_cache_entries_expires_at",
+        "cache_entries",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_cache_entries_expires_at", table_name="cache_entries")
+    op.drop_table("cache_entries")
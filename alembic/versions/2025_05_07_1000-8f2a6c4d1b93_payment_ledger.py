@@ -0,0 +1,42 @@
+"""payment ledger
+
+Revision ID: 8f2a6c4d1b93
+Revises: 3b7c1d2e9a40
+Create Date: 2025-05-07 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8f2a6c4d1b93"
+down_revision: Union[str, None] = "3b7c1d2e9a40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "payments", sa.Column("comment", sa.String(length=255), nullable=True)
+    )
+    # Rows mirrored from RetailCRM may lack an e-mail or phone.
+    op.alter_column(
+        "customers", "email", existing_type=sa.String(255), nullable=True
+    )
+    op.alter_column(
+        "customers", "phone", existing_type=sa.String(20), nullable=True
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        "customers", "phone", existing_type=sa.String(20), nullable=False
+    )
+    op.alter_column(
+        "customers", "email", existing_type=sa.String(255), nullable=False
+    )
+    op.drop_column("payments", "comment")
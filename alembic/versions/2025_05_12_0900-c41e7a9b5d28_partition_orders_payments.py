@@ -0,0 +1,237 @@
+"""partition orders and payments by month
+
+Revision ID: c41e7a9b5d28
+Revises: 8f2a6c4d1b93
+Create Date: 2025-05-12 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c41e7a9b5d28"
+down_revision: Union[str, None] = "8f2a6c4d1b93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PREMAKE_MONTHS = 3
+
+# Creates one partition per month from the oldest existing row up to
+# PREMAKE_MONTHS ahead; later months are created by app.db.partitions.
+CREATE_MONTHLY_PARTITIONS = """
+DO $$
+DECLARE
+    m date;
+BEGIN
+    FOR m IN
+        SELECT generate_series(
+            date_trunc('month', LEAST(
+                COALESCE((SELECT min({column}) FROM {source}), now()), now()
+            )),
+            date_trunc('month', now()) + interval '{premake} months',
+            interval '1 month'
+        )::date
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF {table} '
+            'FOR VALUES FROM (%L) TO (%L)',
+            '{table}_p' || to_char(m, 'YYYY_MM'),
+            m,
+            (m + interval '1 month')::date
+        );
+    END LOOP;
+END $$
+"""
+
+
+def _monthly_partitions(table: str, column: str, source: str) -> None:
+    op.execute(
+        CREATE_MONTHLY_PARTITIONS.format(
+            table=table, column=column, source=source, premake=PREMAKE_MONTHS
+        )
+    )
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def _payment_columns() -> list:
+    return [
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("order_id", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column(
+            "method",
+            sa.Enum(
+                "CREDIT_CARD",
+                "CASH",
+                "OTHER",
+                name="paymentmethod",
+                native_enum=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "PENDING",
+                "COMPLETED",
+                "FAILED",
+                name="paymentstatus",
+                native_enum=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column(
+            "paid_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("comment", sa.String(length=255), nullable=True),
+        sa.CheckConstraint("amount > 0", name="ck_payments_amount_positive"),
+    ]
+
+
+def upgrade() -> None:
+    # Free the names of the heap tables and their indexes.
+    op.execute(
+        "ALTER TABLE payments DROP CONSTRAINT IF EXISTS payments_order_id_fkey"
+    )
+    op.rename_table("payments", "payments_heap")
+    op.execute("ALTER INDEX payments_pkey RENAME TO payments_heap_pkey")
+    op.drop_index("ix_payments_paid_at", table_name="payments_heap")
+    op.drop_index("ix_payments_order_id", table_name="payments_heap")
+
+    op.rename_table("orders", "orders_heap")
+    op.execute("ALTER INDEX orders_pkey RENAME TO orders_heap_pkey")
+    op.drop_index("ix_orders_created_at", table_name="orders_heap")
+    op.execute(
+        "ALTER TABLE orders_heap DROP CONSTRAINT IF EXISTS "
+        "uq_orders_order_number"
+    )
+    op.execute(
+        "ALTER TABLE orders_heap DROP CONSTRAINT IF EXISTS "
+        "orders_order_number_key"
+    )
+
+    op.create_table(
+        "orders",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("order_number", sa.String(length=50), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("customer_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["customer_id"], ["customers.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id", "created_at"),
+        sa.UniqueConstraint(
+            "order_number", "created_at", name="uq_orders_order_number"
+        ),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_index(
+        "ix_orders_created_at", "orders", ["created_at"], unique=False
+    )
+    _monthly_partitions("orders", "created_at", "orders_heap")
+
+    op.create_table(
+        "payments",
+        *_payment_columns(),
+        sa.PrimaryKeyConstraint("id", "paid_at"),
+        postgresql_partition_by="RANGE (paid_at)",
+    )
+    op.create_index(
+        op.f("ix_payments_order_id"), "payments", ["order_id"], unique=False
+    )
+    op.create_index(
+        "ix_payments_paid_at", "payments", ["paid_at"], unique=False
+    )
+    _monthly_partitions("payments", "paid_at", "payments_heap")
+
+    op.execute(
+        "INSERT INTO orders (id, order_number, created_at, customer_id) "
+        "SELECT id, order_number, created_at, customer_id FROM orders_heap"
+    )
+    op.execute(
+        "INSERT INTO payments "
+        "(id, order_id, amount, method, status, paid_at, comment) "
+        "SELECT id, order_id, amount, method, status, paid_at, comment "
+        "FROM payments_heap"
+    )
+    op.drop_table("payments_heap")
+    op.drop_table("orders_heap")
+
+
+def downgrade() -> None:
+    op.rename_table("payments", "payments_partitioned")
+    op.execute("ALTER INDEX payments_pkey RENAME TO payments_partitioned_pkey")
+    op.drop_index("ix_payments_paid_at", table_name="payments_partitioned")
+    op.drop_index("ix_payments_order_id", table_name="payments_partitioned")
+    op.rename_table("orders", "orders_partitioned")
+    op.execute("ALTER INDEX orders_pkey RENAME TO orders_partitioned_pkey")
+    op.drop_index("ix_orders_created_at", table_name="orders_partitioned")
+    op.execute(
+        "ALTER TABLE orders_partitioned "
+        "DROP CONSTRAINT uq_orders_order_number"
+    )
+
+    op.create_table(
+        "orders",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("order_number", sa.String(length=50), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("customer_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["customer_id"], ["customers.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("order_number", name="uq_orders_order_number"),
+    )
+    op.create_index(
+        "ix_orders_created_at", "orders", ["created_at"], unique=False
+    )
+    op.execute(
+        "INSERT INTO orders (id, order_number, created_at, customer_id) "
+        "SELECT DISTINCT ON (id) id, order_number, created_at, customer_id "
+        "FROM orders_partitioned ORDER BY id, created_at DESC"
+    )
+
+    op.create_table(
+        "payments",
+        *_payment_columns(),
+        sa.ForeignKeyConstraint(
+            ["order_id"], ["orders.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_payments_order_id"), "payments", ["order_id"], unique=False
+    )
+    op.create_index(
+        "ix_payments_paid_at", "payments", ["paid_at"], unique=False
+    )
+    op.execute(
+        "INSERT INTO payments "
+        "(id, order_id, amount, method, status, paid_at, comment) "
+        "SELECT DISTINCT ON (id) "
+        "id, order_id, amount, method, status, paid_at, comment "
+        "FROM payments_partitioned "
+        "WHERE order_id IN (SELECT id FROM orders) "
+        "ORDER BY id, paid_at DESC"
+    )
+    # Dropping the parents drops every attached partition.
+    op.drop_table("payments_partitioned")
+    op.drop_table("orders_partitioned")
@@ -0,0 +1,42 @@
+"""brin time indexes
+
+Revision ID: 5d93e0f7a1c6
+Revises: c41e7a9b5d28
+Create Date: 2025-05-15 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d93e0f7a1c6"
+down_revision: Union[str, None] = "c41e7a9b5d28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows arrive roughly in time order, so BRIN summaries stay tight and the
+    # indexes are a few pages per partition.
+    op.create_index(
+        "ix_orders_created_at_brin",
+        "orders",
+        ["created_at"],
+        unique=False,
+        postgresql_using="brin",
+    )
+    op.create_index(
+        "ix_payments_paid_at_brin",
+        "payments",
+        ["paid_at"],
+        unique=False,
+        postgresql_using="brin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_payments_paid_at_brin", table_name="payments")
+    op.drop_index("ix_orders_created_at_brin", table_name="orders")
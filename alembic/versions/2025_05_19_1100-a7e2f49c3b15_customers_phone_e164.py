@@ -0,0 +1,47 @@
+"""customers phone e164
+
+Revision ID: a7e2f49c3b15
+Revises: 5d93e0f7a1c6
+Create Date: 2025-05-19 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7e2f49c3b15"
+down_revision: Union[str, None] = "5d93e0f7a1c6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "customers",
+        sa.Column("phone_e164", sa.String(length=16), nullable=True),
+    )
+    # Backfill numbers written in international form; the rest are filled in
+    # by the mirror on the next write (app.core.phone.normalize_phone).
+    op.execute(
+        "UPDATE customers SET phone_e164 = s.e164 FROM ("
+        "SELECT id, '+' || regexp_replace("
+        "regexp_replace(phone, '^\\s*00', ''), '\\D', '', 'g') AS e164 "
+        "FROM customers WHERE phone ~ '^\\s*(\\+|00)'"
+        ") AS s "
+        "WHERE customers.id = s.id AND length(s.e164) BETWEEN 9 AND 16"
+    )
+    op.create_index(
+        op.f("ix_customers_phone_e164"),
+        "customers",
+        ["phone_e164"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_customers_phone_e164"), table_name="customers")
+    op.drop_column("customers", "phone_e164")
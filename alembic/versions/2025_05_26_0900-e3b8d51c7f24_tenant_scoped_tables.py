@@ -0,0 +1,132 @@
+"""scope customers, orders and payments by tenant
+
+Revision ID: e3b8d51c7f24
+Revises: a7e2f49c3b15
+Create Date: 2025-05-26 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e3b8d51c7f24"
+down_revision: Union[str, None] = "a7e2f49c3b15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Existing rows belong to the account configured by RETAILCRM_* (the
+# default value of Settings.default_tenant).
+DEFAULT_TENANT = "default"
+
+TABLES = ("customers", "orders", "payments")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        # Constant default: no table rewrite; partitions inherit the column.
+        op.add_column(
+            table,
+            sa.Column(
+                "tenant",
+                sa.String(length=64),
+                nullable=False,
+                server_default=DEFAULT_TENANT,
+            ),
+        )
+        op.alter_column(table, "tenant", server_default=None)
+
+    op.execute(
+        "ALTER TABLE orders DROP CONSTRAINT IF EXISTS orders_customer_id_fkey"
+    )
+
+    op.drop_constraint("customers_pkey", "customers", type_="primary")
+    op.create_primary_key("customers_pkey", "customers", ["tenant", "id"])
+    op.execute(
+        "ALTER TABLE customers DROP CONSTRAINT IF EXISTS customers_phone_key"
+    )
+    op.drop_constraint("uq_customers_phone", "customers", type_="unique")
+    op.create_unique_constraint(
+        "uq_customers_phone", "customers", ["tenant", "phone"]
+    )
+    op.drop_index("ix_customers_email", table_name="customers")
+    op.create_unique_constraint(
+        "uq_customers_email", "customers", ["tenant", "email"]
+    )
+    op.drop_index("ix_customers_phone_e164", table_name="customers")
+    op.create_index(
+        "ix_customers_phone_e164", "customers", ["tenant", "phone_e164"]
+    )
+
+    # On the partitioned parents these cascade to every partition.
+    op.drop_constraint("orders_pkey", "orders", type_="primary")
+    op.create_primary_key(
+        "orders_pkey", "orders", ["tenant", "id", "created_at"]
+    )
+    op.drop_constraint("uq_orders_order_number", "orders", type_="unique")
+    op.create_unique_constraint(
+        "uq_orders_order_number",
+        "orders",
+        ["tenant", "order_number", "created_at"],
+    )
+    op.create_foreign_key(
+        "fk_orders_customer",
+        "orders",
+        "customers",
+        ["tenant", "customer_id"],
+        ["tenant", "id"],
+        ondelete="CASCADE",
+    )
+
+    op.drop_constraint("payments_pkey", "payments", type_="primary")
+    op.create_primary_key(
+        "payments_pkey", "payments", ["tenant", "id", "paid_at"]
+    )
+    op.drop_index("ix_payments_order_id", table_name="payments")
+    op.create_index("ix_payments_order_id", "payments", ["tenant", "order_id"])
+
+
+def downgrade() -> None:
+    # Ids of different accounts may collide; only the default one survives.
+    for table in ("payments", "orders", "customers"):
+        op.execute(
+            sa.text(f"DELETE FROM {table} WHERE tenant <> :tenant").bindparams(
+                tenant=DEFAULT_TENANT
+            )
+        )
+
+    op.drop_index("ix_payments_order_id", table_name="payments")
+    op.create_index("ix_payments_order_id", "payments", ["order_id"])
+    op.drop_constraint("payments_pkey", "payments", type_="primary")
+    op.create_primary_key("payments_pkey", "payments", ["id", "paid_at"])
+
+    op.drop_constraint("fk_orders_customer", "orders", type_="foreignkey")
+    op.drop_constraint("uq_orders_order_number", "orders", type_="unique")
+    op.create_unique_constraint(
+        "uq_orders_order_number", "orders", ["order_number", "created_at"]
+    )
+    op.drop_constraint("orders_pkey", "orders", type_="primary")
+    op.create_primary_key("orders_pkey", "orders", ["id", "created_at"])
+
+    op.drop_index("ix_customers_phone_e164", table_name="customers")
+    op.create_index("ix_customers_phone_e164", "customers", ["phone_e164"])
+    op.drop_constraint("uq_customers_email", "customers", type_="unique")
+    op.create_index("ix_customers_email", "customers", ["email"], unique=True)
+    op.drop_constraint("uq_customers_phone", "customers", type_="unique")
+    op.create_unique_constraint("uq_customers_phone", "customers", ["phone"])
+    op.drop_constraint("customers_pkey", "customers", type_="primary")
+    op.create_primary_key("customers_pkey", "customers", ["id"])
+
+    op.create_foreign_key(
+        "orders_customer_id_fkey",
+        "orders",
+        "customers",
+        ["customer_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    for table in TABLES:
+        op.drop_column(table, "tenant")
@@ -0,0 +1,42 @@
+"""catalog offers
+
+Revision ID: 6c1f0a8e2d47
+Revises: e3b8d51c7f24
+Create Date: 2025-06-02 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6c1f0a8e2d47"
+down_revision: Union[str, None] = "e3b8d51c7f24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "catalog_offers",
+        sa.Column("tenant", sa.String(length=64), nullable=False),
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("sku", sa.String(length=100), nullable=True),
+        sa.Column("price", sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column("active", sa.Boolean(), nullable=False),
+        sa.Column("synced_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("tenant", "id"),
+    )
+    op.create_index(
+        "ix_catalog_offers_sku", "catalog_offers", ["tenant", "sku"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_catalog_offers_sku", table_name="catalog_offers")
+    op.drop_table("catalog_offers")
@@ -0,0 +1,109 @@
+"""change events log and triggers
+
+Revision ID: b5e1c9d2f38a
+Revises: 6c1f0a8e2d47
+Create Date: 2025-06-09 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b5e1c9d2f38a"
+down_revision: Union[str, None] = "6c1f0a8e2d47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = {"customers": "customer", "orders": "order", "payments": "payment"}
+
+# Logs the change and announces it on the `change_events` channel; the
+# notification is delivered when (and only if) the transaction commits.
+# Updates that change nothing (e.g. a mirror upsert of an unchanged row)
+# are not logged.
+LOG_CHANGE_EVENT = """
+CREATE FUNCTION log_change_event() RETURNS trigger AS $$
+DECLARE
+    changed record;
+    event change_events%ROWTYPE;
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD IS NOT DISTINCT FROM NEW THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        changed := OLD;
+    ELSE
+        changed := NEW;
+    END IF;
+    INSERT INTO change_events (tenant, entity, entity_id, action)
+    VALUES (
+        changed.tenant,
+        TG_ARGV[0],
+        changed.id,
+        CASE TG_OP
+            WHEN 'INSERT' THEN 'created'
+            WHEN 'UPDATE' THEN 'updated'
+            ELSE 'deleted'
+        END
+    )
+    RETURNING * INTO event;
+    PERFORM pg_notify(
+        'change_events',
+        json_build_object(
+            'id', event.id,
+            'tenant', event.tenant,
+            'entity', event.entity,
+            'entityId', event.entity_id,
+            'action', event.action,
+            'occurredAt', event.occurred_at
+        )::text
+    );
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "change_events",
+        sa.Column("id", sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column("tenant", sa.String(length=64), nullable=False),
+        sa.Column("entity", sa.String(length=16), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("action", sa.String(length=16), nullable=False),
+        sa.Column(
+            "occurred_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_change_events_tenant_id", "change_events", ["tenant", "id"]
+    )
+    op.create_index(
+        "ix_change_events_occurred_at", "change_events", ["occurred_at"]
+    )
+    op.execute(LOG_CHANGE_EVENT)
+    for table, entity in TABLES.items():
+        # Row triggers on the partitioned tables apply to every partition,
+        # including the ones app.db.partitions creates later.
+        op.execute(
+            f"CREATE TRIGGER {table}_change_events "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION log_change_event('{entity}')"
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_change_events ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS log_change_event()")
+    op.drop_index("ix_change_events_occurred_at", table_name="change_events")
+    op.drop_index("ix_change_events_tenant_id", table_name="change_events")
+    op.drop_table("change_events")
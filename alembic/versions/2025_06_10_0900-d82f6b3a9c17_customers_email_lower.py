@@ -0,0 +1,32 @@
+"""customers lower(email) index
+
+Revision ID: d82f6b3a9c17
+Revises: b5e1c9d2f38a
+Create Date: 2025-06-10 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d82f6b3a9c17"
+down_revision: Union[str, None] = "b5e1c9d2f38a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves the case-insensitive e-mail lookup.
+    op.create_index(
+        "ix_customers_email_lower",
+        "customers",
+        ["tenant", sa.text("lower(email)")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_customers_email_lower", table_name="customers")
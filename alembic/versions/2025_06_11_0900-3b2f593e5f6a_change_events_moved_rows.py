@@ -0,0 +1,117 @@
+"""change events: rows moved between partitions
+
+Revision ID: 3b2f593e5f6a
+Revises: d82f6b3a9c17
+Create Date: 2025-06-11 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3b2f593e5f6a"
+down_revision: Union[str, None] = "d82f6b3a9c17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# As in b5e1c9d2f38a, except while `change_events.moving` is on (see
+# app.db.partitions.moving_rows): rows are then only moving between
+# partitions, so deletes are not logged and inserts are logged as updates.
+LOG_CHANGE_EVENT = """
+CREATE OR REPLACE FUNCTION log_change_event() RETURNS trigger AS $$
+DECLARE
+    moving boolean := current_setting('change_events.moving', true) = 'on';
+    changed record;
+    event change_events%ROWTYPE;
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD IS NOT DISTINCT FROM NEW THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        IF moving THEN
+            RETURN NULL;
+        END IF;
+        changed := OLD;
+    ELSE
+        changed := NEW;
+    END IF;
+    INSERT INTO change_events (tenant, entity, entity_id, action)
+    VALUES (
+        changed.tenant,
+        TG_ARGV[0],
+        changed.id,
+        CASE
+            WHEN TG_OP = 'INSERT' AND NOT moving THEN 'created'
+            WHEN TG_OP = 'DELETE' THEN 'deleted'
+            ELSE 'updated'
+        END
+    )
+    RETURNING * INTO event;
+    PERFORM pg_notify(
+        'change_events',
+        json_build_object(
+            'id', event.id,
+            'tenant', event.tenant,
+            'entity', event.entity,
+            'entityId', event.entity_id,
+            'action', event.action,
+            'occurredAt', event.occurred_at
+        )::text
+    );
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+PREVIOUS_LOG_CHANGE_EVENT = """
+CREATE OR REPLACE FUNCTION log_change_event() RETURNS trigger AS $$
+DECLARE
+    changed record;
+    event change_events%ROWTYPE;
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD IS NOT DISTINCT FROM NEW THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        changed := OLD;
+    ELSE
+        changed := NEW;
+    END IF;
+    INSERT INTO change_events (tenant, entity, entity_id, action)
+    VALUES (
+        changed.tenant,
+        TG_ARGV[0],
+        changed.id,
+        CASE TG_OP
+            WHEN 'INSERT' THEN 'created'
+            WHEN 'UPDATE' THEN 'updated'
+            ELSE 'deleted'
+        END
+    )
+    RETURNING * INTO event;
+    PERFORM pg_notify(
+        'change_events',
+        json_build_object(
+            'id', event.id,
+            'tenant', event.tenant,
+            'entity', event.entity,
+            'entityId', event.entity_id,
+            'action', event.action,
+            'occurredAt', event.occurred_at
+        )::text
+    );
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    op.execute(LOG_CHANGE_EVENT)
+
+
+def downgrade() -> None:
+    op.execute(PREVIOUS_LOG_CHANGE_EVENT)
@@ -1,9 +1,16 @@
 from fastapi import APIRouter
 
-from app.core.config import settings
+from .analytics import router as analytics_router
+from .catalog import router as catalog_router
 from .customers import router as customers_router
+from .debug import router as debug_router
+from .events import router as events_router
 from .orders import router as orders_router
 
-api_router = APIRouter(prefix=settings.api_prefix)
+api_router = APIRouter()
 api_router.include_router(customers_router)
 api_router.include_router(orders_router)
+api_router.include_router(analytics_router)
+api_router.include_router(catalog_router)
+api_router.include_router(events_router)
+api_router.include_router(debug_router)
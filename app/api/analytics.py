@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import get_cache
+from app.db.session import get_db
+from app.schemas.analytics import (
+    AverageOrderValue,
+    Granularity,
+    PaymentBreakdown,
+    RevenueReport,
+)
+from app.services.analytics_service import AnalyticsService, period_start
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+def get_analytics_service(
+    session: AsyncSession = Depends(get_db),
+) -> AnalyticsService:
+    return AnalyticsService(session, get_cache())
+
+
+def _naive(moment: Optional[datetime]) -> Optional[datetime]:
+    # Local tables store naive timestamps; compare like with like.
+    if moment is not None and moment.tzinfo is not None:
+        return moment.astimezone().replace(tzinfo=None)
+    return moment
+
+
+def date_range(
+    date_from: Optional[datetime] = Query(
+        None,
+        description="Range start, inclusive (default: start of the day 30 days "
+        "before the end).",
+    ),
+    date_to: Optional[datetime] = Query(
+        None, description="Range end, exclusive (default: now)."
+    ),
+) -> Tuple[datetime, datetime]:
+    date_to = _naive(date_to) or datetime.now()
+    # Day-aligned, so that default windows share cached closed periods.
+    date_from = _naive(date_from) or period_start(
+        date_to - timedelta(days=30), Granularity.DAY
+    )
+    if date_from >= date_to:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST, detail="date_from must be before date_to"
+        )
+    return date_from, date_to
+
+
+@router.get("/revenue", response_model=RevenueReport)
+async def revenue(
+    granularity: Granularity = Granularity.DAY,
+    period: Tuple[datetime, datetime] = Depends(date_range),
+    service: AnalyticsService = Depends(get_analytics_service),
+) -> RevenueReport:
+    try:
+        return await service.revenue(granularity, *period)
+    except Exception as exc:
+        raise HTTPException(
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal error while computing revenue: {exc}",
+        )
+
+
+@router.get("/payments", response_model=PaymentBreakdown)
+async def payment_breakdown(
+    period: Tuple[datetime, datetime] = Depends(date_range),
+    service: AnalyticsService = Depends(get_analytics_service),
+) -> PaymentBreakdown:
+    try:
+        return await service.payment_breakdown(*period)
+    except Exception as exc:
+        raise HTTPException(
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal error while computing payment breakdown: {exc}",
+        )
+
+
+@router.get("/average-order-value", response_model=AverageOrderValue)
+async def average_order_value(
+    period: Tuple[datetime, datetime] = Depends(date_range),
+    service: AnalyticsService = Depends(get_analytics_service),
+) -> AverageOrderValue:
+    try:
+        return await service.average_order_value(*period)
+    except Exception as exc:
+        raise HTTPException(
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal error while computing average order value: {exc}",
+        )
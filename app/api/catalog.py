@@ -0,0 +1,53 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+
+from app.schemas.base import trusted
+from app.schemas.catalog import OfferRead
+from app.services.catalog import CatalogIndex, Offer
+
+router = APIRouter(prefix="/catalog", tags=["catalog"])
+
+
+async def get_catalog(request: Request) -> CatalogIndex:
+    try:
+        return await request.app.state.catalogs.get()
+    except Exception as exc:
+        raise HTTPException(
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal error while loading the catalog: {exc}",
+        )
+
+
+def _offer_read(offer: Offer) -> OfferRead:
+    return trusted(OfferRead, **offer._asdict())
+
+
+@router.get("/offers", response_model=List[OfferRead])
+async def search_offers(
+    q: Optional[str] = Query(None, min_length=1, description="Name prefix"),
+    sku: Optional[str] = Query(None, min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    catalog: CatalogIndex = Depends(get_catalog),
+) -> List[OfferRead]:
+    """
+    Offers of the local catalog by exact SKU or by name prefix.
+    """
+    if sku is not None:
+        offer = catalog.get_by_sku(sku)
+        return [_offer_read(offer)] if offer is not None else []
+    if q is None:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST, detail="Either q or sku is required"
+        )
+    return [_offer_read(offer) for offer in catalog.search(q, limit)]
+
+
+@router.get("/offers/{offer_id}", response_model=OfferRead)
+async def get_offer(
+    offer_id: int, catalog: CatalogIndex = Depends(get_catalog)
+) -> OfferRead:
+    offer = catalog.get(offer_id)
+    if offer is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Offer not found")
+    return _offer_read(offer)
@@ -1,32 +1,55 @@
-from typing import List
+from typing import FrozenSet, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from httpx import HTTPError
+from pydantic import EmailStr, TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.schemas.customers import CustomerRead, CustomerCreate, CustomerFilter
+from app.api.deps import get_crm_client, sparse_fields
+from app.api.responses import conditional_json
+from app.cache import get_cache
+from app.core.config import settings
+from app.db.database import db
+from app.db.session import get_db
+from app.schemas.customers import (
+    CustomerCreate,
+    CustomerFilter,
+    CustomerQuery,
+    CustomerRead,
+)
+from app.services.customer_export import CustomerExport, ExportFormat
+from app.services.customer_lists import etag_key, normalize_filter
 from app.services.customer_service import CustomerService
 from app.services.retailcrm_client import RetailCRMClient
 
 router = APIRouter(prefix="/customers", tags=["customers"])
 
-
-def get_crm_client() -> RetailCRMClient:
-    return RetailCRMClient()
+customer_list_adapter = TypeAdapter(List[CustomerRead])
 
 
 def get_customer_service(
     crm: RetailCRMClient = Depends(get_crm_client),
+    session: AsyncSession = Depends(get_db),
 ) -> CustomerService:
-    return CustomerService(crm)
+    return CustomerService(crm, session, get_cache())
 
 
 @router.get("/", response_model=List[CustomerRead])
 async def list_customers(
+    request: Request,
     filters: CustomerFilter = Depends(),
+    fields: Optional[FrozenSet[str]] = Depends(sparse_fields(CustomerRead)),
     service: CustomerService = Depends(get_customer_service),
-) -> List[CustomerRead]:
+) -> Response:
     try:
-        return await service.list(filters)
+        return await conditional_json(
+            request,
+            etag_key(normalize_filter(filters)),
+            customer_list_adapter,
+            lambda: service.list(filters),
+            fields,
+        )
     except HTTPError as exc:
         raise HTTPException(
             status.HTTP_502_BAD_GATEWAY,
@@ -39,13 +62,59 @@ async def list_customers(
         )
 
 
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"text/csv": {}, "application/x-ndjson": {}},
+            "description": "Every matching local customer, in id order.",
+        }
+    },
+)
+async def export_customers(
+    filters: CustomerQuery = Depends(),
+    format: ExportFormat = Query(ExportFormat.CSV, description="csv or ndjson"),
+) -> StreamingResponse:
+    export = CustomerExport(db, filters, format, settings.export_batch_size)
+    return StreamingResponse(
+        export.chunks(),
+        media_type=format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{export.filename}"'},
+    )
+
+
+@router.get("/lookup", response_model=CustomerRead)
+async def lookup_customer(
+    email: Optional[EmailStr] = Query(None, description="Exact e-mail match."),
+    phone: Optional[str] = Query(
+        None, description="Phone in any format; matched on its E.164 form."
+    ),
+    service: CustomerService = Depends(get_customer_service),
+) -> CustomerRead:
+    if (email is None) == (phone is None):
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST,
+            detail="Provide exactly one of 'email' or 'phone'",
+        )
+    try:
+        return await service.lookup(email=email, phone=phone)
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal error while looking up customer: {exc}",
+        )
+
+
 @router.post("/", response_model=CustomerRead, status_code=status.HTTP_201_CREATED)
 async def create_customer(
     payload: CustomerCreate,
     service: CustomerService = Depends(get_customer_service),
 ) -> CustomerRead:
     try:
-        return await service.create(payload)
+        customer = await service.create(payload)
     except HTTPError as exc:
         raise HTTPException(
             status.HTTP_502_BAD_GATEWAY,
@@ -56,3 +125,4 @@ async def create_customer(
             status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal error while creating customer: {exc}",
         )
+    return customer
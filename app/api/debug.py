@@ -0,0 +1,196 @@
+import asyncio
+import os
+import tracemalloc
+from typing import List, Optional, Union
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import PlainTextResponse
+
+from app.api.deps import require_debug_token
+from app.core import deadline
+from app.core.profiler import (
+    ProfilerBusy,
+    collapsed,
+    memory_tracer,
+    sampling_profiler,
+)
+from app.db.database import db
+from app.db.profiling import QueryProfiler
+from app.schemas.debug import (
+    AllocationSite,
+    MemoryGrouping,
+    MemoryReport,
+    QueryOrder,
+    QueryProfile,
+    QueryStats,
+)
+
+router = APIRouter(
+    prefix="/debug",
+    tags=["debug"],
+    include_in_schema=False,
+    dependencies=[Depends(require_debug_token)],
+)
+
+
+def get_profiler() -> QueryProfiler:
+    if db.profiler is None:
+        raise HTTPException(
+            status.HTTP_404_NOT_FOUND, detail="Query profiling is disabled"
+        )
+    return db.profiler
+
+
+@router.get("/queries", response_model=QueryProfile)
+async def top_queries(
+    limit: int = Query(20, ge=1, le=500),
+    order_by: QueryOrder = Query(QueryOrder.TOTAL, alias="orderBy"),
+    profiler: QueryProfiler = Depends(get_profiler),
+) -> QueryProfile:
+    """
+    Top statements of the worker that answers, by total/mean/max time or calls.
+    """
+    return QueryProfile(
+        pid=os.getpid(),
+        slow_threshold_seconds=profiler.slow_threshold,
+        statements=[
+            QueryStats(
+                statement=s.statement,
+                calls=s.calls,
+                total_seconds=s.total,
+                mean_seconds=s.mean,
+                max_seconds=s.max,
+                rows=s.rows,
+                plan=s.plan,
+            )
+            for s in profiler.top(limit, order_by.value)
+        ],
+    )
+
+
+@router.delete("/queries", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_queries(profiler: QueryProfiler = Depends(get_profiler)) -> Response:
+    profiler.reset()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def cpu_profile(
+    seconds: float = Query(5.0, gt=0, le=60),
+    interval: float = Query(0.005, ge=0.001, le=1.0),
+) -> PlainTextResponse:
+    """
+    Sample the answering worker's event loop for `seconds` and return the
+    stacks in collapsed format (one `frame;frame;... count` line per stack).
+
+    The profile is cut short to fit the request deadline; send a larger
+    `X-Request-Timeout` for long profiles.
+    """
+    left = deadline.remaining()
+    if left is not None:
+        seconds = max(min(seconds, left - 0.5), interval)
+    try:
+        counts = await sampling_profiler.profile(seconds, interval)
+    except ProfilerBusy as exc:
+        raise HTTPException(status.HTTP_409_CONFLICT, detail=str(exc))
+    return PlainTextResponse(
+        collapsed(counts),
+        headers={
+            "X-Profile-Seconds": f"{seconds:g}",
+            "X-Profile-Pid": str(os.getpid()),
+        },
+    )
+
+
+def _site(
+    stat: Union[tracemalloc.Statistic, tracemalloc.StatisticDiff],
+    group_by: MemoryGrouping,
+) -> str:
+    if group_by is MemoryGrouping.TRACEBACK:
+        return "\n".join(stat.traceback.format())
+    if group_by is MemoryGrouping.FILENAME:
+        return stat.traceback[0].filename
+    return str(stat.traceback[0])
+
+
+def _memory_report(sites: Optional[List[AllocationSite]] = None) -> MemoryReport:
+    traced, peak = memory_tracer.usage()
+    return MemoryReport(
+        pid=os.getpid(),
+        tracing=memory_tracer.tracing,
+        traced_bytes=traced,
+        peak_bytes=peak,
+        sites=sites or [],
+    )
+
+
+def require_tracing() -> None:
+    if not memory_tracer.tracing:
+        raise HTTPException(
+            status.HTTP_409_CONFLICT,
+            detail="Memory tracing is off; POST /debug/memory starts it",
+        )
+
+
+@router.post("/memory", response_model=MemoryReport)
+async def start_memory_tracing(
+    frames: int = Query(1, ge=1, le=50, description="Frames kept per allocation."),
+) -> MemoryReport:
+    """
+    Start tracing allocations in the answering worker and take the baseline.
+    """
+    await asyncio.to_thread(memory_tracer.start, frames)
+    return _memory_report()
+
+
+@router.get(
+    "/memory", response_model=MemoryReport, dependencies=[Depends(require_tracing)]
+)
+async def memory_top(
+    limit: int = Query(20, ge=1, le=500),
+    group_by: MemoryGrouping = Query(MemoryGrouping.LINENO, alias="groupBy"),
+) -> MemoryReport:
+    """
+    Allocation sites holding the most memory right now.
+    """
+    stats = await asyncio.to_thread(memory_tracer.top, group_by.value, limit)
+    return _memory_report(
+        [
+            AllocationSite(site=_site(s, group_by), size_bytes=s.size, count=s.count)
+            for s in stats
+        ]
+    )
+
+
+@router.get(
+    "/memory/diff",
+    response_model=MemoryReport,
+    dependencies=[Depends(require_tracing)],
+)
+async def memory_diff(
+    limit: int = Query(20, ge=1, le=500),
+    group_by: MemoryGrouping = Query(MemoryGrouping.LINENO, alias="groupBy"),
+    rebase: bool = Query(False, description="Make this snapshot the new baseline."),
+) -> MemoryReport:
+    """
+    Allocation sites by growth since the baseline.
+    """
+    stats = await asyncio.to_thread(memory_tracer.diff, group_by.value, limit, rebase)
+    return _memory_report(
+        [
+            AllocationSite(
+                site=_site(s, group_by),
+                size_bytes=s.size,
+                count=s.count,
+                size_diff_bytes=s.size_diff,
+                count_diff=s.count_diff,
+            )
+            for s in stats
+        ]
+    )
+
+
+@router.delete("/memory", status_code=status.HTTP_204_NO_CONTENT)
+async def stop_memory_tracing() -> Response:
+    memory_tracer.stop()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,66 @@
+import secrets
+from typing import Callable, Dict, FrozenSet, Optional, Type
+
+from fastapi import Header, HTTPException, Query, Request, status
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.tenant import current_tenant
+from app.services.retailcrm_client import RetailCRMClient
+
+
+def get_crm_client(request: Request) -> RetailCRMClient:
+    """
+    The worker's RetailCRM client of the request's tenant.
+    """
+    return request.app.state.crm_clients.get(current_tenant())
+
+
+def sparse_fields(
+    model: Type[BaseModel],
+) -> Callable[[Optional[str]], Optional[FrozenSet[str]]]:
+    """
+    Dependency parsing `?fields=a,b` into field names of `model`.
+
+    Both aliases (`registeredAt`) and field names (`registered_at`) are
+    accepted; None means all fields.
+    """
+    names: Dict[str, str] = {}
+    for name, info in model.model_fields.items():
+        names[name] = name
+        names[info.alias or name] = name
+    described = ", ".join(info.alias or n for n, info in model.model_fields.items())
+
+    def dependency(
+        fields: Optional[str] = Query(
+            None, description=f"Comma-separated subset of: {described}."
+        ),
+    ) -> Optional[FrozenSet[str]]:
+        if fields is None:
+            return None
+        requested = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = sorted(requested - names.keys())
+        if unknown or not requested:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail=(
+                    f"Unknown fields: {', '.join(unknown)}"
+                    if unknown
+                    else "fields must name at least one field"
+                ),
+            )
+        return frozenset(names[f] for f in requested)
+
+    return dependency
+
+
+def require_debug_token(x_debug_token: Optional[str] = Header(None)) -> None:
+    """
+    Guard for /debug endpoints: hidden unless DEBUG_TOKEN is configured.
+    """
+    if not settings.debug_token:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_debug_token or not secrets.compare_digest(
+        x_debug_token, settings.debug_token
+    ):
+        raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Invalid debug token")
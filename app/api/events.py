@@ -0,0 +1,73 @@
+from typing import AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.tenant import current_tenant
+from app.schemas.events import EventEntity, EventRead
+from app.services.events import EventBroker
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+KEEPALIVE = b": keepalive\n\n"
+
+
+def _sse(event: EventRead) -> bytes:
+    return (
+        f"id: {event.id}\n"
+        f"event: {event.entity.value}.{event.action}\n"
+        f"data: {event.model_dump_json(by_alias=True)}\n\n"
+    ).encode()
+
+
+async def _stream(events: AsyncIterator[Optional[EventRead]]) -> AsyncIterator[bytes]:
+    # Sent at once so that proxies and clients see the stream open.
+    yield KEEPALIVE
+    async for event in events:
+        yield KEEPALIVE if event is None else _sse(event)
+
+
+@router.get(
+    "/",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"text/event-stream": {}},
+            "description": "Server-Sent Events: `id` is the event id, `event` is "
+            "`<entity>.<action>`, `data` is an `EventRead` object.",
+        }
+    },
+)
+async def stream_events(
+    request: Request,
+    entity: Optional[List[EventEntity]] = Query(
+        None, description="Only these entities (repeatable); all by default."
+    ),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    after: Optional[int] = Query(
+        None, description="Resume after this event id (as Last-Event-ID)."
+    ),
+) -> StreamingResponse:
+    """
+    Change feed of customers, orders and payments of the tenant.
+    """
+    if last_event_id is not None:
+        try:
+            after = int(last_event_id)
+        except ValueError:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST, detail="Invalid Last-Event-ID"
+            )
+    broker: EventBroker = request.app.state.events
+    events = broker.events(
+        current_tenant(),
+        frozenset(entity or ()),
+        after,
+        heartbeat=settings.events_heartbeat,
+    )
+    return StreamingResponse(
+        _stream(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
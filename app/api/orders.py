@@ -1,40 +1,57 @@
-from typing import List
+from typing import FrozenSet, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from httpx import HTTPError
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_crm_client, sparse_fields
+from app.api.responses import conditional_json, invalidate_etag
 from app.schemas.orders import OrderRead, OrderCreate
-from app.schemas.payments import PaymentRead, PaymentCreate
+from app.db.session import get_db
+from app.schemas.payments import OrderPayments, PaymentRead, PaymentCreate
 from app.services.order_service import OrderService
 from app.services.payment_service import PaymentService
 from app.services.retailcrm_client import RetailCRMClient
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
-
-def get_crm_client() -> RetailCRMClient:
-    return RetailCRMClient()
+order_list_adapter = TypeAdapter(List[OrderRead])
 
 
 def get_order_service(
+    request: Request,
     crm: RetailCRMClient = Depends(get_crm_client),
 ) -> OrderService:
-    return OrderService(crm)
+    return OrderService(crm, request.app.state.catalogs)
 
 
 def get_payment_service(
     crm: RetailCRMClient = Depends(get_crm_client),
+    session: AsyncSession = Depends(get_db),
 ) -> PaymentService:
-    return PaymentService(crm)
+    return PaymentService(crm, session)
 
 
 @router.get("/customer/{customer_id}", response_model=List[OrderRead])
 async def list_orders_for_client(
+    request: Request,
     customer_id: int,
+    fields: Optional[FrozenSet[str]] = Depends(sparse_fields(OrderRead)),
     service: OrderService = Depends(get_order_service),
-) -> List[OrderRead]:
+) -> Response:
+    # Only set by the lifespan.
+    prewarmer = getattr(request.app.state, "prewarmer", None)
+    if prewarmer is not None:
+        prewarmer.record(customer_id)
     try:
-        return await service.list_by_customer(customer_id)
+        return await conditional_json(
+            request,
+            f"orders:customer:{customer_id}",
+            order_list_adapter,
+            lambda: service.list_by_customer(customer_id, fields=fields),
+            fields,
+        )
     except HTTPError as exc:
         raise HTTPException(
             status.HTTP_502_BAD_GATEWAY,
@@ -53,7 +70,7 @@ async def create_order(
     service: OrderService = Depends(get_order_service),
 ) -> OrderRead:
     try:
-        return await service.create(payload)
+        order = await service.create(payload)
     except HTTPError as exc:
         raise HTTPException(
             status.HTTP_502_BAD_GATEWAY,
@@ -66,6 +83,8 @@ async def create_order(
             status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal error while creating order: {exc}",
         )
+    await invalidate_etag(f"orders:customer:{order.customer_id}")
+    return order
 
 
 @router.post(
@@ -92,3 +111,17 @@ async def create_payment(
             status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal error while creating payment: {exc}",
         )
+
+
+@router.get("/{order_id}/payments", response_model=OrderPayments)
+async def list_payments(
+    order_id: int,
+    service: PaymentService = Depends(get_payment_service),
+) -> OrderPayments:
+    try:
+        return await service.list_by_order(order_id)
+    except Exception as exc:
+        raise HTTPException(
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal error while listing payments: {exc}",
+        )
@@ -0,0 +1,140 @@
+import hashlib
+from typing import AbstractSet, Any, Awaitable, Callable, Optional
+
+from fastapi import Request, Response, status
+from pydantic import TypeAdapter
+
+from app.cache import CacheBackend, get_cache
+from app.core.config import settings
+from app.core.negotiation import negotiate
+from app.core.tenant import current_tenant
+
+try:
+    import msgpack
+except ImportError:  # optional: JSON only
+    msgpack = None
+
+ETAG_PREFIX = "etag:"
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+# Offered in order of preference; the first is the default.
+MEDIA_TYPES = (JSON, MSGPACK, "application/x-msgpack") if msgpack else (JSON,)
+
+
+def response_media_type(request: Request) -> str:
+    """
+    `application/json` or, when asked for in `Accept` and `msgpack` is
+    installed, `application/msgpack`.
+    """
+    chosen = negotiate(request.headers.get("accept"), MEDIA_TYPES)
+    return JSON if chosen in (None, JSON) else MSGPACK
+
+
+def encode_body(
+    adapter: TypeAdapter,
+    value: Any,
+    media_type: str,
+    include: Any = None,
+) -> bytes:
+    """
+    `value` serialized straight from its models, as JSON or MessagePack.
+
+    MessagePack carries the same values as the JSON body (date-times and
+    decimals as strings), just binary-encoded.
+    """
+    if media_type == MSGPACK:
+        return msgpack.packb(
+            adapter.dump_python(value, mode="json", by_alias=True, include=include)
+        )
+    return adapter.dump_json(value, by_alias=True, include=include)
+
+
+def compute_etag(body: bytes) -> str:
+    """
+    Strong ETag derived from the serialized response body.
+    """
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"},
+    )
+
+
+async def invalidate_etags(
+    key_prefix: str, tenant: Optional[str] = None, cache: Optional[CacheBackend] = None
+) -> None:
+    tenant = tenant or current_tenant()
+    cache = cache if cache is not None else get_cache()
+    await cache.delete_prefix(f"{ETAG_PREFIX}{tenant}:{key_prefix}")
+
+
+async def invalidate_etag(key: str) -> None:
+    """
+    Drop the ETags remembered for exactly `key`, in all of its `fields` and
+    media type variants (unlike `invalidate_etags("<key>")`, which also
+    drops those of every key `key` is a prefix of).
+    """
+    cache = get_cache()
+    await cache.delete(f"{ETAG_PREFIX}{current_tenant()}:{key}")
+    await invalidate_etags(f"{key}:", cache=cache)
+
+
+async def conditional_json(
+    request: Request,
+    key: str,
+    adapter: TypeAdapter,
+    produce: Callable[[], Awaitable[Any]],
+    fields: Optional[AbstractSet[str]] = None,
+) -> Response:
+    """
+    Serve `produce()` as JSON (or MessagePack, see `response_media_type`)
+    with a strong ETag and `If-None-Match` support.
+
+    The last ETag served for `key` (scoped to the current tenant) is
+    remembered for `etag_ttl` seconds (and dropped by `invalidate_etags` on
+    writes). While it is remembered, a client presenting it gets a 304
+    without the upstream call or serialization.
+
+    `fields` trims every element of a list response to those fields.
+    """
+    cache = get_cache()
+    cache_key = f"{ETAG_PREFIX}{current_tenant()}:{key}"
+    if fields is not None:
+        cache_key = f"{cache_key}:fields={','.join(sorted(fields))}"
+    media_type = response_media_type(request)
+    if media_type != JSON:
+        cache_key = f"{cache_key}:{media_type}"
+
+    known = await cache.get(cache_key)
+    if known is not None and etag_matches(request, known):
+        return not_modified(known)
+
+    body = encode_body(
+        adapter,
+        await produce(),
+        media_type,
+        include={"__all__": set(fields)} if fields is not None else None,
+    )
+    etag = compute_etag(body)
+    await cache.set(cache_key, etag, settings.etag_ttl)
+
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return Response(
+        content=body,
+        media_type=media_type,
+        headers={"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"},
+    )
@@ -0,0 +1,39 @@
+from typing import Optional
+
+from .base import CacheBackend
+from .memory import MemoryCache
+from .postgres import PostgresCache
+from .tiered import TieredCache
+
+_cache: Optional[CacheBackend] = None
+
+
+def build_cache() -> CacheBackend:
+    from app.core.config import settings
+    from app.db.database import db
+
+    l1 = MemoryCache(
+        max_entries=settings.cache_l1_max_entries,
+        max_bytes=settings.cache_l1_max_bytes,
+    )
+    if not settings.cache_l2_enabled:
+        return l1
+    return TieredCache(
+        l1,
+        PostgresCache(
+            db,
+            purge_interval=settings.cache_l2_purge_interval,
+            listen_check_interval=settings.db_listen_check_interval,
+        ),
+        l1_ttl=settings.cache_l1_ttl,
+    )
+
+
+def get_cache() -> CacheBackend:
+    """
+    Process-wide cache shared by all requests of a worker.
+    """
+    global _cache
+    if _cache is None:
+        _cache = build_cache()
+    return _cache
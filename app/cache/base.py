@@ -0,0 +1,33 @@
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+
+class CacheBackend(ABC):
+    """
+    Async key/value cache interface.
+
+    Values must be JSON-serialisable so that every tier, including the shared
+    Postgres one, can store them.
+    """
+
+    async def start(self) -> None:
+        """
+        Acquire background resources (listeners, purge tasks).
+        """
+
+    async def stop(self) -> None:
+        """
+        Release resources acquired by `start`.
+        """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str) -> None: ...
@@ -0,0 +1,133 @@
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Set, Tuple
+
+from app.core.metrics import registry
+
+from .base import CacheBackend
+
+memory_cache_bytes = registry.gauge(
+    "memory_cache_bytes", "Bytes held by byte-budgeted in-process caches."
+)
+memory_cache_entries = registry.gauge(
+    "memory_cache_entries", "Entries held by byte-budgeted in-process caches."
+)
+memory_cache_evictions = registry.counter(
+    "memory_cache_evictions_total", "Entries evicted to stay within the budget."
+)
+
+# Shared immutable singletons are owned by the interpreter, not by an entry.
+_UNOWNED = (type(None), bool, type(...))
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    Bytes of `obj` and everything it references, each object counted once.
+
+    Interned strings and small ints shared with the rest of the process are
+    counted as well, so the figure is an upper bound of what eviction frees.
+    """
+    if seen is None:
+        seen = set()
+    if isinstance(obj, _UNOWNED) or id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_sizeof(key, seen) + deep_sizeof(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_sizeof(item, seen)
+    else:
+        for slot in getattr(type(obj), "__slots__", ()):
+            size += deep_sizeof(getattr(obj, slot, None), seen)
+        if hasattr(obj, "__dict__"):
+            size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU cache with per-entry TTL (L1 tier).
+
+    Bounded by entry count and, with `max_bytes`, by the `deep_sizeof` of
+    the stored values; the least recently used entries go first.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_bytes: Optional[int] = None,
+        name: str = "l1",
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.name = name
+        self.bytes = 0
+        self._data: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _publish(self) -> None:
+        if self.max_bytes is not None:
+            memory_cache_bytes.set(self.bytes, cache=self.name)
+            memory_cache_entries.set(len(self._data), cache=self.name)
+
+    def _pop(self, key: str) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def get_nowait(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._pop(key)
+            self._publish()
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set_nowait(self, key: str, value: Any, ttl: float) -> None:
+        size = 0
+        if self.max_bytes is not None:
+            size = deep_sizeof(key) + deep_sizeof(value)
+            if size > self.max_bytes:
+                return
+        self._pop(key)
+        self._data[key] = (time.monotonic() + ttl, value, size)
+        self.bytes += size
+        while len(self._data) > self.max_entries or (
+            self.max_bytes is not None and self.bytes > self.max_bytes
+        ):
+            _, (_, _, evicted) = self._data.popitem(last=False)
+            self.bytes -= evicted
+            if self.max_bytes is not None:
+                memory_cache_evictions.inc(cache=self.name)
+        self._publish()
+
+    def delete_nowait(self, key: str) -> None:
+        self._pop(key)
+        self._publish()
+
+    def delete_prefix_nowait(self, prefix: str) -> None:
+        for key in [k for k in self._data if k.startswith(prefix)]:
+            self._pop(key)
+        self._publish()
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self.get_nowait(key)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self.set_nowait(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        self.delete_nowait(key)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        self.delete_prefix_nowait(prefix)
@@ -0,0 +1,134 @@
+import asyncio
+import contextlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db.database import Database
+from app.db.listener import Listener
+from app.db.models import CacheEntry
+
+from .base import CacheBackend
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = "cache_invalidate"
+PREFIX_MARKER = "*"
+
+
+def _escape_like(prefix: str) -> str:
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class PostgresCache(CacheBackend):
+    """
+    Cross-worker cache tier stored in the UNLOGGED `cache_entries` table.
+
+    Deletions are broadcast with `NOTIFY cache_invalidate`; every worker keeps
+    one `LISTEN` connection and forwards the payload (a key, or a prefix
+    followed by `*`) to `on_invalidate` so local tiers can drop stale copies.
+    Notices may have been missed when that connection had to be replaced, so
+    `on_invalidate` is then passed `*` (every key).
+    Database errors are logged and treated as cache misses.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        purge_interval: float = 60.0,
+        on_invalidate: Optional[Callable[[str], None]] = None,
+        listen_check_interval: float = 30.0,
+    ) -> None:
+        self._db = database
+        self._purge_interval = purge_interval
+        self.on_invalidate = on_invalidate
+        self._listener = Listener(
+            database,
+            INVALIDATE_CHANNEL,
+            self._on_notify,
+            check_interval=listen_check_interval,
+            on_reconnect=lambda: self._on_notify(PREFIX_MARKER),
+        )
+        self._purger: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        await self._listener.start()
+        self._purger = asyncio.create_task(self._purge_periodically())
+
+    async def stop(self) -> None:
+        if self._purger is not None:
+            self._purger.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._purger
+            self._purger = None
+        await self._listener.stop()
+
+    def _on_notify(self, payload: str) -> None:
+        if self.on_invalidate is not None:
+            self.on_invalidate(payload)
+
+    async def _purge_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._purge_interval)
+            try:
+                async with self._db.engine.begin() as conn:
+                    await conn.execute(
+                        delete(CacheEntry).where(CacheEntry.expires_at <= func.now())
+                    )
+            except Exception:
+                logger.exception("Failed to purge expired cache entries")
+
+    async def get_with_ttl(self, key: str) -> Optional[tuple[Any, float]]:
+        """
+        Return `(value, remaining_ttl)` or None on a miss.
+        """
+        stmt = select(CacheEntry.value, CacheEntry.expires_at).where(
+            CacheEntry.key == key, CacheEntry.expires_at > func.now()
+        )
+        try:
+            async with self._db.engine.connect() as conn:
+                row = (await conn.execute(stmt)).first()
+        except Exception:
+            logger.exception("Shared cache read failed for %s", key)
+            return None
+        if row is None:
+            return None
+        remaining = (row.expires_at - datetime.now(timezone.utc)).total_seconds()
+        return row.value, max(remaining, 0.0)
+
+    async def get(self, key: str) -> Optional[Any]:
+        hit = await self.get_with_ttl(key)
+        return hit[0] if hit else None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl)
+        stmt = insert(CacheEntry).values(key=key, value=value, expires_at=expires_at)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CacheEntry.key],
+            set_={"value": stmt.excluded.value, "expires_at": stmt.excluded.expires_at},
+        )
+        try:
+            async with self._db.engine.begin() as conn:
+                await conn.execute(stmt)
+        except Exception:
+            logger.exception("Shared cache write failed for %s", key)
+
+    async def _delete(self, where, payload: str) -> None:
+        try:
+            async with self._db.engine.begin() as conn:
+                await conn.execute(delete(CacheEntry).where(where))
+                await conn.execute(select(func.pg_notify(INVALIDATE_CHANNEL, payload)))
+        except Exception:
+            logger.exception("Shared cache invalidation failed for %s", payload)
+
+    async def delete(self, key: str) -> None:
+        await self._delete(CacheEntry.key == key, key)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        await self._delete(
+            CacheEntry.key.like(f"{_escape_like(prefix)}%", escape="\\"),
+            f"{prefix}{PREFIX_MARKER}",
+        )
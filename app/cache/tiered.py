@@ -0,0 +1,59 @@
+from typing import Any, List, Optional
+
+from .base import CacheBackend
+from .memory import MemoryCache
+from .postgres import PREFIX_MARKER, PostgresCache
+
+
+class TieredCache(CacheBackend):
+    """
+    L1 in-process LRU in front of the shared L2 Postgres tier.
+
+    L1 entries never outlive the L2 entry they were copied from, and L2
+    invalidation notices from other workers evict the matching L1 entries,
+    as well as those of `followers` (other in-process stores keyed by the
+    shared keys they were derived from).
+    """
+
+    def __init__(self, l1: MemoryCache, l2: PostgresCache, l1_ttl: float) -> None:
+        self.l1 = l1
+        self.l2 = l2
+        self.l1_ttl = l1_ttl
+        self.followers: List[MemoryCache] = []
+        l2.on_invalidate = self._on_remote_invalidate
+
+    def _on_remote_invalidate(self, payload: str) -> None:
+        for cache in (self.l1, *self.followers):
+            if payload.endswith(PREFIX_MARKER):
+                cache.delete_prefix_nowait(payload[: -len(PREFIX_MARKER)])
+            else:
+                cache.delete_nowait(payload)
+
+    async def start(self) -> None:
+        await self.l2.start()
+
+    async def stop(self) -> None:
+        await self.l2.stop()
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.l1.get_nowait(key)
+        if value is not None:
+            return value
+        hit = await self.l2.get_with_ttl(key)
+        if hit is None:
+            return None
+        value, remaining = hit
+        self.l1.set_nowait(key, value, min(self.l1_ttl, remaining))
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self.l1.set_nowait(key, value, min(self.l1_ttl, ttl))
+        await self.l2.set(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        self.l1.delete_nowait(key)
+        await self.l2.delete(key)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        self.l1.delete_prefix_nowait(prefix)
+        await self.l2.delete_prefix(prefix)
@@ -0,0 +1,241 @@
+import argparse
+import os
+import shutil
+from typing import List, Optional
+
+
+def default_workers() -> int:
+    return max(1, os.cpu_count() or 1)
+
+
+def serve(args: argparse.Namespace) -> None:
+    """
+    Run the pre-forked production server.
+
+    uvicorn's supervisor forks the workers, restarts any that die and, on
+    SIGTERM, stops accepting connections and lets in-flight requests drain for
+    up to `graceful_shutdown_timeout` seconds before exiting.
+    """
+    import uvicorn
+
+    from app.core.config import settings
+
+    workers = args.workers or settings.web_concurrency or default_workers()
+
+    shutil.rmtree(settings.metrics_dir, ignore_errors=True)
+    os.makedirs(settings.metrics_dir, exist_ok=True)
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host or settings.host,
+        port=args.port or settings.port,
+        workers=workers,
+        timeout_graceful_shutdown=settings.graceful_shutdown_timeout,
+        proxy_headers=True,
+        access_log=False,
+    )
+
+
+def migrate(args: argparse.Namespace) -> None:
+    """
+    Apply Alembic migrations once and exit.
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    command.upgrade(Config(args.config), args.revision)
+
+
+def partitions(args: argparse.Namespace) -> None:
+    """
+    Create upcoming monthly partitions and apply the retention policy.
+    """
+    import asyncio
+
+    from app.core.config import settings
+    from app.db.database import db
+    from app.db.partitions import maintain
+
+    async def run() -> None:
+        try:
+            report = await maintain(
+                db,
+                months_ahead=args.months_ahead or settings.partition_premake_months,
+                retention_months=(
+                    args.retention_months
+                    if args.retention_months is not None
+                    else settings.partition_retention_months
+                ),
+                drop=args.drop or settings.partition_retention_drop,
+            )
+        finally:
+            await db.dispose()
+        for table, changes in report.items():
+            print(
+                f"{table}: created {changes['created'] or '-'}, "
+                f"removed {changes['removed'] or '-'}"
+            )
+
+    asyncio.run(run())
+
+
+def reconcile(args: argparse.Namespace) -> None:
+    """
+    Compare local orders/payments with RetailCRM and repair the drift.
+    """
+    import asyncio
+
+    from app.cache.memory import MemoryCache
+    from app.core.config import settings
+    from app.core.tenant import use_tenant
+    from app.db.database import db
+    from app.services.reconciliation import Reconciler, format_report
+    from app.services.retailcrm_client import RetailCRMClients
+
+    tenants = args.tenant or list(settings.tenant_configs)
+
+    async def run() -> None:
+        # Pages are always fetched fresh; a process-local cache is enough.
+        clients = RetailCRMClients(MemoryCache(settings.cache_l1_max_entries))
+        try:
+            for tenant in tenants:
+                with use_tenant(tenant):
+                    report = await Reconciler(
+                        clients.get(tenant),
+                        db,
+                        page_size=args.page_size or settings.reconcile_page_size,
+                        concurrency=args.concurrency or settings.reconcile_concurrency,
+                        dry_run=args.dry_run,
+                    ).run()
+                print(f"[{tenant}]")
+                print("\n".join(format_report(report)))
+        finally:
+            await clients.aclose()
+            await db.dispose()
+
+    asyncio.run(run())
+
+
+def sync_catalog(args: argparse.Namespace) -> None:
+    """
+    Copy the RetailCRM product catalog into the local `catalog_offers` table.
+    """
+    import asyncio
+
+    from app.cache.memory import MemoryCache
+    from app.core.config import settings
+    from app.core.tenant import use_tenant
+    from app.db.database import db
+    from app.services.catalog import CatalogSync
+    from app.services.retailcrm_client import RetailCRMClients
+
+    tenants = args.tenant or list(settings.tenant_configs)
+
+    async def run() -> None:
+        clients = RetailCRMClients(MemoryCache(settings.cache_l1_max_entries))
+        try:
+            for tenant in tenants:
+                with use_tenant(tenant):
+                    report = await CatalogSync(
+                        clients.get(tenant),
+                        db,
+                        page_size=settings.catalog_page_size,
+                        concurrency=(
+                            args.concurrency or settings.catalog_sync_concurrency
+                        ),
+                    ).run()
+                print(
+                    f"[{tenant}] {report.offers} offers from {report.pages} pages "
+                    f"in {report.elapsed:.1f}s, removed {report.removed}"
+                )
+                if report.failed_pages:
+                    print(
+                        f"[{tenant}] failed pages (stale offers kept): "
+                        f"{', '.join(map(str, sorted(report.failed_pages)))}"
+                    )
+        finally:
+            await clients.aclose()
+            await db.dispose()
+
+    asyncio.run(run())
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_serve = sub.add_parser("serve", help="Run the multi-process API server.")
+    p_serve.add_argument("--host", default=None)
+    p_serve.add_argument("--port", type=int, default=None)
+    p_serve.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: WEB_CONCURRENCY or CPU count).",
+    )
+    p_serve.set_defaults(func=serve)
+
+    p_migrate = sub.add_parser("migrate", help="Run database migrations.")
+    p_migrate.add_argument("--config", default="alembic.ini")
+    p_migrate.add_argument("--revision", default="head")
+    p_migrate.set_defaults(func=migrate)
+
+    p_part = sub.add_parser(
+        "partitions", help="Maintain monthly partitions of orders/payments."
+    )
+    p_part.add_argument("--months-ahead", type=int, default=None)
+    p_part.add_argument(
+        "--retention-months",
+        type=int,
+        default=None,
+        help="Detach partitions older than this many months.",
+    )
+    p_part.add_argument(
+        "--drop", action="store_true", help="Drop partitions instead of detaching."
+    )
+    p_part.set_defaults(func=partitions)
+
+    p_rec = sub.add_parser(
+        "reconcile", help="Detect and repair drift against RetailCRM orders."
+    )
+    p_rec.add_argument("--page-size", type=int, default=None, choices=(20, 50, 100))
+    p_rec.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Pages compared in parallel (default: RECONCILE_CONCURRENCY).",
+    )
+    p_rec.add_argument(
+        "--tenant",
+        action="append",
+        default=None,
+        help="Tenant to reconcile (repeatable; default: all configured).",
+    )
+    p_rec.add_argument(
+        "--dry-run", action="store_true", help="Report the drift without repairing."
+    )
+    p_rec.set_defaults(func=reconcile)
+
+    p_cat = sub.add_parser(
+        "sync-catalog", help="Copy the RetailCRM product catalog locally."
+    )
+    p_cat.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Pages fetched in parallel (default: CATALOG_SYNC_CONCURRENCY).",
+    )
+    p_cat.add_argument(
+        "--tenant",
+        action="append",
+        default=None,
+        help="Tenant to sync (repeatable; default: all configured).",
+    )
+    p_cat.set_defaults(func=sync_catalog)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    args.func(args)
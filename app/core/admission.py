@@ -0,0 +1,196 @@
+import asyncio
+import heapq
+import itertools
+import json
+import re
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from fastapi import status
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core import deadline
+from app.core.config import AdmissionGroup
+from app.core.metrics import registry
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+admission_in_flight = registry.gauge(
+    "admission_in_flight", "Requests admitted and being served, by route group."
+)
+admission_queue_depth = registry.gauge(
+    "admission_queue_depth", "Requests waiting for admission, by route group."
+)
+admission_shed = registry.counter(
+    "admission_shed_total", "Requests rejected with 503, by route group and reason."
+)
+
+
+class Overloaded(Exception):
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdmissionQueue:
+    """
+    Concurrency limit with a bounded wait queue.
+
+    Up to `limit` holders run at once; up to `queue_size` more wait, lower
+    `priority` values first, for at most `queue_timeout` seconds (or what is
+    left of the request deadline). A full queue rejects newcomers unless they
+    outrank the lowest-priority waiter, which is rejected instead. Rejection
+    raises `Overloaded` with the reason (`queue_full`, `evicted`, `timeout`).
+    """
+
+    def __init__(
+        self, name: str, limit: int, queue_size: int, queue_timeout: float
+    ) -> None:
+        self.name = name
+        self.limit = max(1, limit)
+        self.queue_size = max(0, queue_size)
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _publish(self) -> None:
+        admission_in_flight.set(self._active, group=self.name)
+        admission_queue_depth.set(len(self._waiters), group=self.name)
+
+    def _discard(self, entry: Tuple[int, int, asyncio.Future]) -> None:
+        try:
+            self._waiters.remove(entry)
+        except ValueError:
+            return
+        heapq.heapify(self._waiters)
+
+    async def acquire(self, priority: int = 1) -> None:
+        if self._active < self.limit and not self._waiters:
+            self._active += 1
+            self._publish()
+            return
+        if len(self._waiters) >= self.queue_size:
+            worst = max(self._waiters, default=None)
+            if worst is None or worst[0] <= priority:
+                raise Overloaded("queue_full")
+            self._discard(worst)
+            worst[2].set_exception(Overloaded("evicted"))
+
+        fut = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._seq), fut)
+        heapq.heappush(self._waiters, entry)
+        self._publish()
+
+        wait = self.queue_timeout
+        left = deadline.remaining()
+        if left is not None:
+            wait = min(wait, max(left, 0.0))
+        try:
+            await asyncio.wait_for(fut, wait)
+        except BaseException as exc:
+            if fut.done() and not fut.cancelled() and fut.exception() is None:
+                # The slot was handed over just as the wait was abandoned.
+                self.release()
+            else:
+                self._discard(entry)
+                self._publish()
+            if isinstance(exc, asyncio.TimeoutError):
+                raise Overloaded("timeout") from None
+            raise
+
+    def release(self) -> None:
+        # The slot passes straight to the next waiter, if any.
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)
+                self._publish()
+                return
+        self._active -= 1
+        self._publish()
+
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI middleware limiting concurrent requests per route group.
+
+    Each group matches API paths (without `api_prefix`) by regex, first match
+    wins; unmatched paths are not limited. With `prioritize_writes`, waiting
+    POST/PUT/PATCH/DELETE requests are admitted before waiting reads. Shed
+    requests get a 503 with `Retry-After` right away instead of piling up
+    behind a slow upstream.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        groups: Dict[str, AdmissionGroup],
+        api_prefix: str,
+        prioritize_writes: bool = True,
+    ) -> None:
+        self.app = app
+        self.api_prefix = api_prefix
+        self.prioritize_writes = prioritize_writes
+        self.groups: List[Tuple[Pattern[str], AdmissionQueue, AdmissionGroup]] = [
+            (
+                re.compile(group.pattern),
+                AdmissionQueue(name, group.limit, group.queue, group.queue_timeout),
+                group,
+            )
+            for name, group in groups.items()
+        ]
+
+    def _match(
+        self, path: str
+    ) -> Optional[Tuple[Pattern[str], AdmissionQueue, AdmissionGroup]]:
+        if not path.startswith(self.api_prefix):
+            return None
+        path = path[len(self.api_prefix) :]
+        return next((g for g in self.groups if g[0].match(path)), None)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        matched = self._match(scope["path"])
+        if matched is None:
+            await self.app(scope, receive, send)
+            return
+
+        _, queue, group = matched
+        write = scope["method"] in WRITE_METHODS
+        priority = 0 if write and self.prioritize_writes else 1
+        try:
+            await queue.acquire(priority)
+        except Overloaded as exc:
+            admission_shed.inc(group=queue.name, reason=exc.reason)
+            await self._send_overloaded(send, group.retry_after)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            queue.release()
+
+    @staticmethod
+    async def _send_overloaded(send: Send, retry_after: int) -> None:
+        body = json.dumps({"detail": "Server is overloaded, retry later"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status.HTTP_503_SERVICE_UNAVAILABLE,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(retry_after).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,142 @@
+import zlib
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.negotiation import negotiate
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/msgpack",
+    "application/problem+json",
+)
+
+
+class _Gzip:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(
+            zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        )
+
+
+class _Brotli:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.process(data)
+        return out + (self._compressor.finish() if final else self._compressor.flush())
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing response bodies with brotli (when the
+    `brotli` package is installed) or gzip, as negotiated by
+    `Accept-Encoding`.
+
+    Complete bodies are compressed when at least `minimum_size` bytes.
+    Streamed bodies are compressed chunk by chunk, each flushed as it is
+    sent, so the client can decode every chunk as soon as it arrives (an SSE
+    event, an export batch). Bodies of other content types, already encoded
+    bodies and bodiless statuses pass through; ETags of compressed responses
+    are made weak, as the bytes differ per encoding.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings: List[str] = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+    def _compressor(self, encoding: str):
+        if encoding == "br":
+            return _Brotli(self.brotli_quality)
+        return _Gzip(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                if start is not None:
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers = Headers(raw=start["headers"])
+                if (
+                    start["status"] in (204, 304)
+                    or "content-encoding" in headers
+                    or not headers.get("content-type", "").startswith(
+                        COMPRESSIBLE_TYPES
+                    )
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+                compressor = self._compressor(encoding)
+                body = compressor.chunk(body, final=not more_body)
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag is not None and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+                await send(start)
+                start = None
+                await send({**message, "body": body})
+                return
+
+            if body or not more_body:
+                body = compressor.chunk(body, final=not more_body)
+                await send({**message, "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+        if start is not None:
+            await send(start)
@@ -1,6 +1,37 @@
+from functools import cached_property, lru_cache
+from typing import Dict
+
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class TenantConfig(BaseModel):
+    """
+    One RetailCRM account / site served by this deployment.
+    """
+
+    api_key: str
+    base_url: str
+    site: str
+    # requests per second (per worker) and burst size towards this account
+    rate_limit: float = 10.0
+    rate_burst: int = 10
+
+
+class AdmissionGroup(BaseModel):
+    """
+    Per-worker concurrency limit of the API routes matching `pattern`.
+    """
+
+    # regex matched against the path without API_PREFIX
+    pattern: str
+    limit: int = 32
+    # requests allowed to wait, and for how long (seconds) before a 503
+    queue: int = 64
+    queue_timeout: float = 2.0
+    retry_after: int = 1
+
+
 class Settings(BaseSettings):
     """
     Application-wide settings.
@@ -11,6 +42,41 @@ class Settings(BaseSettings):
     project_name: str = "Test Task: RetailCRM App"
     debug: bool = False
 
+    # server
+    host: str = "0.0.0.0"
+    port: int = 8000
+    web_concurrency: int | None = None
+    graceful_shutdown_timeout: int = 30
+
+    # metrics
+    metrics_dir: str = "/tmp/retailcrm-metrics"
+    metrics_flush_interval: float = 5.0
+
+    # request deadlines (seconds); ROUTE_TIMEOUTS maps path prefixes to a
+    # budget, <= 0 meaning no deadline for that route
+    request_timeout: float = 15.0
+    request_timeout_max: float = 60.0
+    route_timeouts: Dict[str, float] = {}
+
+    # admission control: ADMISSION_GROUPS (JSON) replaces the groups below;
+    # the first group whose pattern matches a path applies
+    admission_enabled: bool = True
+    admission_prioritize_writes: bool = True
+    admission_groups: Dict[str, AdmissionGroup] = {
+        # a feed stream holds its slot while open, so this caps subscribers
+        "events": AdmissionGroup(pattern=r"^/events", limit=500, queue=0),
+        "exports": AdmissionGroup(pattern=r"^/customers/export", limit=2, queue=0),
+        "customers": AdmissionGroup(pattern=r"^/customers"),
+        "payments": AdmissionGroup(pattern=r"^/orders/\d+/payments", limit=16),
+        "orders": AdmissionGroup(pattern=r"^/orders"),
+    }
+
+    # event-loop health
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval: float = 0.25
+    loop_slow_callback_threshold: float = 0.1
+    loop_task_accounting: bool = True
+
     # db
     postgres_user: str
     postgres_password: str
@@ -18,11 +84,93 @@ class Settings(BaseSettings):
     postgres_host: str
     postgres_port: int
     db_echo: bool = False
+    db_profile_enabled: bool = True
+    db_slow_query_threshold: float = 0.2
+    db_profile_max_statements: int = 500
+    # re-run slow read-only statements under EXPLAIN (ANALYZE, BUFFERS)
+    db_explain_slow_queries: bool = False
+    # seconds between health checks of the LISTEN connections (change feed,
+    # cache invalidation); lost ones are replaced
+    db_listen_check_interval: float = 30.0
+
+    # debug endpoints (/debug/...) are only served when a token is set
+    debug_token: str | None = None
+    # validate models built from local rows instead of trusting them
+    validate_trusted_models: bool = False
+
+    # partitioning of orders / payments
+    partition_premake_months: int = 3
+    partition_retention_months: int | None = None
+    partition_retention_drop: bool = False
+    partition_maintenance_interval: float = 6 * 3600.0
+
+    # phone numbers without an international prefix are assumed to be from here
+    default_phone_country_code: str | None = None
+
+    # cache
+    cache_l1_max_entries: int = 10_000
+    cache_l1_ttl: float = 10.0
+    # byte budget of the L1 tier (deep size of keys and values)
+    cache_l1_max_bytes: int | None = 64 * 1024 * 1024
+    # byte budget of the per-worker store of mapped orders
+    order_store_max_bytes: int = 32 * 1024 * 1024
+    cache_l2_enabled: bool = True
+    cache_l2_purge_interval: float = 60.0
+    etag_ttl: float = 30.0
+    customer_list_cache_ttl: float = 60.0
+
+    # pre-warming of the hottest customers' orders; the interval should stay
+    # below RETAILCRM_CACHE_TTL so their entries never expire
+    prewarm_enabled: bool = True
+    prewarm_top_k: int = 50
+    prewarm_interval: float = 20.0
+    prewarm_budget_share: float = 0.2
+    prewarm_sketch_width: int = 4096
+    prewarm_sketch_depth: int = 4
+    analytics_closed_period_ttl: float = 24 * 3600.0
+
+    # rows fetched from the server-side cursor (and written) per export chunk
+    export_batch_size: int = 2000
+
+    # response compression (brotli needs the optional `brotli` package)
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+
+    # change feed (GET /events)
+    events_retention: float = 24 * 3600.0
+    events_purge_interval: float = 300.0
+    events_queue_size: int = 1000
+    events_heartbeat: float = 15.0
+    events_replay_batch: int = 500
+    # ids before Last-Event-ID replayed again, for transactions that
+    # committed after later events had been delivered
+    events_replay_margin: int = 1000
 
     # RetailCRM
     retailcrm_api_key: str
     retailcrm_base_url: str
     retailcrm_site: str
+    retailcrm_timeout: float = 10.0
+    retailcrm_cache_ttl: float = 30.0
+    retailcrm_reference_cache_ttl: float = 3600.0
+    retailcrm_rate_limit: float = 10.0
+    retailcrm_rate_burst: int = 10
+
+    # tenants: the RETAILCRM_* account above is `default_tenant`; TENANTS adds
+    # more as JSON, e.g. {"eu": {"api_key": "...", "base_url": "...", "site": "eu"}}
+    default_tenant: str = "default"
+    tenants: Dict[str, TenantConfig] = {}
+
+    # reconciliation of the local mirror against RetailCRM
+    reconcile_page_size: int = 100
+    reconcile_concurrency: int = 4
+
+    # local product catalog (`python -m app sync-catalog`)
+    catalog_page_size: int = 100
+    catalog_sync_concurrency: int = 4
+    catalog_refresh_interval: float = 60.0
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -40,4 +188,31 @@ class Settings(BaseSettings):
             f"{self.postgres_port}/{self.postgres_db}"
         )
 
-settings = Settings()
+    @cached_property
+    def tenant_configs(self) -> Dict[str, TenantConfig]:
+        default = TenantConfig(
+            api_key=self.retailcrm_api_key,
+            base_url=self.retailcrm_base_url,
+            site=self.retailcrm_site,
+            rate_limit=self.retailcrm_rate_limit,
+            rate_burst=self.retailcrm_rate_burst,
+        )
+        return {self.default_tenant: default, **self.tenants}
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
+
+
+class _LazySettings:
+    """
+    Module-level `settings` that reads the environment on first attribute
+    access, so importing a module does not require a complete environment.
+    """
+
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+
+settings: Settings = _LazySettings()  # type: ignore[assignment]
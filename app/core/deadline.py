@@ -0,0 +1,176 @@
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Dict, Iterator, Optional, TypeVar
+
+from fastapi import HTTPException, status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import registry
+
+T = TypeVar("T")
+
+TIMEOUT_HEADER = b"x-request-timeout"
+
+# Absolute `time.monotonic()` by which the current request must be answered.
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+deadline_exceeded = registry.counter(
+    "http_request_deadline_exceeded_total", "Requests answered 504 by deadline."
+)
+
+
+class DeadlineExceeded(HTTPException):
+    def __init__(self, detail: str = "Request deadline exceeded") -> None:
+        super().__init__(status.HTTP_504_GATEWAY_TIMEOUT, detail=detail)
+
+
+def remaining() -> Optional[float]:
+    """
+    Seconds left for the current request, or None outside of a deadline.
+    """
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def timeout(default: float) -> float:
+    """
+    Timeout for one call: `default`, capped by what is left of the deadline.
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded()
+    return min(default, left)
+
+
+@contextmanager
+def unbounded() -> Iterator[None]:
+    """
+    Run a block outside of any deadline (work shared by several requests).
+    """
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+async def bounded(aw: Awaitable[T]) -> T:
+    """
+    Await `aw`, giving up with `DeadlineExceeded` when the deadline passes.
+    """
+    left = remaining()
+    if left is None:
+        return await aw
+    try:
+        return await asyncio.wait_for(aw, max(left, 0.0))
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded()
+
+
+class DeadlineMiddleware:
+    """
+    Pure ASGI middleware giving every request a deadline.
+
+    The budget comes from the `X-Request-Timeout` header (seconds, capped at
+    `max_timeout`) or else from the longest matching prefix in
+    `route_timeouts`, falling back to `default_timeout`; a budget <= 0
+    disables the deadline for that route. Calls made while serving the
+    request read the deadline through `remaining()`/`timeout()`, and the
+    handler itself is cancelled once it passes. If nothing was sent yet, the
+    client gets a 504; error responses produced after the deadline passed
+    (e.g. a wrapped upstream timeout) are turned into 504 as well.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        default_timeout: float,
+        max_timeout: float,
+        route_timeouts: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.app = app
+        self.default_timeout = default_timeout
+        self.max_timeout = max_timeout
+        self.route_timeouts = sorted(
+            (route_timeouts or {}).items(), key=lambda item: -len(item[0])
+        )
+
+    def _budget(self, scope: Scope) -> Optional[float]:
+        path = scope["path"]
+        budget = next(
+            (t for prefix, t in self.route_timeouts if path.startswith(prefix)),
+            self.default_timeout,
+        )
+        if budget <= 0:
+            return None
+        for name, value in scope["headers"]:
+            if name == TIMEOUT_HEADER:
+                try:
+                    requested = float(value)
+                except ValueError:
+                    break
+                if requested > 0:
+                    budget = min(requested, self.max_timeout)
+                break
+        return budget
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        budget = self._budget(scope)
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        started = False
+        replaced = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal started, replaced
+            if replaced:
+                return
+            if message["type"] == "http.response.start":
+                if message["status"] >= 500 and expired():
+                    replaced = True
+                    await self._send_timeout(send)
+                    return
+                started = True
+            await send(message)
+
+        token = _deadline.set(time.monotonic() + budget)
+        try:
+            await asyncio.wait_for(self.app(scope, receive, send_wrapper), budget)
+        except asyncio.TimeoutError:
+            if not expired():
+                raise
+            if not started and not replaced:
+                await self._send_timeout(send)
+        finally:
+            _deadline.reset(token)
+
+    @staticmethod
+    async def _send_timeout(send: Send) -> None:
+        deadline_exceeded.inc()
+        body = json.dumps({"detail": "Request deadline exceeded"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status.HTTP_504_GATEWAY_TIMEOUT,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,204 @@
+import asyncio
+import collections.abc
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Dict, List, Optional
+
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+loop_lag = registry.summary(
+    "event_loop_lag_seconds", "Delay of the event loop waking up a sleeping task."
+)
+loop_lag_max = registry.gauge(
+    "event_loop_lag_max_seconds", "Worst loop lag of the last flush interval."
+)
+loop_blocked = registry.counter(
+    "event_loop_blocked_total", "Stalls longer than the slow-callback threshold."
+)
+task_busy = registry.counter(
+    "asyncio_task_busy_seconds_total", "Time spent running task steps, by coroutine."
+)
+task_steps = registry.counter(
+    "asyncio_task_steps_total", "Task steps (resumptions) by coroutine."
+)
+task_slow_steps = registry.counter(
+    "asyncio_task_slow_steps_total", "Task steps over the slow threshold."
+)
+
+
+def _coro_name(coro: Any) -> str:
+    return getattr(coro, "__qualname__", None) or type(coro).__name__
+
+
+class _TimedCoroutine(collections.abc.Coroutine):
+    """
+    Coroutine proxy timing every `send`/`throw`, i.e. every task step.
+    """
+
+    __slots__ = ("_coro", "_name", "_monitor")
+
+    def __init__(self, coro: Any, monitor: "LoopMonitor") -> None:
+        self._coro = coro
+        self._name = _coro_name(coro)
+        self._monitor = monitor
+
+    def send(self, value: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return self._coro.send(value)
+        finally:
+            self._monitor.account(self._name, time.perf_counter() - start)
+
+    def throw(self, *args: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return self._coro.throw(*args)
+        finally:
+            self._monitor.account(self._name, time.perf_counter() - start)
+
+    def close(self) -> None:
+        self._coro.close()
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    def __getattr__(self, name: str) -> Any:
+        # cr_frame, cr_code, ... for Task.get_stack() and reprs.
+        return getattr(self._coro, name)
+
+    def __repr__(self) -> str:
+        return repr(self._coro)
+
+
+class LoopMonitor:
+    """
+    Event-loop health instrumentation for one worker.
+
+    - A sampler task sleeps `interval` seconds and records how late it wakes
+      up (loop lag).
+    - A watchdog thread notices when the sampler has not run for longer than
+      `slow_threshold` and logs the loop thread's current stack, i.e. the
+      code that is blocking the loop, once per stall.
+    - Optionally a task factory times every task step per coroutine and logs
+      steps slower than `slow_threshold`.
+
+    Everything is exported through the metrics registry.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        slow_threshold: float,
+        task_accounting: bool = True,
+        publish_interval: float = 5.0,
+    ) -> None:
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.task_accounting = task_accounting
+        self.publish_interval = publish_interval
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._previous_factory = None
+        self._sampler: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._heartbeat = time.monotonic()
+        self._max_lag = 0.0
+        # coroutine name -> [steps, busy seconds, slow steps]; loop thread only.
+        self._tasks: Dict[str, List[float]] = {}
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        if self.task_accounting:
+            self._previous_factory = loop.get_task_factory()
+            loop.set_task_factory(self._task_factory)
+        self._sampler = loop.create_task(self._sample())
+        self._stopping.clear()
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._sampler is not None:
+            self._sampler.cancel()
+            try:
+                await self._sampler
+            except asyncio.CancelledError:
+                pass
+        if self._loop is not None and self.task_accounting:
+            self._loop.set_task_factory(self._previous_factory)
+        self._publish()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=self.slow_threshold * 2)
+
+    def _task_factory(self, loop, coro, **kwargs):
+        if not isinstance(coro, _TimedCoroutine):
+            coro = _TimedCoroutine(coro, self)
+        if self._previous_factory is not None:
+            return self._previous_factory(loop, coro, **kwargs)
+        return asyncio.Task(coro, loop=loop, **kwargs)
+
+    def account(self, name: str, elapsed: float) -> None:
+        stats = self._tasks.get(name)
+        if stats is None:
+            stats = self._tasks[name] = [0, 0.0, 0]
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed >= self.slow_threshold:
+            stats[2] += 1
+            logger.warning("Slow task step in %s: %.3fs", name, elapsed)
+
+    async def _sample(self) -> None:
+        last_publish = time.monotonic()
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag = max(0.0, now - expected)
+            loop_lag.observe(lag)
+            self._max_lag = max(self._max_lag, lag)
+            if now - last_publish >= self.publish_interval:
+                self._publish()
+                last_publish = now
+
+    def _publish(self) -> None:
+        pid = str(os.getpid())
+        loop_lag_max.set(self._max_lag, pid=pid)
+        self._max_lag = 0.0
+        tasks, self._tasks = self._tasks, {}
+        for name, (steps, busy, slow) in tasks.items():
+            task_steps.inc(steps, coro=name)
+            task_busy.inc(busy, coro=name)
+            if slow:
+                task_slow_steps.inc(slow, coro=name)
+
+    def _watch(self) -> None:
+        # The sampler wakes up every `interval`; a heartbeat older than that
+        # plus the threshold means the loop thread is stuck in one callback.
+        budget = self.interval + self.slow_threshold
+        reported_for = None
+        while not self._stopping.wait(self.slow_threshold / 2):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat
+            if stalled < budget or reported_for == heartbeat:
+                continue
+            reported_for = heartbeat
+            loop_blocked.inc()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<unknown>"
+            logger.warning(
+                "Event loop blocked for over %.3fs, loop thread stack:\n%s",
+                stalled - self.interval,
+                stack,
+            )
@@ -0,0 +1,231 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: Iterable[Tuple[str, str]]) -> str:
+    pairs = ",".join(f'{k}="{v}"' for k, v in key)
+    return f"{{{pairs}}}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+        self._values: Dict[LabelKey, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> List[Tuple[LabelKey, float]]:
+        with self._lock:
+            return list(self._values.items())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] += amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] += amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Summary(_Metric):
+    """
+    Count and sum of observations, exported as `<name>_count` / `<name>_sum`.
+    """
+
+    kind = "summary"
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key + (("__part", "count"),)] += 1
+            self._values[key + (("__part", "sum"),)] += value
+
+
+class MetricsRegistry:
+    """
+    Per-process metrics registry.
+
+    Every worker periodically flushes its snapshot into `metrics_dir`; the
+    `/metrics` endpoint of any worker merges all snapshots, so a scrape sees
+    the whole pre-forked server rather than the worker that answered it.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, description: str):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, description)
+            return metric
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        return self._register(Counter, name, description)
+
+    def gauge(self, name: str, description: str = "") -> Gauge:
+        return self._register(Gauge, name, description)
+
+    def summary(self, name: str, description: str = "") -> Summary:
+        return self._register(Summary, name, description)
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "kind": metric.kind,
+                "description": metric.description,
+                "values": [[list(map(list, k)), v] for k, v in metric.snapshot()],
+            }
+            for name, metric in list(self._metrics.items())
+        }
+
+    def flush(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        pid = os.getpid()
+        path = os.path.join(directory, f"{pid}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"pid": pid, "metrics": self.snapshot()}, fh)
+        os.replace(tmp, path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect(directory: str) -> Dict[str, dict]:
+    """
+    Merge the snapshots of all workers.
+
+    Counters and summaries are summed over every snapshot ever written, so
+    totals survive worker restarts; gauges only count live workers.
+    """
+    merged: Dict[str, dict] = {}
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return merged
+
+    for fname in names:
+        if not fname.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, fname), encoding="utf-8") as fh:
+                snap = json.load(fh)
+        except (OSError, ValueError):
+            continue
+        alive = _pid_alive(int(snap.get("pid", 0)))
+        for name, data in snap.get("metrics", {}).items():
+            if data["kind"] == "gauge" and not alive:
+                continue
+            entry = merged.setdefault(
+                name,
+                {
+                    "kind": data["kind"],
+                    "description": data["description"],
+                    "values": defaultdict(float),
+                },
+            )
+            for key, value in data["values"]:
+                entry["values"][tuple(tuple(p) for p in key)] += value
+    return merged
+
+
+def render_prometheus(merged: Dict[str, dict]) -> str:
+    lines: List[str] = []
+    for name in sorted(merged):
+        data = merged[name]
+        if data["description"]:
+            lines.append(f"# HELP {name} {data['description']}")
+        lines.append(f"# TYPE {name} {data['kind']}")
+        for key, value in sorted(data["values"].items()):
+            labels = [p for p in key if p[0] != "__part"]
+            suffix = "".join(f"_{v}" for k, v in key if k == "__part")
+            lines.append(f"{name}{suffix}{_format_labels(labels)} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by method, route and status."
+)
+http_latency = registry.summary(
+    "http_request_duration_seconds", "HTTP request latency by method and route."
+)
+http_in_flight = registry.gauge(
+    "http_requests_in_flight", "Requests currently being served."
+)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request counts, latency and concurrency.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            http_requests.inc(
+                method=scope["method"], route=path, status=str(status_code)
+            )
+            http_latency.observe(
+                time.perf_counter() - start, method=scope["method"], route=path
+            )
@@ -0,0 +1,45 @@
+from typing import Optional, Sequence
+
+
+def negotiate(header: Optional[str], offered: Sequence[str]) -> Optional[str]:
+    """
+    The offered value an `Accept`/`Accept-Encoding` header rates highest.
+
+    Values are matched case-insensitively, exactly or through `type/*`,
+    `*/*` and `*`; the most specific match sets the q-value. Ties go to the
+    earlier offer, `q=0` excludes a value, and no header selects the first
+    offer. None when nothing offered is acceptable.
+    """
+    if not offered:
+        return None
+    if header is None:
+        return offered[0]
+    ranges = []
+    for part in header.split(","):
+        value, _, params = part.partition(";")
+        value = value.strip().lower()
+        if not value:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, raw = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(raw)
+                except ValueError:
+                    q = 0.0
+        ranges.append((value, q))
+
+    best: Optional[str] = None
+    best_q = 0.0
+    for candidate in offered:
+        lowered = candidate.lower()
+        major = lowered.partition("/")[0]
+        patterns = {lowered: 2, f"{major}/*": 1, "*/*": 0, "*": 0}
+        matches = [(patterns[value], q) for value, q in ranges if value in patterns]
+        if not matches:
+            continue
+        q = max(matches)[1]
+        if q > best_q:
+            best, best_q = candidate, q
+    return best
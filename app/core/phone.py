@@ -0,0 +1,32 @@
+import re
+from typing import Optional
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_phone(
+    raw: Optional[str], default_country_code: Optional[str] = None
+) -> Optional[str]:
+    """
+    Normalize a phone number to E.164 (`+15551234567`).
+
+    Numbers written with `+` or the `00` international prefix keep their
+    country code; national numbers get `default_country_code` (leading trunk
+    `0` dropped) or are rejected when none is configured. Returns None for
+    anything that cannot be an E.164 number.
+    """
+    if not raw:
+        return None
+    raw = raw.strip()
+    digits = _NON_DIGITS.sub("", raw)
+    if raw.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif default_country_code:
+        digits = default_country_code + digits.lstrip("0")
+    else:
+        return None
+    if not 8 <= len(digits) <= 15 or digits.startswith("0"):
+        return None
+    return f"+{digits}"
@@ -0,0 +1,167 @@
+import asyncio
+import collections
+import sys
+import threading
+import tracemalloc
+from types import FrameType
+from typing import Dict, List, Optional, Tuple
+
+MAX_DEPTH = 128
+
+_IGNORED_TRACES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _task_name(loop: asyncio.AbstractEventLoop) -> str:
+    task = asyncio.current_task(loop)
+    if task is None:
+        return "<loop>"
+    coro = task.get_coro()
+    return getattr(coro, "__qualname__", None) or type(coro).__name__
+
+
+class SamplingProfiler:
+    """
+    Statistical CPU profiler of the event-loop thread.
+
+    A helper thread samples the loop thread's stack every `interval` seconds
+    and counts identical stacks, rooted at the coroutine of the task that was
+    running (`<loop>` when no task was, e.g. while polling for I/O). Nothing
+    runs while no profile is being taken.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def _sample(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        thread_id: int,
+        interval: float,
+        stop: threading.Event,
+        counts: "collections.Counter[str]",
+    ) -> None:
+        while not stop.wait(interval):
+            frame: Optional[FrameType] = sys._current_frames().get(thread_id)
+            frames: List[str] = []
+            while frame is not None and len(frames) < MAX_DEPTH:
+                frames.append(_frame_name(frame))
+                frame = frame.f_back
+            frames.append(_task_name(loop))
+            counts[";".join(reversed(frames))] += 1
+
+    async def profile(self, seconds: float, interval: float = 0.005) -> Dict[str, int]:
+        """
+        Sample the calling loop's thread for `seconds`; stack -> sample count.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A CPU profile is already being taken")
+        try:
+            counts: "collections.Counter[str]" = collections.Counter()
+            stop = threading.Event()
+            sampler = threading.Thread(
+                target=self._sample,
+                args=(
+                    asyncio.get_running_loop(),
+                    threading.get_ident(),
+                    interval,
+                    stop,
+                    counts,
+                ),
+                name="sampling-profiler",
+                daemon=True,
+            )
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                stop.set()
+                await asyncio.to_thread(sampler.join)
+            return dict(counts)
+        finally:
+            self._lock.release()
+
+
+def collapsed(counts: Dict[str, int]) -> str:
+    """
+    Brendan Gregg's collapsed-stack format, as read by flamegraph.pl and
+    speedscope.
+    """
+    lines = [
+        f"{stack} {count}"
+        for stack, count in sorted(counts.items(), key=lambda item: -item[1])
+    ]
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+class MemoryTracer:
+    """
+    `tracemalloc` control: start/stop tracing, a baseline snapshot, top
+    allocation sites now and their growth since the baseline.
+
+    Tracing costs memory and CPU on every allocation, so it only runs
+    between `start` and `stop`.
+    """
+
+    def __init__(self) -> None:
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._baseline = self._snapshot()
+
+    def stop(self) -> None:
+        self._baseline = None
+        tracemalloc.stop()
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES)
+
+    def usage(self) -> Tuple[int, int]:
+        """
+        `(traced, peak)` bytes.
+        """
+        return tracemalloc.get_traced_memory()
+
+    def top(
+        self, group_by: str = "lineno", limit: int = 20
+    ) -> List[tracemalloc.Statistic]:
+        return self._snapshot().statistics(group_by)[:limit]
+
+    def diff(
+        self, group_by: str = "lineno", limit: int = 20, rebase: bool = False
+    ) -> List[tracemalloc.StatisticDiff]:
+        """
+        Allocation sites by growth since the baseline (set by `start`, or by
+        the previous diff with `rebase`).
+        """
+        current = self._snapshot()
+        baseline = self._baseline or current
+        stats = current.compare_to(baseline, group_by)
+        if rebase:
+            self._baseline = current
+        return stats[:limit]
+
+
+sampling_profiler = SamplingProfiler()
+memory_tracer = MemoryTracer()
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+from app.core import deadline
+from app.core.metrics import registry
+
+rate_limit_waits = registry.counter(
+    "rate_limit_wait_seconds_total", "Time spent waiting for rate-limit tokens."
+)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` tokens per second, holding up to `burst`.
+
+    `acquire` waits for a token (but never beyond the request deadline);
+    `try_acquire` takes one only if it is available right now.
+    """
+
+    def __init__(self, rate: float, burst: int, name: str = "") -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.name = name
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        if self.rate <= 0 or self.try_acquire(tokens):
+            return
+        # Waiters queue on the lock so tokens are handed out in FIFO order.
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                wait = (tokens - self._tokens) / self.rate
+                left = deadline.remaining()
+                if left is not None and wait > left:
+                    raise deadline.DeadlineExceeded(
+                        f"Rate limit for {self.name or 'upstream'} exceeds deadline"
+                    )
+                rate_limit_waits.inc(wait, bucket=self.name)
+                await asyncio.sleep(wait)
@@ -0,0 +1,82 @@
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from fastapi import status
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+TENANT_HEADER = b"x-tenant"
+
+_tenant: ContextVar[Optional[str]] = ContextVar("tenant", default=None)
+
+
+def current_tenant() -> str:
+    """
+    Tenant of the current request (or `use_tenant` block), else the default.
+    """
+    return _tenant.get() or settings.default_tenant
+
+
+@contextmanager
+def use_tenant(name: str) -> Iterator[None]:
+    token = _tenant.set(name)
+    try:
+        yield
+    finally:
+        _tenant.reset(token)
+
+
+class TenantMiddleware:
+    """
+    Pure ASGI middleware selecting the tenant of a request.
+
+    The tenant is taken from a `{api_prefix}/tenants/<name>/...` path (which
+    is rewritten to the plain `{api_prefix}/...` route) or from the
+    `X-Tenant` header; without either the default tenant is used. Unknown
+    tenants get a 404.
+    """
+
+    def __init__(self, app: ASGIApp, api_prefix: str) -> None:
+        self.app = app
+        self.path_prefix = f"{api_prefix}/tenants/"
+        self.api_prefix = api_prefix
+
+    def _select(self, scope: Scope) -> Optional[str]:
+        path: str = scope["path"]
+        if path.startswith(self.path_prefix):
+            name, _, rest = path[len(self.path_prefix) :].partition("/")
+            scope["path"] = f"{self.api_prefix}/{rest}"
+            scope["raw_path"] = scope["path"].encode()
+            return name
+        for header, value in scope["headers"]:
+            if header == TENANT_HEADER:
+                return value.decode("latin-1").strip()
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        name = self._select(scope)
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+        if name not in settings.tenant_configs:
+            body = json.dumps({"detail": f"Unknown tenant: {name}"}).encode()
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": status.HTTP_404_NOT_FOUND,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode()),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+        with use_tenant(name):
+            await self.app(scope, receive, send)
@@ -1,34 +1,87 @@
 from asyncio import current_task
+from typing import Optional
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     async_scoped_session,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
 
+from app.core import deadline
 from app.core.config import settings
+from app.db.profiling import QueryProfiler
+
+
+class DeadlineSession(Session):
+    """
+    Session whose transactions may not outlive the current request deadline.
+    """
+
+
+@event.listens_for(DeadlineSession, "after_begin")
+def _apply_deadline(session, transaction, connection) -> None:
+    left = deadline.remaining()
+    if left is not None:
+        # SET LOCAL does not take bind parameters; the value is an int.
+        ms = max(1, int(left * 1000))
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {ms}")
 
 
 class Database:
-    def __init__(self, db_url: str, echo: bool = False):
+    def __init__(self, db_url: Optional[str] = None, echo: Optional[bool] = None):
         """
         Database helper class for managing async SQLAlchemy sessions.
+
+        The engine is created on first use; `db_url` and `echo` default to the
+        application settings at that point.
         """
-        self.engine = create_async_engine(
-            db_url,
-            future=True,
-            echo=echo,
-        )
-        self.session_factory = async_sessionmaker(
-            bind=self.engine,
-            autoflush=False,
-            autocommit=False,
-            expire_on_commit=False,
-        )
-        self.scoped_session = async_scoped_session(
-            session_factory=self.session_factory,
-            scopefunc=current_task,
-        )
+        self._db_url = db_url
+        self._echo = echo
+        self._engine: Optional[AsyncEngine] = None
+        self._session_factory: Optional[async_sessionmaker] = None
+        self._scoped_session: Optional[async_scoped_session] = None
+        self.profiler: Optional[QueryProfiler] = None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            self._engine = create_async_engine(
+                self._db_url or settings.db_url,
+                future=True,
+                echo=settings.db_echo if self._echo is None else self._echo,
+            )
+            if settings.db_profile_enabled:
+                self.profiler = QueryProfiler(
+                    slow_threshold=settings.db_slow_query_threshold,
+                    max_statements=settings.db_profile_max_statements,
+                    explain=settings.db_explain_slow_queries,
+                )
+                self.profiler.attach(self._engine)
+        return self._engine
+
+    @property
+    def session_factory(self) -> async_sessionmaker:
+        if self._session_factory is None:
+            self._session_factory = async_sessionmaker(
+                bind=self.engine,
+                sync_session_class=DeadlineSession,
+                autoflush=False,
+                autocommit=False,
+                expire_on_commit=False,
+            )
+        return self._session_factory
+
+    @property
+    def scoped_session(self) -> async_scoped_session:
+        if self._scoped_session is None:
+            self._scoped_session = async_scoped_session(
+                session_factory=self.session_factory,
+                scopefunc=current_task,
+            )
+        return self._scoped_session
 
     async def get_session(self):
         """
@@ -38,8 +91,19 @@ class Database:
             yield session
             await session.close()
 
+    async def dispose(self) -> None:
+        """
+        Close pooled connections, if the engine was ever created.
+        """
+        if self.profiler is not None:
+            await self.profiler.stop()
+            self.profiler.detach()
+            self.profiler = None
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+            self._session_factory = None
+            self._scoped_session = None
+
 
-db = Database(
-    db_url=settings.db_url,
-    echo=settings.db_echo,
-)
\ No newline at end of file
+db = Database()
@@ -0,0 +1,103 @@
+import asyncio
+import contextlib
+import logging
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db.database import Database
+
+logger = logging.getLogger(__name__)
+
+
+class Listener:
+    """
+    A `LISTEN` connection on one channel that survives database restarts.
+
+    The connection is checked every `check_interval` seconds, and at once
+    when the driver reports it closed; a lost one is replaced. Whatever was
+    notified in between is gone, so `on_reconnect` is called once the new
+    connection listens.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        channel: str,
+        callback: Callable[[str], None],
+        check_interval: float = 30.0,
+        on_reconnect: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._db = database
+        self.channel = channel
+        self.callback = callback
+        self.check_interval = check_interval
+        self.on_reconnect = on_reconnect
+        self._conn: Optional[AsyncConnection] = None
+        self._driver = None
+        self._lost = asyncio.Event()
+        self._watcher: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        await self._listen()
+        self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._watcher
+            self._watcher = None
+        await self._close()
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        self.callback(payload)
+
+    def _on_terminate(self, connection) -> None:
+        if connection is self._driver:
+            self._lost.set()
+
+    async def _listen(self) -> bool:
+        self._lost.clear()
+        try:
+            self._conn = await self._db.engine.connect()
+            raw = await self._conn.get_raw_connection()
+            self._driver = raw.driver_connection
+            await self._driver.add_listener(self.channel, self._on_notify)
+            self._driver.add_termination_listener(self._on_terminate)
+        except Exception:
+            logger.exception("Could not listen on %s", self.channel)
+            await self._close()
+            return False
+        return True
+
+    async def _close(self) -> None:
+        self._driver = None
+        if self._conn is not None:
+            with contextlib.suppress(Exception):
+                # Not back to the pool: it is broken, or still listening.
+                await self._conn.invalidate()
+                await self._conn.close()
+            self._conn = None
+
+    async def _alive(self) -> bool:
+        if self._driver is None or self._lost.is_set():
+            return False
+        try:
+            await asyncio.wait_for(
+                self._driver.fetchval("SELECT 1"), self.check_interval
+            )
+        except Exception:
+            return False
+        return True
+
+    async def _watch(self) -> None:
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._lost.wait(), self.check_interval)
+            if await self._alive():
+                continue
+            logger.warning("Lost the %s listener, reconnecting", self.channel)
+            await self._close()
+            if await self._listen() and self.on_reconnect is not None:
+                self.on_reconnect()
@@ -5,17 +5,23 @@ from datetime import datetime
 from decimal import Decimal
 
 from sqlalchemy import (
+    BigInteger,
+    Boolean,
     String,
     Integer,
     DateTime,
     Numeric,
     Enum as SAEnum,
-    ForeignKey,
+    ForeignKeyConstraint,
     CheckConstraint,
+    Identity,
     Index,
     UniqueConstraint,
+    Text,
     func,
+    text,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import (
     Mapped,
     mapped_column,
@@ -25,6 +31,7 @@ from sqlalchemy.orm import (
 
 Base = declarative_base()
 
+
 class PaymentStatus(enum.Enum):
     PENDING = "pending"
     COMPLETED = "completed"
@@ -36,20 +43,29 @@ class PaymentMethod(enum.Enum):
     CASH = "cash"
     OTHER = "other"
 
+
 class Customer(Base):
+    """
+    Every local table is scoped by `tenant` (the RetailCRM account the row
+    was mirrored from), which leads all primary and unique keys.
+    """
+
     __tablename__ = "customers"
     __table_args__ = (
-        UniqueConstraint("phone", name="uq_customers_phone"),
+        UniqueConstraint("tenant", "email", name="uq_customers_email"),
+        UniqueConstraint("tenant", "phone", name="uq_customers_phone"),
         Index("ix_customers_registered_at", "registered_at"),
+        Index("ix_customers_phone_e164", "tenant", "phone_e164"),
+        Index("ix_customers_email_lower", "tenant", text("lower(email)")),
     )
 
+    tenant: Mapped[str] = mapped_column(String(64), primary_key=True)
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     first_name: Mapped[str] = mapped_column(String(100), nullable=False)
     last_name: Mapped[str | None] = mapped_column(String(100))
-    email: Mapped[str] = mapped_column(
-        String(255), nullable=False, unique=True, index=True
-    )
-    phone: Mapped[str] = mapped_column(String(20), nullable=False, unique=True)
+    email: Mapped[str | None] = mapped_column(String(255))
+    phone: Mapped[str | None] = mapped_column(String(20))
+    phone_e164: Mapped[str | None] = mapped_column(String(16))
     registered_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=func.now(), nullable=False
     )
@@ -61,37 +77,64 @@ class Customer(Base):
 
 
 class Order(Base):
+    """
+    Range-partitioned by month on `created_at` (see `app.db.partitions`).
+    Unique keys must include the partition key.
+    """
+
     __tablename__ = "orders"
     __table_args__ = (
-        UniqueConstraint("order_number", name="uq_orders_order_number"),
+        UniqueConstraint(
+            "tenant", "order_number", "created_at", name="uq_orders_order_number"
+        ),
+        ForeignKeyConstraint(
+            ["tenant", "customer_id"],
+            ["customers.tenant", "customers.id"],
+            name="fk_orders_customer",
+            ondelete="CASCADE",
+        ),
         Index("ix_orders_created_at", "created_at"),
+        Index("ix_orders_created_at_brin", "created_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    order_number: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
+    tenant: Mapped[str] = mapped_column(String(64), primary_key=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    order_number: Mapped[str] = mapped_column(String(50), nullable=False)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, server_default=func.now(), nullable=False
-    )
-    customer_id: Mapped[int] = mapped_column(
-        ForeignKey("customers.id", ondelete="CASCADE"), nullable=False
+        DateTime, primary_key=True, server_default=func.now(), nullable=False
     )
+    customer_id: Mapped[int] = mapped_column(Integer, nullable=False)
 
     customer: Mapped["Customer"] = relationship(back_populates="orders")
     payments: Mapped[list["Payment"]] = relationship(
-        back_populates="order", cascade="all, delete-orphan"
+        back_populates="order",
+        primaryjoin=(
+            "and_(Order.tenant == foreign(Payment.tenant), "
+            "Order.id == foreign(Payment.order_id))"
+        ),
+        cascade="all, delete-orphan",
     )
 
+
 class Payment(Base):
+    """
+    Range-partitioned by month on `paid_at`. `order_id` carries no foreign
+    key: `orders.id` alone is not unique across partitions.
+    """
+
     __tablename__ = "payments"
     __table_args__ = (
         CheckConstraint("amount > 0", name="ck_payments_amount_positive"),
+        Index("ix_payments_order_id", "tenant", "order_id"),
         Index("ix_payments_paid_at", "paid_at"),
+        Index("ix_payments_paid_at_brin", "paid_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (paid_at)"},
     )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    order_id: Mapped[int] = mapped_column(
-        ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True
-    )
+    tenant: Mapped[str] = mapped_column(String(64), primary_key=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    order_id: Mapped[int] = mapped_column(Integer, nullable=False)
     amount: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
     method: Mapped[PaymentMethod] = mapped_column(
         SAEnum(PaymentMethod, native_enum=False),
@@ -104,7 +147,74 @@ class Payment(Base):
         nullable=False,
     )
     paid_at: Mapped[datetime] = mapped_column(
-        DateTime, server_default=func.now(), nullable=False
+        DateTime, primary_key=True, server_default=func.now(), nullable=False
+    )
+    comment: Mapped[str | None] = mapped_column(String(255))
+
+    order: Mapped["Order"] = relationship(
+        back_populates="payments",
+        primaryjoin=(
+            "and_(foreign(Payment.tenant) == Order.tenant, "
+            "foreign(Payment.order_id) == Order.id)"
+        ),
+    )
+
+
+class CatalogOffer(Base):
+    """
+    RetailCRM offers (sellable variants of catalog products), synced in full
+    by `python -m app sync-catalog`.
+    """
+
+    __tablename__ = "catalog_offers"
+    __table_args__ = (Index("ix_catalog_offers_sku", "tenant", "sku"),)
+
+    tenant: Mapped[str] = mapped_column(String(64), primary_key=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    product_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    sku: Mapped[str | None] = mapped_column(String(100))
+    price: Mapped[Decimal | None] = mapped_column(Numeric(10, 2))
+    active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    synced_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class CacheEntry(Base):
+    """
+    Shared (L2) cache tier. UNLOGGED: no WAL, contents may vanish on crash.
+    """
+
+    __tablename__ = "cache_entries"
+    __table_args__ = (
+        Index("ix_cache_entries_expires_at", "expires_at"),
+        {"prefixes": ["UNLOGGED"]},
     )
 
-    order: Mapped["Order"] = relationship(back_populates="payments")
+    key: Mapped[str] = mapped_column(Text, primary_key=True)
+    value: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+
+
+class ChangeEvent(Base):
+    """
+    Log of changes to customers, orders and payments, written by triggers
+    (`log_change_event`), which also `NOTIFY change_events`. Kept for
+    `EVENTS_RETENTION` seconds so that feed clients can resume.
+    """
+
+    __tablename__ = "change_events"
+    __table_args__ = (
+        Index("ix_change_events_tenant_id", "tenant", "id"),
+        Index("ix_change_events_occurred_at", "occurred_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    tenant: Mapped[str] = mapped_column(String(64), nullable=False)
+    entity: Mapped[str] = mapped_column(String(16), nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    action: Mapped[str] = mapped_column(String(16), nullable=False)
+    occurred_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -0,0 +1,227 @@
+import asyncio
+import contextlib
+import logging
+from datetime import date
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import settings
+from app.db.database import Database
+
+logger = logging.getLogger(__name__)
+
+# Partitioned parent table -> partition key column.
+PARTITIONED_TABLES: Dict[str, str] = {
+    "orders": "created_at",
+    "payments": "paid_at",
+}
+
+# pg_advisory_lock key serialising maintenance across workers.
+MAINTENANCE_LOCK_ID = 7_318_201_032
+
+# Transaction-local setting read by the `log_change_event` trigger.
+MOVING_ROWS_SETTING = "change_events.moving"
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+@contextlib.asynccontextmanager
+async def moving_rows(
+    executor: Union[AsyncConnection, AsyncSession],
+) -> AsyncIterator[None]:
+    """
+    Mark the deletes and inserts of the block as rows moving between
+    partitions: the change feed logs no deletes for them and their inserts
+    as updates. Lasts until the end of the block, or of the transaction if
+    it fails.
+    """
+    setting = text("SELECT set_config(:name, :value, true)")
+    await executor.execute(setting, {"name": MOVING_ROWS_SETTING, "value": "on"})
+    yield
+    await executor.execute(setting, {"name": MOVING_ROWS_SETTING, "value": "off"})
+
+
+async def _exists(conn: AsyncConnection, name: str) -> bool:
+    result = await conn.execute(text("SELECT to_regclass(:name)"), {"name": name})
+    return result.scalar() is not None
+
+
+async def create_month_partition(
+    conn: AsyncConnection, table: str, column: str, month: date
+) -> bool:
+    """
+    Create and attach the partition for `month`, if missing.
+
+    Rows that already landed in the default partition for that month are
+    moved into the new partition before it is attached, without change
+    events.
+    """
+    name = partition_name(table, month)
+    if await _exists(conn, name):
+        return False
+    lo, hi = month, add_months(month, 1)
+    bounds = {"lo": lo, "hi": hi}
+    await conn.execute(
+        text(
+            f"CREATE TABLE {name} "
+            f"(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    default = default_partition_name(table)
+    if await _exists(conn, default):
+        # The default partition carries the change feed trigger; the new
+        # table gets it only when attached.
+        async with moving_rows(conn):
+            await conn.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {default} "
+                    f"WHERE {column} >= :lo AND {column} < :hi RETURNING *) "
+                    f"INSERT INTO {name} SELECT * FROM moved"
+                ),
+                bounds,
+            )
+    await conn.execute(
+        text(
+            f"ALTER TABLE {table} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{lo.isoformat()}') TO ('{hi.isoformat()}')"
+        )
+    )
+    return True
+
+
+async def list_month_partitions(
+    conn: AsyncConnection, table: str
+) -> List[Tuple[str, date]]:
+    """
+    Attached monthly partitions of `table`, oldest first.
+    """
+    result = await conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": table},
+    )
+    prefix = f"{table}_p"
+    partitions: List[Tuple[str, date]] = []
+    for (name,) in result:
+        if not name.startswith(prefix):
+            continue
+        try:
+            year, month = map(int, name[len(prefix) :].split("_"))
+        except ValueError:
+            continue
+        partitions.append((name, date(year, month, 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+async def ensure_partitions(
+    conn: AsyncConnection, table: str, column: str, months_ahead: int
+) -> List[str]:
+    """
+    Make sure partitions exist from the current month to `months_ahead`.
+    """
+    current = month_start(date.today())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if await create_month_partition(conn, table, column, month):
+            created.append(partition_name(table, month))
+    return created
+
+
+async def apply_retention(
+    conn: AsyncConnection, table: str, keep_months: int, drop: bool = False
+) -> List[str]:
+    """
+    Detach (and optionally drop) partitions older than `keep_months`.
+
+    Detached partitions stay in the database as plain tables so they can be
+    archived; `drop=True` removes them.
+    """
+    cutoff = add_months(month_start(date.today()), -keep_months)
+    removed = []
+    for name, month in await list_month_partitions(conn, table):
+        if month >= cutoff:
+            break
+        await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        if drop:
+            await conn.execute(text(f"DROP TABLE {name}"))
+        removed.append(name)
+    return removed
+
+
+async def maintain(
+    database: Database,
+    months_ahead: int,
+    retention_months: Optional[int] = None,
+    drop: bool = False,
+) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Run partition upkeep for every partitioned table.
+
+    Guarded by an advisory lock, so concurrent callers (one per worker) skip
+    the run instead of racing on DDL.
+    """
+    report: Dict[str, Dict[str, List[str]]] = {}
+    async with database.engine.connect() as lock_conn:
+        locked = await lock_conn.scalar(
+            text("SELECT pg_try_advisory_lock(:id)"), {"id": MAINTENANCE_LOCK_ID}
+        )
+        await lock_conn.commit()
+        if not locked:
+            return report
+        try:
+            for table, column in PARTITIONED_TABLES.items():
+                async with database.engine.begin() as conn:
+                    created = await ensure_partitions(conn, table, column, months_ahead)
+                    removed = (
+                        await apply_retention(conn, table, retention_months, drop)
+                        if retention_months is not None
+                        else []
+                    )
+                report[table] = {"created": created, "removed": removed}
+        finally:
+            await lock_conn.execute(
+                text("SELECT pg_advisory_unlock(:id)"), {"id": MAINTENANCE_LOCK_ID}
+            )
+            await lock_conn.commit()
+    return report
+
+
+async def maintain_periodically(database: Database, interval: float) -> None:
+    """
+    Background upkeep loop started from the app lifespan.
+    """
+    while True:
+        try:
+            report = await maintain(
+                database,
+                months_ahead=settings.partition_premake_months,
+                retention_months=settings.partition_retention_months,
+                drop=settings.partition_retention_drop,
+            )
+            if any(r["created"] or r["removed"] for r in report.values()):
+                logger.info("Partition maintenance: %s", report)
+        except Exception:
+            logger.exception("Partition maintenance failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+slow_queries = registry.counter(
+    "db_slow_queries_total", "Statements slower than the slow-query threshold."
+)
+
+# Execution option that keeps a statement out of the profile.
+SKIP_OPTION = "skip_profiling"
+
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|\$\d+|(?<!:):\w+)"
+_NORMALIZERS: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(_PLACEHOLDER), "?"),
+    # (?, ?, ?) -> (?) and VALUES (?), (?), ... -> VALUES (?), ...
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)"), "(?)"),
+    (re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+"), "(?), ..."),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def normalize(statement: str) -> str:
+    """
+    Statement text with literals and parameters replaced by `?`.
+
+    Statements that differ only in values (or in the length of IN / VALUES
+    lists) normalize to the same text, and no value ever reaches the log.
+    """
+    for pattern, repl in _NORMALIZERS:
+        statement = pattern.sub(repl, statement)
+    return statement.strip()
+
+
+@dataclass
+class StatementStats:
+    statement: str
+    calls: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    rows: int = 0
+    plan: Optional[str] = None
+    plan_elapsed: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+
+class QueryProfiler:
+    """
+    Per-process statement profile fed by engine events.
+
+    Every statement is timed and aggregated by its normalized text (bounded
+    to `max_statements` distinct entries; the rest count towards "<other>").
+    Statements slower than `slow_threshold` are logged without parameters.
+    With `explain` on, a slow read-only statement that sets a new maximum is
+    re-run under `EXPLAIN (ANALYZE, BUFFERS)` by a background task (started
+    on first use), on a separate connection inside a read-only transaction
+    that is rolled back.
+    """
+
+    OTHER = "<other>"
+
+    def __init__(
+        self,
+        slow_threshold: float,
+        max_statements: int = 500,
+        explain: bool = False,
+    ) -> None:
+        self.slow_threshold = slow_threshold
+        self.max_statements = max_statements
+        self.explain = explain
+        self._stats: Dict[str, StatementStats] = {}
+        self._lock = threading.Lock()
+        self._engine: Optional[AsyncEngine] = None
+        self._explain_queue: "asyncio.Queue[Tuple[str, str, Any, float]]" = (
+            asyncio.Queue(maxsize=32)
+        )
+        self._explainer: Optional[asyncio.Task] = None
+
+    def attach(self, engine: AsyncEngine) -> None:
+        self._engine = engine
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after)
+        event.listen(engine.sync_engine, "handle_error", self._error)
+
+    def detach(self) -> None:
+        if self._engine is not None:
+            sync_engine: Engine = self._engine.sync_engine
+            event.remove(sync_engine, "before_cursor_execute", self._before)
+            event.remove(sync_engine, "after_cursor_execute", self._after)
+            event.remove(sync_engine, "handle_error", self._error)
+            self._engine = None
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _error(self, exception_context) -> None:
+        # A failed statement has no `_after`; its start must not be taken
+        # for the next statement's on this pooled connection.
+        conn = exception_context.connection
+        if conn is not None and exception_context.execution_context is not None:
+            starts = conn.info.get("query_start")
+            if starts:
+                starts.pop()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        if context is not None and context.execution_options.get(SKIP_OPTION):
+            return
+        key = normalize(statement)
+        rows = getattr(cursor, "rowcount", -1)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_statements:
+                    key = self.OTHER
+                stats = self._stats.setdefault(key, StatementStats(key))
+            stats.calls += 1
+            stats.total += elapsed
+            new_max = elapsed > stats.max
+            stats.max = max(stats.max, elapsed)
+            if rows and rows > 0:
+                stats.rows += rows
+
+        if elapsed < self.slow_threshold:
+            return
+        slow_queries.inc()
+        logger.warning(
+            "Slow query (%.3fs, %d parameter set(s) redacted): %s",
+            elapsed,
+            len(parameters) if executemany else 1,
+            key,
+        )
+        if (
+            self.explain
+            and new_max
+            and not executemany
+            and key != self.OTHER
+            and statement.split(None, 1)[0].upper() in ("SELECT", "WITH")
+            and not (context and context.execution_options.get("stream_results"))
+        ):
+            if self._explainer is None:
+                self._explainer = asyncio.get_running_loop().create_task(
+                    self._explain()
+                )
+            try:
+                self._explain_queue.put_nowait((key, statement, parameters, elapsed))
+            except asyncio.QueueFull:
+                pass
+
+    async def stop(self) -> None:
+        if self._explainer is not None:
+            self._explainer.cancel()
+            try:
+                await self._explainer
+            except asyncio.CancelledError:
+                pass
+            self._explainer = None
+
+    async def _explain(self) -> None:
+        while True:
+            key, statement, parameters, elapsed = await self._explain_queue.get()
+            if self._engine is None:
+                continue
+            try:
+                async with self._engine.connect() as conn:
+                    conn = await conn.execution_options(**{SKIP_OPTION: True})
+                    await conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+                    if isinstance(parameters, list):
+                        # A list would be taken for executemany.
+                        parameters = tuple(parameters)
+                    result = await conn.exec_driver_sql(
+                        f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+                    )
+                    plan = "\n".join(row[0] for row in result)
+                    await conn.rollback()
+            except Exception:
+                logger.exception("EXPLAIN of a slow query failed: %s", key)
+                continue
+            with self._lock:
+                stats = self._stats.get(key)
+                if stats is not None and elapsed >= stats.plan_elapsed:
+                    stats.plan = plan
+                    stats.plan_elapsed = elapsed
+
+    def top(self, limit: int = 20, order_by: str = "total") -> List[StatementStats]:
+        with self._lock:
+            stats = list(self._stats.values())
+        return sorted(stats, key=lambda s: getattr(s, order_by), reverse=True)[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
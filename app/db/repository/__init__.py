@@ -1,3 +1,5 @@
+from .analytics_repository import AnalyticsRepository
+from .catalog_repository import CatalogRepository
 from .customer_repository import CustomerRepository
 from .order_repository import OrderRepository
 from .payment_repository import PaymentRepository
@@ -0,0 +1,77 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.tenant import current_tenant
+from app.db.models import Payment, PaymentMethod, PaymentStatus
+
+
+class AnalyticsRepository:
+    """
+    Grouped aggregations over the local payments table of one tenant.
+
+    Every query is bounded on `paid_at`, so the planner prunes partitions and
+    can use the BRIN index.
+    """
+
+    def __init__(self, session: AsyncSession, tenant: Optional[str] = None) -> None:
+        self.session = session
+        self.tenant = tenant or current_tenant()
+
+    def _in_range(self, date_from: datetime, date_to: datetime):
+        return (
+            Payment.tenant == self.tenant,
+            Payment.paid_at >= date_from,
+            Payment.paid_at < date_to,
+        )
+
+    async def revenue_buckets(
+        self, granularity: str, date_from: datetime, date_to: datetime
+    ) -> List[Tuple[datetime, float, int]]:
+        bucket = func.date_trunc(granularity, Payment.paid_at).label("bucket")
+        stmt = (
+            select(bucket, func.sum(Payment.amount), func.count(Payment.id))
+            .where(
+                *self._in_range(date_from, date_to),
+                Payment.status == PaymentStatus.COMPLETED,
+            )
+            .group_by(bucket)
+            .order_by(bucket)
+        )
+        result = await self.session.execute(stmt)
+        return [(b, float(total), count) for b, total, count in result]
+
+    async def payment_breakdown(
+        self, date_from: datetime, date_to: datetime
+    ) -> List[Tuple[PaymentMethod, PaymentStatus, int, float]]:
+        stmt = (
+            select(
+                Payment.method,
+                Payment.status,
+                func.count(Payment.id),
+                func.coalesce(func.sum(Payment.amount), 0),
+            )
+            .where(*self._in_range(date_from, date_to))
+            .group_by(Payment.method, Payment.status)
+            .order_by(Payment.method, Payment.status)
+        )
+        result = await self.session.execute(stmt)
+        return [(m, s, count, float(total)) for m, s, count, total in result]
+
+    async def completed_revenue_by_orders(
+        self, date_from: datetime, date_to: datetime
+    ) -> Tuple[int, float]:
+        """
+        Number of distinct paying orders and their completed revenue.
+        """
+        stmt = select(
+            func.count(func.distinct(Payment.order_id)),
+            func.coalesce(func.sum(Payment.amount), 0),
+        ).where(
+            *self._in_range(date_from, date_to),
+            Payment.status == PaymentStatus.COMPLETED,
+        )
+        orders, revenue = (await self.session.execute(stmt)).one()
+        return orders, float(revenue)
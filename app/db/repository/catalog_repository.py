@@ -0,0 +1,58 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.tenant import current_tenant
+from app.db.models import CatalogOffer
+
+
+class CatalogRepository:
+
+    def __init__(self, session: AsyncSession, tenant: Optional[str] = None) -> None:
+        self.session = session
+        self.tenant = tenant or current_tenant()
+
+    async def list_all(self) -> Sequence[CatalogOffer]:
+        stmt = select(CatalogOffer).where(CatalogOffer.tenant == self.tenant)
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def version(self) -> Tuple[int, Optional[datetime]]:
+        """
+        Cheap change marker: row count and latest sync time.
+        """
+        stmt = select(func.count(), func.max(CatalogOffer.synced_at)).where(
+            CatalogOffer.tenant == self.tenant
+        )
+        count, synced_at = (await self.session.execute(stmt)).one()
+        return count, synced_at
+
+    async def upsert_many(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Insert or refresh synced offers (no commit).
+        """
+        if not rows:
+            return
+        stmt = insert(CatalogOffer).values([{**r, "tenant": self.tenant} for r in rows])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CatalogOffer.tenant, CatalogOffer.id],
+            set_={
+                col: stmt.excluded[col]
+                for col in ("product_id", "name", "sku", "price", "active", "synced_at")
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def delete_synced_before(self, moment: datetime) -> int:
+        """
+        Drop offers a complete sync started at `moment` did not see (no commit).
+        """
+        result = await self.session.execute(
+            delete(CatalogOffer).where(
+                CatalogOffer.tenant == self.tenant, CatalogOffer.synced_at < moment
+            )
+        )
+        return result.rowcount
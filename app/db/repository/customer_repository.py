@@ -1,38 +1,94 @@
-from typing import Optional, Sequence
+from typing import Any, AsyncIterator, Collection, Dict, List, Optional, Sequence
 
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.tenant import current_tenant
 from app.db.models import Customer
-from app.schemas.customers import CustomerCreate, CustomerFilter
+from app.schemas.customers import CustomerCreate, CustomerFilter, CustomerQuery
 
 
 class CustomerRepository:
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, tenant: Optional[str] = None) -> None:
         self.session = session
+        self.tenant = tenant or current_tenant()
 
     async def get(self, customer_id: int) -> Optional[Customer]:
-        return await self.session.get(Customer, customer_id)
+        return await self.session.get(Customer, (self.tenant, customer_id))
 
-    async def list(self, filters: CustomerFilter | None = None) -> Sequence[Customer]:
-        stmt = select(Customer)
+    async def get_by_email(self, email: str) -> Optional[Customer]:
+        """
+        Case-insensitive (`ix_customers_email_lower`), like RetailCRM.
+        """
+        stmt = (
+            select(Customer)
+            .where(
+                Customer.tenant == self.tenant,
+                func.lower(Customer.email) == email.lower(),
+            )
+            .order_by(Customer.id)
+            .limit(1)
+        )
+        return (await self.session.execute(stmt)).scalar_one_or_none()
+
+    async def get_by_phone(self, phone_e164: str) -> Optional[Customer]:
+        stmt = (
+            select(Customer)
+            .where(Customer.tenant == self.tenant, Customer.phone_e164 == phone_e164)
+            .order_by(Customer.id)
+            .limit(1)
+        )
+        return (await self.session.execute(stmt)).scalar_one_or_none()
+
+    def _filtered(self, stmt: Select, filters: CustomerQuery | None) -> Select:
+        stmt = stmt.where(Customer.tenant == self.tenant)
         if filters:
             if filters.first_name:
                 stmt = stmt.where(Customer.first_name.ilike(f"%{filters.first_name}%"))
             if filters.email:
-                stmt = stmt.where(Customer.email == filters.email)
+                stmt = stmt.where(func.lower(Customer.email) == filters.email.lower())
             if filters.registered_from:
                 stmt = stmt.where(Customer.registered_at >= filters.registered_from)
             if filters.registered_to:
                 stmt = stmt.where(Customer.registered_at <= filters.registered_to)
-        result = await self.session.execute(stmt)
+        return stmt
+
+    async def list(self, filters: CustomerFilter | None = None) -> Sequence[Customer]:
+        result = await self.session.execute(self._filtered(select(Customer), filters))
         return result.scalars().all()
 
+    async def stream(
+        self,
+        columns: Collection[str],
+        filters: CustomerQuery | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        The named columns of every matching customer, in id order, as batches
+        of `batch_size` rows read through a server-side cursor.
+
+        Only one batch is held at a time; the next is fetched when the
+        consumer asks for it.
+        """
+        stmt = (
+            self._filtered(select(*(getattr(Customer, c) for c in columns)), filters)
+            .order_by(Customer.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(stmt)
+        try:
+            async for batch in result.partitions():
+                yield batch
+        finally:
+            await result.close()
+
     async def create(self, data: CustomerCreate) -> Customer:
-        customer = Customer(**data.model_dump())
+        customer = Customer(tenant=self.tenant, **data.model_dump())
         self.session.add(customer)
         try:
             await self.session.commit()
@@ -47,3 +103,51 @@ class CustomerRepository:
             raise
         await self.session.refresh(customer)
         return customer
+
+    async def _drop_taken(self, rows: List[Dict[str, Any]], name: str) -> None:
+        """
+        Blank `name` (a unique column) in the rows whose value another customer
+        already holds, locally or earlier in `rows`.
+        """
+        column = getattr(Customer, name)
+        values = {r[name] for r in rows if r[name] is not None}
+        if not values:
+            return
+        result = await self.session.execute(
+            select(column, Customer.id).where(
+                Customer.tenant == self.tenant, column.in_(values)
+            )
+        )
+        owners = dict(result.all())
+        for row in rows:
+            value = row[name]
+            if value is not None and owners.setdefault(value, row["id"]) != row["id"]:
+                row[name] = None
+
+    async def upsert_many(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """
+        Insert or refresh customers mirrored from RetailCRM (no commit).
+        Returns the ids of the customers inserted or changed.
+
+        RetailCRM lets customers share an e-mail or phone; here they are
+        unique, so a shared one is only stored for the customer that has it
+        first. One released by another customer of the same batch is taken
+        over on the next write.
+        """
+        if not rows:
+            return []
+        rows = [dict(r) for r in rows]
+        await self._drop_taken(rows, "email")
+        await self._drop_taken(rows, "phone")
+        columns = ("first_name", "last_name", "email", "phone", "phone_e164")
+        stmt = insert(Customer).values([{**r, "tenant": self.tenant} for r in rows])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Customer.tenant, Customer.id],
+            set_={col: stmt.excluded[col] for col in columns},
+            # Unchanged customers are left alone (and not returned).
+            where=tuple_(*(getattr(Customer, col) for col in columns)).is_distinct_from(
+                tuple_(*(stmt.excluded[col] for col in columns))
+            ),
+        )
+        result = await self.session.execute(stmt.returning(Customer.id))
+        return list(result.scalars().all())
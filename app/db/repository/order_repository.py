@@ -1,29 +1,145 @@
-from typing import Optional, Sequence
+from typing import Any, Collection, Dict, List, Optional, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, literal, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Order
+from app.core.tenant import current_tenant
+from app.db.models import Order, Payment
+from app.db.partitions import moving_rows
 from app.schemas.orders import OrderCreate
 
+# Timestamp format shared with `app.services.reconciliation.order_digest`.
+DIGEST_TS_FORMAT = "YYYY-MM-DD HH24:MI:SS"
+
 
 class OrderRepository:
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, tenant: Optional[str] = None) -> None:
         self.session = session
+        self.tenant = tenant or current_tenant()
 
     async def get(self, order_id: int) -> Optional[Order]:
-        return await self.session.get(Order, order_id)
+        stmt = select(Order).where(Order.tenant == self.tenant, Order.id == order_id)
+        return (await self.session.execute(stmt.limit(1))).scalar_one_or_none()
 
     async def list_by_customer(self, customer_id: int) -> Sequence[Order]:
-        stmt = select(Order).where(Order.customer_id == customer_id)
+        stmt = select(Order).where(
+            Order.tenant == self.tenant, Order.customer_id == customer_id
+        )
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    async def count(self) -> int:
+        stmt = (
+            select(func.count()).select_from(Order).where(Order.tenant == self.tenant)
+        )
+        return (await self.session.execute(stmt)).scalar_one()
+
+    def _digest_query(self, order_ids: Collection[int]):
+        """
+        md5 of each of the given orders together with its payments.
+
+        The text hashed here must stay byte-for-byte identical to the one
+        built by `app.services.reconciliation.order_digest`.
+        """
+        payment_text = func.concat_ws(
+            ",",
+            Payment.id,
+            Payment.amount,
+            Payment.method,
+            Payment.status,
+            func.to_char(Payment.paid_at, DIGEST_TS_FORMAT),
+            func.coalesce(Payment.comment, ""),
+        )
+        payments = (
+            select(
+                func.coalesce(
+                    func.string_agg(
+                        payment_text, aggregate_order_by(literal(";"), Payment.id)
+                    ),
+                    "",
+                )
+            )
+            .where(Payment.tenant == Order.tenant, Payment.order_id == Order.id)
+            .correlate(Order)
+            .scalar_subquery()
+        )
+        digest = func.md5(
+            func.concat_ws(
+                "|",
+                Order.id,
+                Order.order_number,
+                func.to_char(Order.created_at, DIGEST_TS_FORMAT),
+                Order.customer_id,
+                payments,
+            )
+        ).label("digest")
+        return select(Order.id, digest).where(
+            Order.tenant == self.tenant, Order.id.in_(list(order_ids))
+        )
+
+    async def chunk_digest(self, order_ids: Collection[int]) -> Optional[str]:
+        """
+        One hash over the digests of the given orders, computed in SQL.
+        """
+        rows = self._digest_query(order_ids).subquery()
+        stmt = select(
+            func.md5(
+                func.string_agg(
+                    rows.c.digest,
+                    aggregate_order_by(literal_column("','"), rows.c.id),
+                )
+            )
+        )
+        return (await self.session.execute(stmt)).scalar()
+
+    async def row_digests(self, order_ids: Collection[int]) -> Dict[int, str]:
+        result = await self.session.execute(self._digest_query(order_ids))
+        return {order_id: digest for order_id, digest in result}
+
     async def create(self, data: OrderCreate) -> Order:
         payload = data.model_dump(exclude={"customer", "items"})
-        order = Order(**payload)
+        order = Order(tenant=self.tenant, **payload)
         self.session.add(order)
         await self.session.commit()
         await self.session.refresh(order)
         return order
+
+    async def upsert_many(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Insert or refresh orders mirrored from RetailCRM (no commit).
+        """
+        if not rows:
+            return
+        # created_at is the partition key: an order whose created_at changed
+        # upstream is deleted and inserted again, which the change feed
+        # reports as an update.
+        async with moving_rows(self.session):
+            result = await self.session.execute(
+                delete(Order)
+                .where(
+                    Order.tenant == self.tenant,
+                    Order.id.in_([r["id"] for r in rows]),
+                    tuple_(Order.id, Order.created_at).not_in(
+                        [(r["id"], r["created_at"]) for r in rows]
+                    ),
+                )
+                .returning(Order.id)
+            )
+            moved = set(result.scalars().all())
+            await self._upsert([r for r in rows if r["id"] in moved])
+        await self._upsert([r for r in rows if r["id"] not in moved])
+
+    async def _upsert(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        stmt = insert(Order).values([{**r, "tenant": self.tenant} for r in rows])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Order.tenant, Order.id, Order.created_at],
+            set_={
+                "order_number": stmt.excluded.order_number,
+                "customer_id": stmt.excluded.customer_id,
+            },
+        )
+        await self.session.execute(stmt)
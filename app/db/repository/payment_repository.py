@@ -1,28 +1,124 @@
-from typing import Optional
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Payment
+from app.core.tenant import current_tenant
+from app.db.models import Payment, PaymentStatus
+from app.db.partitions import moving_rows
 from app.schemas.payments import PaymentCreate
 
 
+class PaymentTotals(NamedTuple):
+    count: int
+    total_amount: Decimal
+    paid_amount: Decimal
+
+
 class PaymentRepository:
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, tenant: Optional[str] = None) -> None:
         self.session = session
+        self.tenant = tenant or current_tenant()
 
     async def get(self, payment_id: int) -> Optional[Payment]:
-        return await self.session.get(Payment, payment_id)
+        stmt = select(Payment).where(
+            Payment.tenant == self.tenant, Payment.id == payment_id
+        )
+        return (await self.session.execute(stmt.limit(1))).scalar_one_or_none()
 
-    async def list_by_order(self, order_id: int) -> list[Payment]:
-        stmt = select(Payment).where(Payment.order_id == order_id)
+    async def list_by_order(self, order_id: int) -> Sequence[Payment]:
+        stmt = (
+            select(Payment)
+            .where(Payment.tenant == self.tenant, Payment.order_id == order_id)
+            .order_by(Payment.paid_at, Payment.id)
+        )
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    async def totals_by_order(self, order_id: int) -> PaymentTotals:
+        stmt = select(
+            func.count(Payment.id),
+            func.coalesce(func.sum(Payment.amount), 0),
+            func.coalesce(
+                func.sum(Payment.amount).filter(
+                    Payment.status == PaymentStatus.COMPLETED
+                ),
+                0,
+            ),
+        ).where(Payment.tenant == self.tenant, Payment.order_id == order_id)
+        row = (await self.session.execute(stmt)).one()
+        return PaymentTotals(*row)
+
     async def create(self, data: PaymentCreate) -> Payment:
-        payment = Payment(**data.model_dump())
+        payment = Payment(tenant=self.tenant, **data.model_dump())
         self.session.add(payment)
         await self.session.commit()
         await self.session.refresh(payment)
         return payment
+
+    async def delete_missing(
+        self, order_ids: List[int], keep_ids: List[int]
+    ) -> List[datetime]:
+        """
+        Delete payments of `order_ids` that are not in `keep_ids` (no commit).
+
+        Returns the `paid_at` of the deleted payments.
+        """
+        if not order_ids:
+            return []
+        stmt = delete(Payment).where(
+            Payment.tenant == self.tenant, Payment.order_id.in_(order_ids)
+        )
+        if keep_ids:
+            stmt = stmt.where(Payment.id.not_in(keep_ids))
+        result = await self.session.execute(stmt.returning(Payment.paid_at))
+        return list(result.scalars().all())
+
+    async def upsert_many(self, rows: List[Dict[str, Any]]) -> List[datetime]:
+        """
+        Insert or refresh payments mirrored from RetailCRM (no commit).
+
+        Returns the `paid_at` of the payments inserted, changed or moved (old
+        and new), leaving out those that were already up to date.
+        """
+        if not rows:
+            return []
+        # paid_at is the partition key: a payment whose paid_at changed
+        # upstream is deleted and inserted again, which the change feed
+        # reports as an update.
+        async with moving_rows(self.session):
+            result = await self.session.execute(
+                delete(Payment)
+                .where(
+                    Payment.tenant == self.tenant,
+                    Payment.id.in_([r["id"] for r in rows]),
+                    tuple_(Payment.id, Payment.paid_at).not_in(
+                        [(r["id"], r["paid_at"]) for r in rows]
+                    ),
+                )
+                .returning(Payment.id, Payment.paid_at)
+            )
+            moved = dict(result.all())
+            written = await self._upsert([r for r in rows if r["id"] in moved])
+        written += await self._upsert([r for r in rows if r["id"] not in moved])
+        return [*moved.values(), *written]
+
+    async def _upsert(self, rows: List[Dict[str, Any]]) -> List[datetime]:
+        if not rows:
+            return []
+        columns = ("order_id", "amount", "method", "status", "comment")
+        stmt = insert(Payment).values([{**r, "tenant": self.tenant} for r in rows])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Payment.tenant, Payment.id, Payment.paid_at],
+            set_={col: stmt.excluded[col] for col in columns},
+            # Unchanged payments are left alone (and not returned).
+            where=tuple_(*(getattr(Payment, col) for col in columns)).is_distinct_from(
+                tuple_(*(stmt.excluded[col] for col in columns))
+            ),
+        )
+        result = await self.session.execute(stmt.returning(Payment.paid_at))
+        return list(result.scalars().all())
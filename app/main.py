@@ -1,19 +1,157 @@
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
-from starlette.responses import RedirectResponse
+from starlette.responses import PlainTextResponse, RedirectResponse
 
-from app.api import api_router
+from app.core.admission import AdmissionMiddleware
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.deadline import DeadlineMiddleware
+from app.core.loop_monitor import LoopMonitor
+from app.core.tenant import TenantMiddleware
+from app.core.metrics import MetricsMiddleware, collect, registry, render_prometheus
+
+
+async def _flush_metrics_periodically() -> None:
+    while True:
+        await asyncio.sleep(settings.metrics_flush_interval)
+        registry.flush(settings.metrics_dir)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    from app.cache import get_cache
+    from app.db.database import db
+    from app.db.partitions import maintain_periodically
+    from app.services.catalog import CatalogIndexes
+    from app.services.events import EventBroker
+    from app.services.prewarm import Prewarmer
+    from app.services.retailcrm_client import RetailCRMClients
+
+    monitor = None
+    if settings.loop_monitor_enabled:
+        # Started first so that every task created below is accounted.
+        monitor = LoopMonitor(
+            interval=settings.loop_monitor_interval,
+            slow_threshold=settings.loop_slow_callback_threshold,
+            task_accounting=settings.loop_task_accounting,
+            publish_interval=settings.metrics_flush_interval,
+        )
+        monitor.start(asyncio.get_running_loop())
+    registry.flush(settings.metrics_dir)
+    flusher = asyncio.create_task(_flush_metrics_periodically())
+    cache = get_cache()
+    await cache.start()
+    app.state.crm_clients = RetailCRMClients(cache)
+    app.state.catalogs = CatalogIndexes(db)
+    app.state.events = EventBroker(
+        db,
+        queue_size=settings.events_queue_size,
+        retention=settings.events_retention,
+        purge_interval=settings.events_purge_interval,
+        replay_batch=settings.events_replay_batch,
+        replay_margin=settings.events_replay_margin,
+        listen_check_interval=settings.db_listen_check_interval,
+    )
+    await app.state.events.start()
+    partitions = asyncio.create_task(
+        maintain_periodically(db, settings.partition_maintenance_interval)
+    )
+    catalog_refresher = asyncio.create_task(
+        app.state.catalogs.refresh_periodically(settings.catalog_refresh_interval)
+    )
+    app.state.prewarmer = None
+    prewarming = None
+    if settings.prewarm_enabled:
+        app.state.prewarmer = Prewarmer(
+            app.state.crm_clients,
+            db,
+            top_k=settings.prewarm_top_k,
+            interval=settings.prewarm_interval,
+            budget_share=settings.prewarm_budget_share,
+            sketch_width=settings.prewarm_sketch_width,
+            sketch_depth=settings.prewarm_sketch_depth,
+        )
+        prewarming = asyncio.create_task(app.state.prewarmer.run_periodically())
+    try:
+        yield
+    finally:
+        if prewarming is not None:
+            prewarming.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await prewarming
+        catalog_refresher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await catalog_refresher
+        partitions.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await partitions
+        await app.state.events.stop()
+        await app.state.crm_clients.aclose()
+        await cache.stop()
+        await db.dispose()
+        flusher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await flusher
+        if monitor is not None:
+            await monitor.stop()
+        registry.flush(settings.metrics_dir)
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title=settings.project_name, debug=settings.debug)
-    app.include_router(api_router)
+    from app.api import api_router
+
+    app = FastAPI(title=settings.project_name, debug=settings.debug, lifespan=lifespan)
+    if settings.admission_enabled:
+        # Innermost: sees tenant-rewritten paths and waits within the deadline.
+        app.add_middleware(
+            AdmissionMiddleware,
+            groups=settings.admission_groups,
+            api_prefix=settings.api_prefix,
+            prioritize_writes=settings.admission_prioritize_writes,
+        )
+    app.add_middleware(
+        DeadlineMiddleware,
+        default_timeout=settings.request_timeout,
+        max_timeout=settings.request_timeout_max,
+        # Exports and the change feed stream for as long as the client reads.
+        route_timeouts={
+            f"{settings.api_prefix}/customers/export": 0,
+            f"{settings.api_prefix}/events": 0,
+            **settings.route_timeouts,
+        },
+    )
+    # Outside the deadline so that route timeouts match rewritten paths.
+    app.add_middleware(TenantMiddleware, api_prefix=settings.api_prefix)
+    if settings.compression_enabled:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_minimum_size,
+            gzip_level=settings.compression_gzip_level,
+            brotli_quality=settings.compression_brotli_quality,
+        )
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(api_router, prefix=settings.api_prefix)
 
     @app.get("/", include_in_schema=False)
     async def root() -> RedirectResponse:
         return RedirectResponse(url="/docs")
 
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> PlainTextResponse:
+        registry.flush(settings.metrics_dir)
+        return PlainTextResponse(render_prometheus(collect(settings.metrics_dir)))
+
     return app
 
 
-app = create_app()
+def __getattr__(name: str) -> FastAPI:
+    # `app.main:app` is built on first access rather than at import time.
+    if name == "app":
+        app = create_app()
+        globals()["app"] = app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,48 @@
+import enum
+from datetime import datetime
+from typing import List
+
+from pydantic import Field
+
+from app.db.models import PaymentMethod, PaymentStatus
+from .base import CamelModel
+
+
+class Granularity(str, enum.Enum):
+    DAY = "day"
+    WEEK = "week"
+
+
+class RevenueBucket(CamelModel):
+    period_start: datetime = Field(..., description="Start of the day / ISO week")
+    revenue: float = Field(..., description="Sum of completed payments")
+    payments_count: int = Field(..., description="Number of completed payments")
+
+
+class RevenueReport(CamelModel):
+    granularity: Granularity
+    date_from: datetime
+    date_to: datetime
+    total_revenue: float
+    buckets: List[RevenueBucket]
+
+
+class PaymentBreakdownRow(CamelModel):
+    method: PaymentMethod
+    status: PaymentStatus
+    payments_count: int
+    amount: float
+
+
+class PaymentBreakdown(CamelModel):
+    date_from: datetime
+    date_to: datetime
+    rows: List[PaymentBreakdownRow]
+
+
+class AverageOrderValue(CamelModel):
+    date_from: datetime
+    date_to: datetime
+    orders_count: int = Field(..., description="Orders with a completed payment")
+    revenue: float
+    average_order_value: float
@@ -0,0 +1,15 @@
+from decimal import Decimal
+from typing import Optional
+
+from pydantic import Field
+
+from .base import CamelModel
+
+
+class OfferRead(CamelModel):
+    id: int
+    product_id: int
+    name: str
+    sku: Optional[str] = None
+    price: Optional[Decimal] = Field(None, description="Catalog unit price")
+    active: bool
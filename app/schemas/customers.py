@@ -47,7 +47,7 @@ class CustomerRead(CustomerBase):
     )
 
 
-class CustomerFilter(CamelModel):
+class CustomerQuery(CamelModel):
 
     first_name: Optional[str] = Field(
         None,
@@ -69,6 +69,10 @@ class CustomerFilter(CamelModel):
         description="Filter ‘registered <=’ (ISO-8601).",
         examples=["2025-12-31T23:59:59"],
     )
+
+
+class CustomerFilter(CustomerQuery):
+
     page: int = Field(
         1,
         ge=1,
@@ -0,0 +1,57 @@
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import Field
+
+from .base import CamelModel
+
+
+class QueryOrder(str, Enum):
+    TOTAL = "total"
+    MEAN = "mean"
+    MAX = "max"
+    CALLS = "calls"
+
+
+class QueryStats(CamelModel):
+    statement: str = Field(..., description="Normalized statement text.")
+    calls: int
+    total_seconds: float
+    mean_seconds: float
+    max_seconds: float
+    rows: int = Field(..., description="Rows returned or affected, summed.")
+    plan: Optional[str] = Field(
+        None, description="EXPLAIN (ANALYZE, BUFFERS) of the slowest call."
+    )
+
+
+class QueryProfile(CamelModel):
+    pid: int = Field(..., description="Worker process the profile belongs to.")
+    slow_threshold_seconds: float
+    statements: List[QueryStats]
+
+
+class MemoryGrouping(str, Enum):
+    LINENO = "lineno"
+    FILENAME = "filename"
+    TRACEBACK = "traceback"
+
+
+class AllocationSite(CamelModel):
+    site: str = Field(
+        ..., description="file:line, file, or traceback (innermost frame last)."
+    )
+    size_bytes: int
+    count: int
+    size_diff_bytes: Optional[int] = Field(
+        None, description="Growth since the baseline (diffs only)."
+    )
+    count_diff: Optional[int] = None
+
+
+class MemoryReport(CamelModel):
+    pid: int = Field(..., description="Worker process the report belongs to.")
+    tracing: bool
+    traced_bytes: int
+    peak_bytes: int
+    sites: List[AllocationSite] = []
@@ -0,0 +1,18 @@
+from datetime import datetime
+from enum import Enum
+
+from .base import CamelModel
+
+
+class EventEntity(str, Enum):
+    CUSTOMER = "customer"
+    ORDER = "order"
+    PAYMENT = "payment"
+
+
+class EventRead(CamelModel):
+    id: int
+    entity: EventEntity
+    entity_id: int
+    action: str
+    occurred_at: datetime
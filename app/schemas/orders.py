@@ -1,15 +1,32 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import List
+from typing import List, Optional
 
-from pydantic import Field
+from pydantic import Field, model_validator
 
 from .base import CamelModel
 
 
 class ProductItem(CamelModel):
+    offer_id: Optional[int] = Field(
+        None, ge=1, description="Catalog offer the item refers to"
+    )
+    sku: Optional[str] = Field(
+        None, max_length=100, description="Offer SKU, alternative to offerId"
+    )
     quantity: int = Field(..., ge=1, description="Item quantity (≥ 1)")
-    price: Decimal = Field(..., ge=0, description="Unit price in the order currency")
+    price: Optional[Decimal] = Field(
+        None,
+        ge=0,
+        description="Unit price in the order currency; catalog items are "
+        "priced from the catalog",
+    )
+
+    @model_validator(mode="after")
+    def _require_price_or_offer(self) -> "ProductItem":
+        if self.price is None and self.offer_id is None and self.sku is None:
+            raise ValueError("price is required for items without offerId or sku")
+        return self
 
 
 class OrderCreate(CamelModel):
@@ -1,8 +1,9 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import Field
 
+from app.db.models import PaymentMethod, PaymentStatus
 from .base import CamelModel
 
 
@@ -21,3 +22,13 @@ class PaymentRead(CamelModel):
     amount: float
     comment: Optional[str] = None
     created_at: datetime = Field(..., alias="createdAt")
+    status: Optional[PaymentStatus] = None
+    method: Optional[PaymentMethod] = None
+
+
+class OrderPayments(CamelModel):
+    order_id: int = Field(..., alias="orderId")
+    payments: List[PaymentRead]
+    count: int = Field(..., description="Number of payments recorded locally")
+    total_amount: float = Field(..., description="Sum of all payments")
+    paid_amount: float = Field(..., description="Sum of completed payments")
@@ -0,0 +1,182 @@
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import CacheBackend, get_cache
+from app.core.config import settings
+from app.core.tenant import current_tenant
+from app.db.repository import AnalyticsRepository
+from app.schemas.analytics import (
+    AverageOrderValue,
+    Granularity,
+    PaymentBreakdown,
+    PaymentBreakdownRow,
+    RevenueBucket,
+    RevenueReport,
+)
+
+CACHE_PREFIX = "analytics:"
+
+
+def period_start(moment: datetime, granularity: Granularity) -> datetime:
+    """
+    Start of the day / ISO week containing `moment` (matches `date_trunc`).
+    """
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity is Granularity.WEEK:
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def period_ceil(moment: datetime, granularity: Granularity) -> datetime:
+    """
+    `moment` if it starts a day / ISO week, else the start of the next one.
+    """
+    start = period_start(moment, granularity)
+    if start == moment:
+        return start
+    return start + timedelta(days=7 if granularity is Granularity.WEEK else 1)
+
+
+async def invalidate_closed_periods(
+    paid_at: Iterable[datetime],
+    tenant: Optional[str] = None,
+    cache: Optional[CacheBackend] = None,
+) -> None:
+    """
+    Drop the tenant's cached reports if any of the payments written (paid at
+    these times) falls into a closed day.
+
+    On the shared cache the deletion is broadcast to every worker.
+    """
+    today = period_start(datetime.now(), Granularity.DAY)
+    if not any(moment.replace(tzinfo=None) < today for moment in paid_at):
+        return
+    cache = cache if cache is not None else get_cache()
+    await cache.delete_prefix(f"{CACHE_PREFIX}{tenant or current_tenant()}:")
+
+
+class AnalyticsService:
+    """
+    Revenue and payment reports over the local tables.
+
+    Periods that ended before the current day / week are cached for
+    `analytics_closed_period_ttl` seconds; only the open period is
+    recomputed on every call. Late writes into closed days (mirrored status
+    changes, reconciliation repairs) drop the cache through
+    `invalidate_closed_periods`.
+    """
+
+    def __init__(self, session: AsyncSession, cache: CacheBackend) -> None:
+        self.repo = AnalyticsRepository(session)
+        self.cache = cache
+
+    async def _cached(self, key: str, produce: Callable[[], Awaitable[Any]]) -> Any:
+        key = f"{CACHE_PREFIX}{current_tenant()}:{key}"
+        value = await self.cache.get(key)
+        if value is None:
+            value = await produce()
+            await self.cache.set(key, value, settings.analytics_closed_period_ttl)
+        return value
+
+    async def _buckets(
+        self, granularity: Granularity, date_from: datetime, date_to: datetime
+    ) -> List[dict]:
+        rows = await self.repo.revenue_buckets(granularity.value, date_from, date_to)
+        return [
+            RevenueBucket(
+                period_start=start, revenue=revenue, payments_count=count
+            ).model_dump(mode="json")
+            for start, revenue, count in rows
+        ]
+
+    async def revenue(
+        self, granularity: Granularity, date_from: datetime, date_to: datetime
+    ) -> RevenueReport:
+        boundary = period_start(datetime.now(), granularity)
+        closed_to = min(date_to, boundary)
+        # Only whole closed periods are cached, keyed by period boundaries;
+        # partial periods at either end are computed on every call.
+        cached_from = period_ceil(date_from, granularity)
+        cached_to = max(period_start(closed_to, granularity), cached_from)
+        raw: List[dict] = []
+        if date_from < min(cached_from, date_to):
+            raw += await self._buckets(
+                granularity, date_from, min(cached_from, date_to)
+            )
+        if cached_from < cached_to:
+            raw += await self._cached(
+                f"revenue:{granularity.value}:"
+                f"{cached_from.isoformat()}:{cached_to.isoformat()}",
+                lambda: self._buckets(granularity, cached_from, cached_to),
+            )
+        if max(cached_to, date_from) < date_to:
+            raw += await self._buckets(granularity, max(cached_to, date_from), date_to)
+
+        buckets = [RevenueBucket.model_validate(b) for b in raw]
+        return RevenueReport(
+            granularity=granularity,
+            date_from=date_from,
+            date_to=date_to,
+            total_revenue=sum(b.revenue for b in buckets),
+            buckets=buckets,
+        )
+
+    async def _closed_or_fresh(
+        self,
+        key: str,
+        date_from: datetime,
+        date_to: datetime,
+        produce: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Cached under `<key>:<from>:<to>` when the range is whole closed days
+        (totals over other ranges cannot be pieced together from cached
+        ones), else computed.
+        """
+        if (
+            date_to <= period_start(datetime.now(), Granularity.DAY)
+            and period_start(date_from, Granularity.DAY) == date_from
+            and period_start(date_to, Granularity.DAY) == date_to
+        ):
+            return await self._cached(
+                f"{key}:{date_from.isoformat()}:{date_to.isoformat()}", produce
+            )
+        return await produce()
+
+    async def payment_breakdown(
+        self, date_from: datetime, date_to: datetime
+    ) -> PaymentBreakdown:
+        async def produce() -> List[dict]:
+            rows = await self.repo.payment_breakdown(date_from, date_to)
+            return [
+                PaymentBreakdownRow(
+                    method=method, status=status, payments_count=count, amount=amount
+                ).model_dump(mode="json")
+                for method, status, count, amount in rows
+            ]
+
+        rows = await self._closed_or_fresh("breakdown", date_from, date_to, produce)
+        return PaymentBreakdown(
+            date_from=date_from,
+            date_to=date_to,
+            rows=[PaymentBreakdownRow.model_validate(r) for r in rows],
+        )
+
+    async def average_order_value(
+        self, date_from: datetime, date_to: datetime
+    ) -> AverageOrderValue:
+        async def produce() -> List[Any]:
+            return list(await self.repo.completed_revenue_by_orders(date_from, date_to))
+
+        orders, revenue = await self._closed_or_fresh(
+            "aov", date_from, date_to, produce
+        )
+        return AverageOrderValue(
+            date_from=date_from,
+            date_to=date_to,
+            orders_count=orders,
+            revenue=revenue,
+            average_order_value=revenue / orders if orders else 0.0,
+        )
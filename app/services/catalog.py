@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+
+from app.core.tenant import current_tenant
+from app.db.database import Database
+from app.db.repository import CatalogRepository
+from app.services.retailcrm_client import RetailCRMClient
+
+logger = logging.getLogger(__name__)
+
+
+def offer_rows(
+    raw_product: Dict[str, Any], synced_at: datetime
+) -> List[Dict[str, Any]]:
+    """
+    Local rows for the offers of one `/store/products` entry.
+    """
+    rows = []
+    for offer in raw_product.get("offers") or []:
+        if not isinstance(offer, dict) or not isinstance(offer.get("id"), int):
+            continue
+        price = offer.get("price")
+        rows.append(
+            {
+                "id": offer["id"],
+                "product_id": raw_product["id"],
+                "name": (offer.get("name") or raw_product.get("name") or "")[:255],
+                "sku": (offer.get("article") or raw_product.get("article") or None),
+                "price": Decimal(str(price)) if price is not None else None,
+                "active": bool(raw_product.get("active", True)),
+                "synced_at": synced_at,
+            }
+        )
+    return rows
+
+
+@dataclass
+class CatalogSyncReport:
+    pages: int = 0
+    offers: int = 0
+    removed: int = 0
+    failed_pages: List[int] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+class CatalogSync:
+    """
+    Copies the complete RetailCRM catalog of one tenant into `catalog_offers`.
+
+    Pages are fetched by `concurrency` workers and upserted as they arrive.
+    Offers not seen by a sync that fetched every page are deleted.
+    """
+
+    def __init__(
+        self,
+        crm: RetailCRMClient,
+        database: Database,
+        page_size: int = 100,
+        concurrency: int = 4,
+    ) -> None:
+        self._crm = crm
+        self._db = database
+        self._page_size = page_size
+        self._concurrency = max(1, concurrency)
+        self.report = CatalogSyncReport()
+
+    async def run(self) -> CatalogSyncReport:
+        started = time.monotonic()
+        synced_at = datetime.now()
+        first = await self._crm.list_products(page=1, limit=self._page_size)
+        total_pages = (first.get("pagination") or {}).get("totalPageCount") or 1
+        await self._store(first, synced_at)
+
+        pages: Iterator[int] = iter(range(2, total_pages + 1))
+
+        async def worker() -> None:
+            for page in pages:
+                try:
+                    data = await self._crm.list_products(
+                        page=page, limit=self._page_size
+                    )
+                    await self._store(data, synced_at)
+                except Exception:
+                    logger.exception("Catalog sync of page %d failed", page)
+                    self.report.failed_pages.append(page)
+
+        await asyncio.gather(*(worker() for _ in range(self._concurrency)))
+
+        if not self.report.failed_pages:
+            async with self._db.session_factory() as session:
+                repo = CatalogRepository(session)
+                self.report.removed = await repo.delete_synced_before(synced_at)
+                await session.commit()
+        self.report.elapsed = time.monotonic() - started
+        return self.report
+
+    async def _store(self, data: Dict[str, Any], synced_at: datetime) -> None:
+        rows: Dict[int, Dict[str, Any]] = {}
+        for product in data.get("products", []):
+            if isinstance(product, dict) and isinstance(product.get("id"), int):
+                rows.update((r["id"], r) for r in offer_rows(product, synced_at))
+        async with self._db.session_factory() as session:
+            await CatalogRepository(session).upsert_many(list(rows.values()))
+            await session.commit()
+        self.report.pages += 1
+        self.report.offers += len(rows)
+
+
+class Offer(NamedTuple):
+    id: int
+    product_id: int
+    name: str
+    sku: Optional[str]
+    price: Optional[Decimal]
+    active: bool
+
+
+class CatalogIndex:
+    """
+    Immutable in-memory view of one tenant's catalog.
+
+    Lookups by offer id and SKU are dict hits; name-prefix search bisects a
+    sorted list of case-folded names.
+    """
+
+    def __init__(self, offers: List[Offer], version: Any = None) -> None:
+        self.version = version
+        self.by_id: Dict[int, Offer] = {o.id: o for o in offers}
+        self.by_sku: Dict[str, Offer] = {o.sku.casefold(): o for o in offers if o.sku}
+        self._names: List[Tuple[str, int]] = sorted(
+            (o.name.casefold(), o.id) for o in offers
+        )
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def get(self, offer_id: int) -> Optional[Offer]:
+        return self.by_id.get(offer_id)
+
+    def get_by_sku(self, sku: str) -> Optional[Offer]:
+        return self.by_sku.get(sku.casefold())
+
+    def search(self, prefix: str, limit: int = 20) -> List[Offer]:
+        prefix = prefix.casefold()
+        found = []
+        i = bisect_left(self._names, (prefix,))
+        while i < len(self._names) and len(found) < limit:
+            name, offer_id = self._names[i]
+            if not name.startswith(prefix):
+                break
+            found.append(self.by_id[offer_id])
+            i += 1
+        return found
+
+
+class CatalogIndexes:
+    """
+    The worker's catalog indexes, one per tenant, loaded on first use.
+
+    `refresh_periodically` reloads a tenant's index only when the table's
+    version (row count, last sync time) changed.
+    """
+
+    def __init__(self, database: Database) -> None:
+        self._db = database
+        self._indexes: Dict[str, CatalogIndex] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def _load(self, tenant: str) -> CatalogIndex:
+        async with self._db.session_factory() as session:
+            repo = CatalogRepository(session, tenant)
+            version = await repo.version()
+            current = self._indexes.get(tenant)
+            if current is not None and current.version == version:
+                return current
+            offers = [
+                Offer(o.id, o.product_id, o.name, o.sku, o.price, o.active)
+                for o in await repo.list_all()
+            ]
+        index = self._indexes[tenant] = CatalogIndex(offers, version)
+        return index
+
+    async def get(self, tenant: Optional[str] = None) -> CatalogIndex:
+        tenant = tenant or current_tenant()
+        index = self._indexes.get(tenant)
+        if index is not None:
+            return index
+        lock = self._locks.setdefault(tenant, asyncio.Lock())
+        async with lock:
+            index = self._indexes.get(tenant)
+            return index if index is not None else await self._load(tenant)
+
+    async def refresh_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            for tenant in list(self._indexes):
+                try:
+                    await self._load(tenant)
+                except Exception:
+                    logger.exception("Reloading the catalog of %s failed", tenant)
@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+from enum import Enum
+from typing import AsyncIterator, Optional, Sequence
+
+from sqlalchemy.engine import Row
+
+from app.core.tenant import current_tenant
+from app.db.database import Database
+from app.db.repository.customer_repository import CustomerRepository
+from app.schemas.customers import CustomerQuery
+
+# Exported columns, in order, with their names in the API (and CSV header).
+COLUMNS = (
+    ("id", "id"),
+    ("first_name", "firstName"),
+    ("last_name", "lastName"),
+    ("email", "email"),
+    ("phone", "phone"),
+    ("registered_at", "registeredAt"),
+)
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+    @property
+    def media_type(self) -> str:
+        if self is ExportFormat.CSV:
+            return "text/csv; charset=utf-8"
+        return "application/x-ndjson"
+
+
+def _csv_chunk(rows: Sequence[Row], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(alias for _, alias in COLUMNS)
+    writer.writerows(
+        (id, first_name, last_name, email, phone, registered_at.isoformat())
+        for id, first_name, last_name, email, phone, registered_at in rows
+    )
+    return buffer.getvalue().encode()
+
+
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def _ndjson_chunk(rows: Sequence[Row]) -> bytes:
+    return "".join(
+        _dumps(
+            {
+                "id": id,
+                "firstName": first_name,
+                "lastName": last_name,
+                "email": email,
+                "phone": phone,
+                "registeredAt": registered_at.isoformat(),
+            }
+        )
+        + "\n"
+        for id, first_name, last_name, email, phone, registered_at in rows
+    ).encode()
+
+
+class CustomerExport:
+    """
+    Streams the tenant's local customers as CSV or NDJSON.
+
+    Rows come from a server-side cursor `batch_size` at a time and each batch
+    is encoded into one chunk, so memory stays flat whatever the row count;
+    the next batch is only fetched once the previous chunk has been sent.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        filters: CustomerQuery,
+        fmt: ExportFormat,
+        batch_size: int,
+        tenant: Optional[str] = None,
+    ) -> None:
+        self.database = database
+        self.filters = filters
+        self.format = fmt
+        self.batch_size = batch_size
+        self.tenant = tenant or current_tenant()
+
+    @property
+    def filename(self) -> str:
+        return f"customers-{self.tenant}.{self.format.value}"
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        # A session of its own: the request's session is closed once the
+        # handler returns, before the body is streamed.
+        async with self.database.session_factory() as session:
+            repository = CustomerRepository(session, self.tenant)
+            encode = _csv_chunk if self.format is ExportFormat.CSV else _ndjson_chunk
+            if self.format is ExportFormat.CSV:
+                yield _csv_chunk((), header=True)
+            async for rows in repository.stream(
+                [name for name, _ in COLUMNS], self.filters, self.batch_size
+            ):
+                yield encode(rows)
@@ -0,0 +1,68 @@
+import hashlib
+import json
+from typing import Optional
+
+from app.cache import CacheBackend, get_cache
+from app.core.metrics import registry
+from app.core.tenant import current_tenant
+from app.schemas.customers import CustomerFilter
+from app.services.retailcrm_client import CACHE_PREFIX as CRM_CACHE_PREFIX
+
+# Pages are stored as lists of `records.CustomerRow`.
+CACHE_PREFIX = "customers:page:"
+# ETags of the list responses are remembered under this key prefix.
+ETAG_KEY_PREFIX = "customers:"
+
+list_cache_requests = registry.counter(
+    "customer_list_cache_requests_total",
+    "Customer list response cache lookups by result.",
+)
+
+
+def normalize_filter(filters: CustomerFilter) -> CustomerFilter:
+    """
+    The filter with equivalent spellings collapsed (name case and spacing,
+    e-mail case, blank values), as sent upstream and used as the cache key.
+    """
+    name = " ".join((filters.first_name or "").split()).casefold()
+    return filters.model_copy(
+        update={
+            "first_name": name or None,
+            "email": filters.email.lower() if filters.email else None,
+        }
+    )
+
+
+def filter_key(filters: CustomerFilter) -> str:
+    """
+    Short stable key of a normalized filter.
+    """
+    canonical = json.dumps(filters.model_dump(mode="json"), sort_keys=True)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+def etag_key(filters: CustomerFilter) -> str:
+    return f"{ETAG_KEY_PREFIX}{filter_key(filters)}"
+
+
+def list_cache_key(filters: CustomerFilter, tenant: Optional[str] = None) -> str:
+    return f"{CACHE_PREFIX}{tenant or current_tenant()}:{filter_key(filters)}"
+
+
+async def invalidate_customer_lists(
+    tenant: Optional[str] = None, cache: Optional[CacheBackend] = None
+) -> None:
+    """
+    Drop the tenant's cached customer lists, the upstream pages behind them
+    and the ETags served for them.
+
+    On the shared cache the deletion is broadcast to every worker.
+    """
+    # Imported here: app.api imports this module.
+    from app.api.responses import invalidate_etags
+
+    tenant = tenant or current_tenant()
+    cache = cache if cache is not None else get_cache()
+    await cache.delete_prefix(f"{CACHE_PREFIX}{tenant}:")
+    await cache.delete_prefix(f"{CRM_CACHE_PREFIX}{tenant}:GET:/customers?")
+    await invalidate_etags(ETAG_KEY_PREFIX, tenant, cache)
@@ -1,15 +1,48 @@
-from typing import List
+from typing import List, Optional
 
 from fastapi import HTTPException, status
 from httpx import HTTPError, HTTPStatusError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import CacheBackend, get_cache
+from app.core.config import settings
+from app.core.phone import normalize_phone
+from app.db.models import Customer
+from app.db.repository import CustomerRepository
+from app.schemas.base import trusted
 from app.schemas.customers import CustomerCreate, CustomerFilter, CustomerRead
+from app.services.customer_lists import (
+    list_cache_key,
+    list_cache_requests,
+    normalize_filter,
+)
+from app.services.mirror import LocalMirror
+from app.services.records import pack_customer, unpack_customer
 from app.services.retailcrm_client import RetailCRMClient
 
 
 class CustomerService:
-    def __init__(self, crm: RetailCRMClient) -> None:
+    def __init__(
+        self,
+        crm: RetailCRMClient,
+        session: AsyncSession,
+        cache: Optional[CacheBackend] = None,
+    ) -> None:
         self._crm = crm
+        self._session = session
+        self._cache = cache if cache is not None else get_cache()
+
+    @staticmethod
+    def _from_row(customer: Customer) -> CustomerRead:
+        return trusted(
+            CustomerRead,
+            id=customer.id,
+            first_name=customer.first_name,
+            last_name=customer.last_name,
+            email=customer.email,
+            phone=customer.phone,
+            registered_at=customer.registered_at,
+        )
 
     def _map_customer(self, raw: dict) -> CustomerRead:
         phones = raw.get("phones") or []
@@ -31,6 +64,21 @@ class CustomerService:
         return CustomerRead.model_validate(mapped)
 
     async def list(self, filters: CustomerFilter) -> List[CustomerRead]:
+        """
+        One page of customers matching `filters`.
+
+        Results are cached under the normalized filter for
+        `customer_list_cache_ttl` seconds; customer writes (`create`, local
+        mirror updates) drop the tenant's cached lists.
+        """
+        filters = normalize_filter(filters)
+        key = list_cache_key(filters)
+        cached = await self._cache.get(key)
+        if cached is not None:
+            list_cache_requests.inc(result="hit")
+            return [unpack_customer(row) for row in cached]
+        list_cache_requests.inc(result="miss")
+
         try:
             resp = await self._crm.get_customers(
                 name=filters.first_name,
@@ -58,6 +106,11 @@ class CustomerService:
                 result.append(self._map_customer(raw))
             except Exception:
                 continue
+        await self._cache.set(
+            key,
+            [pack_customer(c) for c in result],
+            settings.customer_list_cache_ttl,
+        )
         return result
 
     async def create(self, payload: CustomerCreate) -> CustomerRead:
@@ -96,4 +149,58 @@ class CustomerService:
             )
 
         raw = full.get("customer", {})
+        await LocalMirror(self._session).write_customers([raw])
         return self._map_customer(raw)
+
+    async def lookup(
+        self, email: Optional[str] = None, phone: Optional[str] = None
+    ) -> CustomerRead:
+        """
+        Find a customer by exact e-mail or phone.
+
+        Served from the local unique/E.164 indexes; RetailCRM is queried only
+        on a local miss, and a hit there is written through for next time.
+        """
+        repo = CustomerRepository(self._session)
+        phone_e164 = None
+        if phone is not None:
+            phone_e164 = normalize_phone(phone, settings.default_phone_country_code)
+            if phone_e164 is None:
+                raise HTTPException(
+                    status.HTTP_400_BAD_REQUEST, detail=f"Invalid phone: {phone}"
+                )
+            local = await repo.get_by_phone(phone_e164)
+        else:
+            local = await repo.get_by_email(email)
+        if local is not None and local.email:
+            return self._from_row(local)
+
+        try:
+            # RetailCRM has no dedicated phone filter for customers; its
+            # `filter[name]` matches the name or any phone number, so the
+            # candidates are re-checked on their E.164 numbers below.
+            resp = await self._crm.get_customers(
+                name=phone_e164, email=email, page=1, limit=20
+            )
+        except HTTPError as exc:
+            raise HTTPException(
+                status.HTTP_502_BAD_GATEWAY, detail=f"Failed to look up customer: {exc}"
+            )
+
+        for raw in resp.get("customers", []):
+            if email is not None and (raw.get("email") or "").lower() != email.lower():
+                continue
+            if phone_e164 is not None and phone_e164 not in {
+                normalize_phone(p.get("number"), settings.default_phone_country_code)
+                for p in raw.get("phones") or []
+                if isinstance(p, dict)
+            }:
+                continue
+            try:
+                found = self._map_customer(raw)
+            except Exception:
+                continue
+            await LocalMirror(self._session).write_customers([raw])
+            return found
+
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Customer not found")
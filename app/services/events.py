@@ -0,0 +1,264 @@
+import asyncio
+import collections
+import contextlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, FrozenSet, Iterator, Optional, Set
+
+from sqlalchemy import delete, select
+
+from app.core.metrics import registry
+from app.db.database import Database
+from app.db.listener import Listener
+from app.db.models import ChangeEvent
+from app.schemas.base import trusted
+from app.schemas.events import EventEntity, EventRead
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL = "change_events"
+
+event_subscribers = registry.gauge("event_subscribers", "Open change feed streams.")
+event_subscribers_dropped = registry.counter(
+    "event_subscribers_dropped_total",
+    "Change feed streams closed because the client fell behind.",
+)
+event_listener_reconnects = registry.counter(
+    "event_listener_reconnects_total",
+    "Change feed LISTEN connections replaced after being lost.",
+)
+
+
+class Subscription:
+    """
+    One feed client: a bounded queue of the tenant's live events.
+
+    A client that lets the queue fill up is dropped (`overflowed`) rather
+    than buffered without bound; it resumes from the log on reconnect, as
+    do the clients of a `closed` subscription.
+    """
+
+    def __init__(
+        self, tenant: str, entities: FrozenSet[EventEntity], queue_size: int
+    ) -> None:
+        self.tenant = tenant
+        self.entities = entities
+        self.queue: "asyncio.Queue[EventRead]" = asyncio.Queue(queue_size)
+        self.overflowed = False
+        self.closed = asyncio.Event()
+
+    def offer(self, event: EventRead) -> bool:
+        if self.entities and event.entity not in self.entities:
+            return True
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            return False
+        return True
+
+
+class EventBroker:
+    """
+    Per-worker fan-out of the change feed.
+
+    The `change_events` log is written by database triggers, which also
+    `NOTIFY change_events` on commit; each worker keeps one `LISTEN`
+    connection and hands every notification to the subscriptions of its
+    tenant. Clients that reconnect with the last id they saw are replayed
+    the logged events after it first, for `retention` seconds of history;
+    when the `LISTEN` connection had to be replaced, all streams are closed
+    so that their clients do.
+
+    Ids are taken when a change is made, not when it commits, so an event
+    of a long transaction can be delivered after events with higher ids.
+    Replays therefore start `replay_margin` ids before the last one seen:
+    delivery is at least once, and clients skip ids they have handled.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        queue_size: int = 1000,
+        retention: float = 24 * 3600.0,
+        purge_interval: float = 300.0,
+        replay_batch: int = 500,
+        replay_margin: int = 1000,
+        listen_check_interval: float = 30.0,
+    ) -> None:
+        self._db = database
+        self.queue_size = queue_size
+        self.retention = retention
+        self.purge_interval = purge_interval
+        self.replay_batch = replay_batch
+        self.replay_margin = replay_margin
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._listener = Listener(
+            database,
+            EVENTS_CHANNEL,
+            self._on_notify,
+            check_interval=listen_check_interval,
+            on_reconnect=self._on_reconnect,
+        )
+        self._purger: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        await self._listener.start()
+        self._purger = asyncio.create_task(self._purge_periodically())
+
+    async def stop(self) -> None:
+        if self._purger is not None:
+            self._purger.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._purger
+            self._purger = None
+        await self._listener.stop()
+
+    async def _purge_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.purge_interval)
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.retention)
+            try:
+                async with self._db.engine.begin() as conn:
+                    await conn.execute(
+                        delete(ChangeEvent).where(ChangeEvent.occurred_at < cutoff)
+                    )
+            except Exception:
+                logger.exception("Failed to purge old change events")
+
+    def _publish_count(self) -> None:
+        event_subscribers.set(sum(len(s) for s in self._subscribers.values()))
+
+    def _on_reconnect(self) -> None:
+        event_listener_reconnects.inc()
+        for subscribers in list(self._subscribers.values()):
+            for subscription in list(subscribers):
+                subscription.closed.set()
+                self._unsubscribe(subscription)
+
+    def _on_notify(self, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+            tenant = data.pop("tenant")
+            event = EventRead.model_validate(data)
+        except (ValueError, KeyError):
+            logger.warning("Ignoring malformed change event: %s", payload)
+            return
+        subscribers = self._subscribers.get(tenant, ())
+        for subscription in [s for s in subscribers if not s.offer(event)]:
+            self._unsubscribe(subscription)
+            event_subscribers_dropped.inc()
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.tenant)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.tenant]
+        self._publish_count()
+
+    @contextlib.contextmanager
+    def subscribe(
+        self, tenant: str, entities: FrozenSet[EventEntity] = frozenset()
+    ) -> Iterator[Subscription]:
+        subscription = Subscription(tenant, entities, self.queue_size)
+        self._subscribers.setdefault(tenant, set()).add(subscription)
+        self._publish_count()
+        try:
+            yield subscription
+        finally:
+            self._unsubscribe(subscription)
+
+    async def replay(
+        self,
+        tenant: str,
+        after: int,
+        entities: FrozenSet[EventEntity] = frozenset(),
+    ) -> AsyncIterator[EventRead]:
+        """
+        Logged events of the tenant with ids above `after`, in id order.
+        """
+        while True:
+            stmt = (
+                select(
+                    ChangeEvent.id,
+                    ChangeEvent.entity,
+                    ChangeEvent.entity_id,
+                    ChangeEvent.action,
+                    ChangeEvent.occurred_at,
+                )
+                .where(ChangeEvent.tenant == tenant, ChangeEvent.id > after)
+                .order_by(ChangeEvent.id)
+                .limit(self.replay_batch)
+            )
+            if entities:
+                stmt = stmt.where(ChangeEvent.entity.in_([e.value for e in entities]))
+            async with self._db.engine.connect() as conn:
+                rows = (await conn.execute(stmt)).all()
+            for row in rows:
+                yield trusted(
+                    EventRead,
+                    id=row.id,
+                    entity=EventEntity(row.entity),
+                    entity_id=row.entity_id,
+                    action=row.action,
+                    occurred_at=row.occurred_at,
+                )
+            if len(rows) < self.replay_batch:
+                return
+            after = rows[-1].id
+
+    async def events(
+        self,
+        tenant: str,
+        entities: FrozenSet[EventEntity] = frozenset(),
+        after: Optional[int] = None,
+        heartbeat: float = 15.0,
+    ) -> AsyncIterator[Optional[EventRead]]:
+        """
+        The feed of one client: events after `after` (less the replay
+        margin) from the log, then live ones; `None` every `heartbeat`
+        seconds without any. Ends when the client falls behind by more than
+        the queue holds, or when the subscription is closed.
+        """
+        with self.subscribe(tenant, entities) as subscription:
+            # Events committed during the replay are both replayed and
+            # queued; at most a queue's worth, all near the end of the replay.
+            recent: "collections.deque[int]" = collections.deque(maxlen=self.queue_size)
+            if after is not None:
+                start = max(0, after - self.replay_margin)
+                async for event in self.replay(tenant, start, entities):
+                    recent.append(event.id)
+                    yield event
+            replayed = set(recent)
+            # One pending get across heartbeats, so no event is lost to a
+            # timeout racing its delivery.
+            getter: Optional["asyncio.Future[EventRead]"] = None
+            closed = asyncio.ensure_future(subscription.closed.wait())
+            try:
+                while True:
+                    if getter is None:
+                        if subscription.overflowed and subscription.queue.empty():
+                            return
+                        getter = asyncio.ensure_future(subscription.queue.get())
+                    done, _ = await asyncio.wait(
+                        {getter, closed},
+                        timeout=heartbeat,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    if closed in done:
+                        # Resumed from the log, by id, on reconnect.
+                        return
+                    if not done:
+                        yield None
+                        continue
+                    event, getter = getter.result(), None
+                    if event.id in replayed:
+                        replayed.discard(event.id)
+                        continue
+                    yield event
+            finally:
+                closed.cancel()
+                if getter is not None:
+                    getter.cancel()
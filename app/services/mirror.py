@@ -0,0 +1,224 @@
+import logging
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.phone import normalize_phone
+from app.db.models import Customer, Order, Payment, PaymentMethod, PaymentStatus
+from app.db.repository import CustomerRepository, OrderRepository, PaymentRepository
+from app.services.analytics_service import invalidate_closed_periods
+from app.services.customer_lists import invalidate_customer_lists
+
+logger = logging.getLogger(__name__)
+
+_FAILED_PAYMENT_STATUSES = {"fail", "canceled", "returned", "credit-check-failed"}
+
+# Upper bound (exclusive) of `payments.amount`.
+_AMOUNT_LIMIT = Decimal(10) ** (
+    Payment.amount.type.precision - Payment.amount.type.scale
+)
+
+
+def parse_crm_datetime(value: Any) -> Optional[datetime]:
+    """
+    Parse RetailCRM timestamps (`2025-04-24 18:35:18`).
+    """
+    if isinstance(value, datetime):
+        return value
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def map_payment_status(code: Optional[str]) -> PaymentStatus:
+    if code == "paid":
+        return PaymentStatus.COMPLETED
+    if code in _FAILED_PAYMENT_STATUSES:
+        return PaymentStatus.FAILED
+    return PaymentStatus.PENDING
+
+
+def map_payment_method(code: Optional[str]) -> PaymentMethod:
+    code = (code or "").lower()
+    if "cash" in code:
+        return PaymentMethod.CASH
+    if "card" in code:
+        return PaymentMethod.CREDIT_CARD
+    return PaymentMethod.OTHER
+
+
+def payments_of(raw_order: Dict[str, Any]) -> List[Dict[str, Any]]:
+    block = raw_order.get("payments") or {}
+    if isinstance(block, dict):
+        return [p for p in block.values() if isinstance(p, dict)]
+    return [p for p in block if isinstance(p, dict)]
+
+
+def _clip(value: Optional[str], column) -> Optional[str]:
+    return value[: column.type.length] if value else value
+
+
+def _fitting(value: Optional[str], column) -> Optional[str]:
+    return value if value and len(value) <= column.type.length else None
+
+
+def customer_row(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Row of a customer document. Text is cut to the column widths; an e-mail
+    or phone too long to store whole is dropped (the phone in favour of its
+    E.164 form when that fits).
+    """
+    phones = raw.get("phones") or []
+    phone = phones[0].get("number") if phones and isinstance(phones[0], dict) else None
+    phone_e164 = normalize_phone(phone, settings.default_phone_country_code)
+    return {
+        "id": raw["id"],
+        "first_name": _clip(raw.get("firstName"), Customer.first_name) or "",
+        "last_name": _clip(raw.get("lastName"), Customer.last_name),
+        "email": _fitting(raw.get("email"), Customer.email),
+        "phone": _fitting(phone, Customer.phone) or phone_e164,
+        "phone_e164": phone_e164,
+        "registered_at": parse_crm_datetime(raw.get("createdAt")) or datetime.now(),
+    }
+
+
+def mirrorable(raw_order: Dict[str, Any]) -> bool:
+    """
+    Whether an order document can be stored: its `createdAt` is part of the
+    (partition and primary) key, so without it a re-mirror could not find
+    the row it wrote before.
+    """
+    return (
+        isinstance(raw_order.get("id"), int)
+        and isinstance((raw_order.get("customer") or {}).get("id"), int)
+        and parse_crm_datetime(raw_order.get("createdAt")) is not None
+    )
+
+
+def order_row(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Row of a `mirrorable` order document.
+    """
+    return {
+        "id": raw["id"],
+        "order_number": _clip(raw.get("number"), Order.order_number) or str(raw["id"]),
+        "created_at": parse_crm_datetime(raw["createdAt"]),
+        "customer_id": raw["customer"]["id"],
+    }
+
+
+def payment_row(raw: Dict[str, Any], order: Dict[str, Any]) -> Dict[str, Any]:
+    # The order's creation time: stable across re-mirrors, like the key.
+    paid_at = parse_crm_datetime(raw.get("paidAt")) or parse_crm_datetime(
+        order["createdAt"]
+    )
+    return {
+        "id": raw["id"],
+        "order_id": order["id"],
+        "amount": Decimal(str(raw.get("amount") or raw.get("sum") or 0)),
+        "method": map_payment_method(raw.get("type")),
+        "status": map_payment_status(raw.get("status")),
+        "paid_at": paid_at,
+        "comment": _clip(raw.get("comment"), Payment.comment),
+    }
+
+
+def payment_rows(raw_order: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Rows of the payments of an order that can be stored: RetailCRM allows
+    zero amounts, `payments` does not.
+    """
+    rows = (
+        payment_row(p, raw_order)
+        for p in payments_of(raw_order)
+        if isinstance(p.get("id"), int)
+    )
+    return [r for r in rows if 0 < r["amount"] < _AMOUNT_LIMIT]
+
+
+class LocalMirror:
+    """
+    Writes RetailCRM documents through to the local tables.
+
+    Mirroring is best-effort: a failed write is logged and rolled back, and
+    never fails the request that triggered it.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def write_orders(self, raw_orders: List[Dict[str, Any]]) -> bool:
+        """
+        Upsert full order documents together with their customer and payments.
+        """
+        # Keyed by id: one upsert statement may not touch the same row twice.
+        customers: Dict[int, Dict[str, Any]] = {}
+        orders: Dict[int, Dict[str, Any]] = {}
+        payments: Dict[int, Dict[str, Any]] = {}
+        for raw in raw_orders:
+            if not mirrorable(raw):
+                if isinstance(raw.get("id"), int):
+                    logger.warning(
+                        "Not mirroring order %s without a valid createdAt/customer",
+                        raw["id"],
+                    )
+                continue
+            customers[raw["customer"]["id"]] = customer_row(raw["customer"])
+            orders[raw["id"]] = order_row(raw)
+            for row in payment_rows(raw):
+                payments[row["id"]] = row
+
+        try:
+            changed = await CustomerRepository(self.session).upsert_many(
+                list(customers.values())
+            )
+            await OrderRepository(self.session).upsert_many(list(orders.values()))
+            paid_at = await PaymentRepository(self.session).upsert_many(
+                list(payments.values())
+            )
+            await self.session.commit()
+        except SQLAlchemyError:
+            await self.session.rollback()
+            logger.exception("Failed to mirror %d order(s) locally", len(orders))
+            return False
+        if changed:
+            await invalidate_customer_lists()
+        await invalidate_closed_periods(paid_at)
+        return True
+
+    async def write_customers(self, raw_customers: List[Dict[str, Any]]) -> bool:
+        """
+        Upsert customer documents; the cached customer lists are dropped when
+        that changed any customer.
+        """
+        rows = {
+            raw["id"]: customer_row(raw)
+            for raw in raw_customers
+            if isinstance(raw.get("id"), int)
+        }
+        if not rows:
+            return True
+        try:
+            changed = await CustomerRepository(self.session).upsert_many(
+                list(rows.values())
+            )
+            await self.session.commit()
+        except SQLAlchemyError:
+            await self.session.rollback()
+            logger.exception("Failed to mirror %d customer(s) locally", len(rows))
+            # The documents may still differ from the cached pages.
+            await invalidate_customer_lists()
+            return False
+        if changed:
+            await invalidate_customer_lists()
+        return True
+
+    async def write_order(self, raw_order: Dict[str, Any]) -> bool:
+        return await self.write_orders([raw_order])
@@ -1,33 +1,99 @@
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import AbstractSet, Any, Dict, List, Optional
 
 from fastapi import HTTPException, status
 from httpx import HTTPError
 
-from app.schemas.orders import OrderCreate, OrderRead
+from app.core.config import settings
+from app.schemas.orders import OrderCreate, OrderRead, ProductItem
+from app.services.catalog import CatalogIndex, CatalogIndexes
+from app.services.records import OrderRecord, order_store
 from app.services.retailcrm_client import RetailCRMClient
 
 
+# Keys of a `/orders` list entry needed to map it without fetching the order.
+_SUMMARY_KEYS = {"number", "createdAt", "customer"}
+
+
 def generate_order_number() -> str:
     return f"ORD-{datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:6].upper()}"
 
 
 class OrderService:
-    def __init__(self, crm: RetailCRMClient) -> None:
+    def __init__(
+        self, crm: RetailCRMClient, catalogs: Optional[CatalogIndexes] = None
+    ) -> None:
         self.crm = crm
+        self.catalogs = catalogs
+
+    @staticmethod
+    def _catalog_item(item: ProductItem, catalog: CatalogIndex) -> Dict[str, Any]:
+        """
+        Validate and price an item that refers to a catalog offer.
+        """
+        ref = item.offer_id if item.offer_id is not None else item.sku
+        offer = (
+            catalog.get(item.offer_id)
+            if item.offer_id is not None
+            else catalog.get_by_sku(item.sku)
+        )
+        if offer is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown offer: {ref}"
+            )
+        if not offer.active:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Offer {offer.id} is not active",
+            )
+        if offer.price is None and item.price is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Offer {offer.id} has no catalog price; provide one",
+            )
+        if (
+            offer.price is not None
+            and item.price is not None
+            and item.price != offer.price
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Price {item.price} of offer {offer.id} does not match "
+                f"the catalog price {offer.price}",
+            )
+        return {
+            "offer": {"id": offer.id},
+            "quantity": item.quantity,
+            "initialPrice": offer.price if offer.price is not None else item.price,
+        }
+
+    async def _order_items(self, items: List[ProductItem]) -> List[Dict[str, Any]]:
+        catalog = None
+        if self.catalogs is not None and any(
+            i.offer_id is not None or i.sku is not None for i in items
+        ):
+            catalog = await self.catalogs.get()
+        order_items = []
+        for item in items:
+            if item.offer_id is None and item.sku is None:
+                order_items.append(
+                    {"quantity": item.quantity, "initialPrice": item.price}
+                )
+            elif catalog is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Catalog items are not supported here",
+                )
+            else:
+                order_items.append(self._catalog_item(item, catalog))
+        return order_items
 
     async def create(self, payload: OrderCreate) -> OrderRead:
         order_payload: Dict[str, Any] = {
             "number": generate_order_number(),
             "customer": {"id": payload.customer_id},
-            "items": [
-                {
-                    "quantity": item.quantity,
-                    "initialPrice": item.price,
-                }
-                for item in payload.items
-            ],
+            "items": await self._order_items(payload.items),
         }
         try:
             resp = await self.crm.create_order(order_payload)
@@ -53,11 +119,33 @@ class OrderService:
             )
 
         raw = full.get("order", {}) or {}
-        return self._map_raw(raw)
+        order = self._map_raw(raw)
+        self._remember(order)
+        return order
+
+    def _remember(self, order: OrderRead) -> None:
+        order_store().set_nowait(
+            self.crm.order_key(order.id),
+            OrderRecord.from_model(order),
+            settings.retailcrm_cache_ttl,
+        )
 
     async def list_by_customer(
-        self, customer_id: int, page: int = 1, limit: int = 20
+        self,
+        customer_id: int,
+        page: int = 1,
+        limit: int = 20,
+        fields: Optional[AbstractSet[str]] = None,
     ) -> List[OrderRead]:
+        """
+        Orders of a customer.
+
+        Orders mapped recently are served from the compact order store.
+        Without `items` among `fields` the others are mapped from the list
+        page itself: no per-order fetch and no item mapping.
+        """
+        with_items = fields is None or "items" in fields
+        store = order_store()
         try:
             summary = await self.crm.get_orders(
                 customer_id=customer_id, page=page, limit=limit
@@ -73,21 +161,30 @@ class OrderService:
             oid = entry.get("id")
             if not isinstance(oid, int):
                 continue
-            try:
-                full = await self.crm.get_order(oid)
-            except HTTPError:
+            record = store.get_nowait(self.crm.order_key(oid))
+            if record is not None:
+                orders.append(record.to_model())
                 continue
-
-            raw = full.get("order", {}) or {}
+            if with_items or not _SUMMARY_KEYS <= entry.keys():
+                try:
+                    full = await self.crm.get_order(oid)
+                except HTTPError:
+                    continue
+                raw = full.get("order", {}) or {}
+            else:
+                raw = entry
             try:
-                orders.append(self._map_raw(raw))
+                order = self._map_raw(raw, with_items)
             except HTTPException:
                 continue
+            if with_items:
+                self._remember(order)
+            orders.append(order)
 
         return orders
 
-    def _map_raw(self, raw: Dict[str, Any]) -> OrderRead:
-        items = raw.get("items", []) or []
+    def _map_raw(self, raw: Dict[str, Any], with_items: bool = True) -> OrderRead:
+        items = (raw.get("items", []) or []) if with_items else []
         mapped: Dict[str, Any] = {
             "id": raw.get("id", 0),
             "orderNumber": raw.get("number", ""),
@@ -95,6 +192,7 @@ class OrderService:
             "customerId": (raw.get("customer") or {}).get("id", 0),
             "items": [
                 {
+                    "offerId": (i.get("offer") or {}).get("id"),
                     "quantity": i.get("quantity", 0),
                     "price": i.get("initialPrice") or i.get("price") or 0,
                 }
@@ -3,14 +3,49 @@ from typing import Any, Dict, List
 
 from fastapi import HTTPException, status
 from httpx import HTTPError, HTTPStatusError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.schemas.payments import PaymentCreate, PaymentRead
+from app.db.models import Payment
+from app.db.repository import PaymentRepository
+from app.schemas.base import trusted
+from app.schemas.payments import OrderPayments, PaymentCreate, PaymentRead
+from app.services.mirror import LocalMirror, map_payment_status, payments_of
 from app.services.retailcrm_client import RetailCRMClient
 
 
 class PaymentService:
-    def __init__(self, crm: RetailCRMClient) -> None:
+    def __init__(self, crm: RetailCRMClient, session: AsyncSession) -> None:
         self.crm = crm
+        self.session = session
+
+    @staticmethod
+    def _from_row(payment: Payment) -> PaymentRead:
+        return trusted(
+            PaymentRead,
+            id=payment.id,
+            order_id=payment.order_id,
+            amount=float(payment.amount),
+            comment=payment.comment,
+            created_at=payment.paid_at,
+            status=payment.status,
+            method=payment.method,
+        )
+
+    async def list_by_order(self, order_id: int) -> OrderPayments:
+        """
+        Payments of an order from the local ledger, without calling RetailCRM.
+        """
+        repo = PaymentRepository(self.session)
+        payments = await repo.list_by_order(order_id)
+        totals = await repo.totals_by_order(order_id)
+        return trusted(
+            OrderPayments,
+            order_id=order_id,
+            payments=[self._from_row(p) for p in payments],
+            count=totals.count,
+            total_amount=float(totals.total_amount),
+            paid_amount=float(totals.paid_amount),
+        )
 
     async def create(self, order_id: int, payload: PaymentCreate) -> PaymentRead:
         try:
@@ -65,14 +100,10 @@ class PaymentService:
                 detail=f"Failed to fetch order after payment: {e}",
             )
 
-        payments_block = (full.get("order", {}) or {}).get("payments", {})
-        payments_list: List[Dict[str, Any]]
-        if isinstance(payments_block, dict):
-            payments_list = list(payments_block.values())
-        else:
-            payments_list = payments_block
+        raw_order = full.get("order", {}) or {}
+        await LocalMirror(self.session).write_order(raw_order)
 
-        raw = next((p for p in payments_list if p.get("id") == pay_id), None)
+        raw = next((p for p in payments_of(raw_order) if p.get("id") == pay_id), None)
         if not isinstance(raw, dict):
             raise HTTPException(
                 status.HTTP_502_BAD_GATEWAY,
@@ -86,6 +117,7 @@ class PaymentService:
             "amount": raw.get("sum") or raw.get("amount", 0),
             "comment": raw.get("comment"),
             "createdAt": ts,
+            "status": map_payment_status(raw.get("status")),
         }
 
         try:
@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import logging
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from httpx import HTTPError
+
+from app.core.metrics import registry
+from app.core.tenant import current_tenant, use_tenant
+from app.db.database import Database
+from app.services.mirror import LocalMirror
+from app.services.retailcrm_client import RetailCRMClients
+
+logger = logging.getLogger(__name__)
+
+prewarm_refreshes = registry.counter(
+    "prewarm_refreshes_total", "Hot customers refreshed by the pre-warmer, by result."
+)
+
+
+class CountMinSketch:
+    """
+    Approximate counts of arbitrary keys in `depth` rows of `width` counters.
+
+    Estimates never under-count; with the default size the over-count is a
+    small fraction of the total regardless of how many distinct keys occur.
+    """
+
+    def __init__(self, width: int = 4096, depth: int = 4) -> None:
+        self.width = width
+        self.depth = depth
+        self._rows: List[List[float]] = [[0.0] * width for _ in range(depth)]
+
+    def _cells(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=8 * self.depth).digest()
+        return [
+            int.from_bytes(digest[8 * i : 8 * i + 8], "little") % self.width
+            for i in range(self.depth)
+        ]
+
+    def add(self, key: str, count: float = 1.0) -> float:
+        """
+        Count `key` and return its new estimate.
+        """
+        estimate = None
+        for row, cell in zip(self._rows, self._cells(key)):
+            row[cell] += count
+            estimate = row[cell] if estimate is None else min(estimate, row[cell])
+        return estimate or 0.0
+
+    def estimate(self, key: str) -> float:
+        return min(row[cell] for row, cell in zip(self._rows, self._cells(key)))
+
+    def decay(self, factor: float = 0.5) -> None:
+        for row in self._rows:
+            for i, value in enumerate(row):
+                if value:
+                    row[i] = value * factor
+
+
+class HotKeys:
+    """
+    The `k` most frequently recorded keys, by count-min estimate.
+
+    `decay` ages every count so that the ranking follows recent traffic.
+    """
+
+    def __init__(self, k: int, width: int = 4096, depth: int = 4) -> None:
+        self.k = k
+        self.sketch = CountMinSketch(width, depth)
+        self._top: Dict[Hashable, float] = {}
+
+    def record(self, key: Hashable) -> None:
+        estimate = self.sketch.add(repr(key))
+        if key in self._top or len(self._top) < self.k:
+            self._top[key] = estimate
+            return
+        coldest = min(self._top, key=self._top.__getitem__)
+        if estimate > self._top[coldest]:
+            del self._top[coldest]
+            self._top[key] = estimate
+
+    def top(self) -> List[Hashable]:
+        return sorted(self._top, key=self._top.__getitem__, reverse=True)
+
+    def decay(self, factor: float = 0.5) -> None:
+        self.sketch.decay(factor)
+        for key in self._top:
+            self._top[key] *= factor
+
+
+class Prewarmer:
+    """
+    Keeps the order lists of the hottest customers warm.
+
+    `GET /orders/customer/{id}` records every lookup. Every `interval`
+    seconds the top customers' first order page is re-fetched into the
+    cache, its orders are primed as `get_order` responses and mirrored into
+    the local tables. Each tenant spends at most `budget_share` of its
+    rate limit per interval, and only while its bucket holds more than the
+    remaining share of its burst, so request traffic keeps priority.
+    Tenants without a rate limit are not capped.
+    """
+
+    def __init__(
+        self,
+        clients: RetailCRMClients,
+        database: Database,
+        top_k: int = 50,
+        interval: float = 20.0,
+        budget_share: float = 0.2,
+        sketch_width: int = 4096,
+        sketch_depth: int = 4,
+    ) -> None:
+        self._clients = clients
+        self._db = database
+        self.interval = interval
+        self.budget_share = budget_share
+        self.hot = HotKeys(top_k, sketch_width, sketch_depth)
+
+    def record(self, customer_id: int) -> None:
+        self.hot.record((current_tenant(), customer_id))
+
+    async def run_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.warm()
+            except Exception:
+                logger.exception("Cache pre-warming failed")
+            self.hot.decay()
+
+    def _budgets(self, tenants: List[str]) -> Dict[str, Optional[Tuple[float, float]]]:
+        """
+        Per tenant, the requests allowed this interval and the tokens to
+        leave in the bucket; None for tenants without a rate limit.
+        """
+        budgets: Dict[str, Optional[Tuple[float, float]]] = {}
+        for tenant in tenants:
+            bucket = self._clients.get(tenant).rate_limit
+            if bucket.rate <= 0:
+                budgets[tenant] = None
+                continue
+            budgets[tenant] = (
+                self.budget_share * bucket.rate * self.interval,
+                (1 - self.budget_share) * bucket.burst,
+            )
+        return budgets
+
+    async def warm(self) -> int:
+        """
+        Refresh as many hot customers as the budget allows; returns how many.
+        """
+        hot: List[Tuple[str, int]] = self.hot.top()
+        budgets = self._budgets(sorted({tenant for tenant, _ in hot}))
+        spent: Dict[str, int] = {}
+        refreshed = 0
+        for tenant, customer_id in hot:
+            client = self._clients.get(tenant)
+            budget = budgets[tenant]
+            if budget is not None and (
+                spent.get(tenant, 0) + 1 > budget[0]
+                or client.rate_limit.available < budget[1] + 1
+            ):
+                prewarm_refreshes.inc(result="over_budget")
+                continue
+            spent[tenant] = spent.get(tenant, 0) + 1
+            with use_tenant(tenant):
+                try:
+                    data = await client.get_orders(customer_id, refresh=True)
+                except HTTPError as exc:
+                    prewarm_refreshes.inc(result="failed")
+                    logger.warning(
+                        "Pre-warming orders of customer %s/%s failed: %s",
+                        tenant,
+                        customer_id,
+                        exc,
+                    )
+                    continue
+                orders = [
+                    o
+                    for o in data.get("orders", [])
+                    if isinstance(o, dict) and isinstance(o.get("id"), int)
+                ]
+                for order in orders:
+                    await client.prime_order(order)
+                if orders:
+                    async with self._db.session_factory() as session:
+                        await LocalMirror(session).write_orders(orders)
+            prewarm_refreshes.inc(result="refreshed")
+            refreshed += 1
+        return refreshed
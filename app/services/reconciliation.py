@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.db.database import Database
+from app.db.repository import OrderRepository, PaymentRepository
+from app.services.analytics_service import invalidate_closed_periods
+from app.services.mirror import (
+    LocalMirror,
+    mirrorable,
+    order_row,
+    payment_rows,
+    payments_of,
+)
+from app.services.retailcrm_client import RetailCRMClient
+
+logger = logging.getLogger(__name__)
+
+# Python twin of `OrderRepository.DIGEST_TS_FORMAT`.
+_TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def order_digest(raw: Dict[str, Any]) -> str:
+    """
+    md5 of an upstream order in the form `OrderRepository` hashes local rows.
+    """
+    order = order_row(raw)
+    payments = sorted(payment_rows(raw), key=lambda p: p["id"])
+    payment_text = ";".join(
+        ",".join(
+            (
+                str(p["id"]),
+                f"{p['amount']:.2f}",
+                p["method"].name,
+                p["status"].name,
+                p["paid_at"].strftime(_TS_FORMAT),
+                p["comment"] or "",
+            )
+        )
+        for p in payments
+    )
+    text = "|".join(
+        (
+            str(order["id"]),
+            order["order_number"],
+            order["created_at"].strftime(_TS_FORMAT),
+            str(order["customer_id"]),
+            payment_text,
+        )
+    )
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+def chunk_digest(digests: Dict[int, str]) -> str:
+    return hashlib.md5(
+        ",".join(digests[i] for i in sorted(digests)).encode()
+    ).hexdigest()
+
+
+@dataclass
+class ReconciliationReport:
+    pages: int = 0
+    orders_seen: int = 0
+    chunks_skipped: int = 0
+    chunks_diverged: int = 0
+    orders_missing: int = 0
+    orders_changed: int = 0
+    orders_local_only: int = 0
+    orders_repaired: int = 0
+    payments_pruned: int = 0
+    failed_pages: List[int] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """
+        Upstream orders compared per second.
+        """
+        return self.orders_seen / self.elapsed if self.elapsed else 0.0
+
+
+class Reconciler:
+    """
+    Detects and repairs drift between RetailCRM orders and the local mirror.
+
+    Every upstream page is one chunk. Its orders are hashed the same way
+    `OrderRepository.chunk_digest` hashes the local rows of the same ids,
+    so a chunk that matches costs one upstream page and one aggregate
+    query. Only diverged chunks are compared order by order, and
+    the differing orders are bulk upserted through `LocalMirror`.
+    """
+
+    def __init__(
+        self,
+        crm: RetailCRMClient,
+        database: Database,
+        page_size: int,
+        concurrency: int,
+        dry_run: bool = False,
+    ) -> None:
+        self._crm = crm
+        self._db = database
+        self._page_size = page_size
+        self._concurrency = max(1, concurrency)
+        self._dry_run = dry_run
+        self.report = ReconciliationReport()
+        # Upstream orders that exist locally, for `orders_local_only`.
+        self._matched = 0
+
+    async def run(self) -> ReconciliationReport:
+        started = time.monotonic()
+        # Local orders not matched by any upstream one are local only;
+        # counted before the repairs add the missing ones.
+        async with self._db.session_factory() as session:
+            local_total = await OrderRepository(session).count()
+        first = await self._crm.list_orders(page=1, limit=self._page_size)
+        total_pages = (first.get("pagination") or {}).get("totalPageCount") or 1
+        await self._reconcile_page(1, first)
+
+        pages: Iterator[int] = iter(range(2, total_pages + 1))
+
+        async def worker() -> None:
+            # Workers share one iterator, so at most `concurrency` pages are
+            # in flight at any time.
+            for page in pages:
+                try:
+                    data = await self._crm.list_orders(page=page, limit=self._page_size)
+                    await self._reconcile_page(page, data)
+                except Exception:
+                    logger.exception("Reconciliation of page %d failed", page)
+                    self.report.failed_pages.append(page)
+
+        await asyncio.gather(*(worker() for _ in range(self._concurrency)))
+        if not self.report.failed_pages:
+            self.report.orders_local_only = max(0, local_total - self._matched)
+        self.report.elapsed = time.monotonic() - started
+        return self.report
+
+    async def _reconcile_page(self, page: int, data: Dict[str, Any]) -> None:
+        upstream = {raw["id"]: raw for raw in data.get("orders", []) if mirrorable(raw)}
+        self.report.pages += 1
+        self.report.orders_seen += len(upstream)
+        if not upstream:
+            return
+        digests = {order_id: order_digest(raw) for order_id, raw in upstream.items()}
+
+        # Pages are not id-contiguous, so a chunk is exactly its upstream ids.
+        async with self._db.session_factory() as session:
+            orders = OrderRepository(session)
+            if await orders.chunk_digest(upstream.keys()) == chunk_digest(digests):
+                self.report.chunks_skipped += 1
+                self._matched += len(upstream)
+                return
+            self.report.chunks_diverged += 1
+
+            local = await orders.row_digests(upstream.keys())
+            self._matched += len(local)
+            stale = [i for i, digest in digests.items() if local.get(i) != digest]
+            self.report.orders_missing += sum(1 for i in stale if i not in local)
+            self.report.orders_changed += sum(1 for i in stale if i in local)
+            if self._dry_run or not stale:
+                return
+
+            pruned = await self._prune_payments(session, [upstream[i] for i in stale])
+            if await LocalMirror(session).write_orders([upstream[i] for i in stale]):
+                self.report.orders_repaired += len(stale)
+                self.report.payments_pruned += len(pruned)
+                await invalidate_closed_periods(pruned)
+        # Workers may still serve the outdated documents of these orders.
+        for order_id in stale:
+            await self._crm.forget_order(order_id)
+
+    @staticmethod
+    async def _prune_payments(
+        session, raw_orders: List[Dict[str, Any]]
+    ) -> List[datetime]:
+        """
+        Drop local payments that no longer exist upstream (committed together
+        with the upsert by `LocalMirror`); returns their `paid_at`.
+        """
+        keep: List[int] = []
+        for raw in raw_orders:
+            keep.extend(
+                p["id"] for p in payments_of(raw) if isinstance(p.get("id"), int)
+            )
+        try:
+            return await PaymentRepository(session).delete_missing(
+                [raw["id"] for raw in raw_orders], keep
+            )
+        except SQLAlchemyError:
+            await session.rollback()
+            logger.exception("Failed to prune payments of %d order(s)", len(raw_orders))
+            return []
+
+
+def format_report(report: ReconciliationReport) -> List[str]:
+    lines = [
+        ("pages", report.pages),
+        ("orders compared", report.orders_seen),
+        ("chunks unchanged", report.chunks_skipped),
+        ("chunks diverged", report.chunks_diverged),
+        ("orders missing locally", report.orders_missing),
+        ("orders changed", report.orders_changed),
+        ("orders only local", report.orders_local_only),
+        ("orders repaired", report.orders_repaired),
+        ("payments pruned", report.payments_pruned),
+        ("failed pages", report.failed_pages or "-"),
+        ("elapsed", f"{report.elapsed:.1f}s"),
+        ("throughput", f"{report.throughput:.0f} orders/s"),
+    ]
+    return [f"{label}: {value}" for label, value in lines]
@@ -0,0 +1,123 @@
+import sys
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Optional, Tuple
+
+from app.cache import TieredCache, get_cache
+from app.cache.memory import MemoryCache
+from app.core.config import settings
+from app.schemas.base import trusted
+from app.schemas.customers import CustomerRead
+from app.schemas.orders import OrderRead, ProductItem
+
+# (offer_id, quantity, price) of one order line.
+ItemRecord = Tuple[Optional[int], int, str]
+
+# (id, first_name, last_name, email, phone, registered_at) of one customer;
+# a JSON array, so it also fits the shared cache.
+CustomerRow = Tuple[int, str, Optional[str], str, Optional[str], str]
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+
+class OrderRecord:
+    """
+    Compact form of a mapped `OrderRead`: only the mapped fields, lines as
+    tuples, and repeated strings (prices) interned.
+    """
+
+    __slots__ = ("id", "order_number", "created_at", "customer_id", "items")
+
+    def __init__(
+        self,
+        id: int,
+        order_number: str,
+        created_at: datetime,
+        customer_id: int,
+        items: Tuple[ItemRecord, ...],
+    ) -> None:
+        self.id = id
+        self.order_number = order_number
+        self.created_at = created_at
+        self.customer_id = customer_id
+        self.items = items
+
+    @classmethod
+    def from_model(cls, order: OrderRead) -> "OrderRecord":
+        return cls(
+            order.id,
+            order.order_number,
+            order.created_at,
+            order.customer_id,
+            tuple(
+                (item.offer_id, item.quantity, sys.intern(str(item.price)))
+                for item in order.items
+            ),
+        )
+
+    def to_model(self) -> OrderRead:
+        return trusted(
+            OrderRead,
+            id=self.id,
+            order_number=self.order_number,
+            created_at=self.created_at,
+            customer_id=self.customer_id,
+            items=[
+                trusted(
+                    ProductItem,
+                    offer_id=offer_id,
+                    quantity=quantity,
+                    price=Decimal(price),
+                )
+                for offer_id, quantity, price in self.items
+            ],
+        )
+
+
+def pack_customer(customer: CustomerRead) -> CustomerRow:
+    return (
+        customer.id,
+        sys.intern(customer.first_name),
+        _intern(customer.last_name),
+        customer.email,
+        customer.phone,
+        customer.registered_at.isoformat(),
+    )
+
+
+def unpack_customer(row: Any) -> CustomerRead:
+    id, first_name, last_name, email, phone, registered_at = row
+    return trusted(
+        CustomerRead,
+        id=id,
+        first_name=first_name,
+        last_name=last_name,
+        email=email,
+        phone=phone,
+        registered_at=datetime.fromisoformat(registered_at),
+    )
+
+
+_order_store: Optional[MemoryCache] = None
+
+
+def order_store() -> MemoryCache:
+    """
+    The worker's byte-budgeted store of `OrderRecord`s, keyed by the
+    `get_order` cache key (`RetailCRMClient.order_key`) of the document they
+    were mapped from, so that invalidating that key (on any worker) drops
+    the record too.
+    """
+    global _order_store
+    if _order_store is None:
+        _order_store = MemoryCache(
+            max_entries=sys.maxsize,
+            max_bytes=settings.order_store_max_bytes,
+            name="orders",
+        )
+        cache = get_cache()
+        if isinstance(cache, TieredCache):
+            cache.followers.append(_order_store)
+    return _order_store
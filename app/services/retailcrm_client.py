@@ -1,19 +1,114 @@
 import json
 from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
 
 import httpx
 
+from app.cache import CacheBackend, get_cache
+from app.core import deadline
 from app.core.config import settings
+from app.core.metrics import registry
+from app.core.rate_limit import TokenBucket
+from app.core.tenant import current_tenant
+from app.services.records import order_store
+from app.services.singleflight import SingleFlight
+
+CACHE_PREFIX = "crm:"
+
+cache_requests = registry.counter(
+    "retailcrm_cache_requests_total", "RetailCRM GET cache lookups by result."
+)
+
+# Shared by every client instance of the worker so that identical GETs issued
+# by concurrent requests reach RetailCRM only once.
+_inflight = SingleFlight("retailcrm")
 
 
 class RetailCRMClient:
-    def __init__(self) -> None:
+    """
+    Client of one tenant's RetailCRM account.
+
+    Every tenant gets its own connection pool, rate-limit bucket and cache
+    namespace (`crm:<tenant>:GET:`).
+    """
+
+    def __init__(
+        self, cache: Optional[CacheBackend] = None, tenant: Optional[str] = None
+    ) -> None:
+        self.tenant = tenant or settings.default_tenant
+        config = settings.tenant_configs[self.tenant]
         self._client = httpx.AsyncClient(
-            base_url=f"{settings.retailcrm_base_url}/api/v5",
-            headers={"X-API-KEY": settings.retailcrm_api_key},
-            timeout=10.0,
+            base_url=f"{config.base_url}/api/v5",
+            headers={"X-API-KEY": config.api_key},
+            timeout=settings.retailcrm_timeout,
+        )
+        self._site = config.site
+        self._cache = cache if cache is not None else get_cache()
+        self._prefix = f"{CACHE_PREFIX}{self.tenant}:GET:"
+        self.rate_limit = TokenBucket(
+            config.rate_limit, config.rate_burst, name=f"retailcrm:{self.tenant}"
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def _request(
+        self, method: str, path: str, detached: bool = False, **kwargs: Any
+    ) -> httpx.Response:
+        """
+        Send one request within what is left of the request deadline.
+
+        `detached` requests (shared single-flight fetches) wait for a token
+        and for the response without the deadline of the request that
+        started them, using the full client timeout; each of their callers
+        bounds its own wait with `deadline.bounded`.
+        """
+        if detached:
+            with deadline.unbounded():
+                await self.rate_limit.acquire()
+                return await self._client.request(method, path, **kwargs)
+        await self.rate_limit.acquire()
+        timeout = deadline.timeout(settings.retailcrm_timeout)
+        try:
+            return await self._client.request(method, path, timeout=timeout, **kwargs)
+        except httpx.TimeoutException as exc:
+            if deadline.expired():
+                raise deadline.DeadlineExceeded(
+                    f"Request deadline exceeded waiting for RetailCRM {path}"
+                ) from exc
+            raise
+
+    def _cache_key(self, path: str, params: Dict[str, Any]) -> str:
+        return f"{self._prefix}{path}?{urlencode(sorted(params.items()))}"
+
+    async def _get(
+        self, path: str, params: Dict[str, Any], ttl: float, refresh: bool = False
+    ) -> Dict[str, Any]:
+        """
+        GET a JSON document, served from the shared cache when possible.
+
+        `refresh` skips the cache lookup and re-caches a fresh copy.
+        """
+        key = self._cache_key(path, params)
+        if not refresh:
+            cached = await self._cache.get(key)
+            if cached is not None:
+                cache_requests.inc(result="hit")
+                return cached
+            cache_requests.inc(result="miss")
+
+        async def fetch() -> Dict[str, Any]:
+            # Shared by callers with different deadlines, so not bound to
+            # the leader's; every caller stops waiting at its own deadline.
+            resp = await self._request("GET", path, detached=True, params=params)
+            resp.raise_for_status()
+            data = resp.json()
+            await self._cache.set(key, data, ttl)
+            return data
+
+        return await deadline.bounded(
+            _inflight.do(f"GET {self._client.base_url}{key}", fetch)
         )
-        self._site = settings.retailcrm_site
 
     async def get_customers(
         self,
@@ -38,30 +133,29 @@ class RetailCRMClient:
         if registered_to:
             params["filter[createdAtTo]"] = registered_to
 
-        resp = await self._client.get("/customers", params=params)
-        resp.raise_for_status()
-        return resp.json()
+        return await self._get("/customers", params, settings.retailcrm_cache_ttl)
 
     async def create_customer(self, data: Dict[str, Any]) -> Dict[str, Any]:
         form = {"site": self._site, "customer": json.dumps(data, default=str)}
-        resp = await self._client.post(
+        resp = await self._request(
+            "POST",
             "/customers/create",
             data=form,
             headers={"Content-Type": "application/x-www-form-urlencoded"},
         )
         resp.raise_for_status()
+        await self._cache.delete_prefix(f"{self._prefix}/customers?")
         return resp.json()
 
     async def get_customer(self, customer_id: int) -> Dict[str, Any]:
-        resp = await self._client.get(
+        return await self._get(
             f"/customers/{customer_id}",
-            params={"by": "id", "site": self._site},
+            {"by": "id", "site": self._site},
+            settings.retailcrm_cache_ttl,
         )
-        resp.raise_for_status()
-        return resp.json()
 
     async def get_orders(
-        self, customer_id: int, page: int = 1, limit: int = 20
+        self, customer_id: int, page: int = 1, limit: int = 20, refresh: bool = False
     ) -> Dict[str, Any]:
         params = {
             "site": self._site,
@@ -69,38 +163,89 @@ class RetailCRMClient:
             "page": page,
             "limit": limit,
         }
-        resp = await self._client.get("/orders", params=params)
+        return await self._get(
+            "/orders", params, settings.retailcrm_cache_ttl, refresh=refresh
+        )
+
+    async def list_orders(self, page: int = 1, limit: int = 100) -> Dict[str, Any]:
+        """
+        One page of all orders of the site, bypassing the cache.
+        """
+        resp = await self._request(
+            "GET", "/orders", params={"site": self._site, "page": page, "limit": limit}
+        )
         resp.raise_for_status()
         return resp.json()
 
     async def create_order(self, data: Dict[str, Any]) -> Dict[str, Any]:
         form = {"site": self._site, "order": json.dumps(data, default=str)}
-        resp = await self._client.post(
+        resp = await self._request(
+            "POST",
             "/orders/create",
             data=form,
             headers={"Content-Type": "application/x-www-form-urlencoded"},
         )
         resp.raise_for_status()
+        await self._cache.delete_prefix(f"{self._prefix}/orders?")
         return resp.json()
 
+    def order_key(self, order_id: int) -> str:
+        """
+        Cache key of the `get_order` document (and of its mapped record in
+        `records.order_store`).
+        """
+        return self._cache_key(f"/orders/{order_id}", {"by": "id", "site": self._site})
+
+    async def forget_order(self, order_id: int) -> None:
+        """
+        Drop the cached order document and its mapped record, on every worker.
+        """
+        key = self.order_key(order_id)
+        order_store().delete_nowait(key)
+        await self._cache.delete(key)
+
     async def get_order(self, order_id: int) -> Dict[str, Any]:
-        resp = await self._client.get(
-            f"/orders/{order_id}", params={"by": "id", "site": self._site}
+        return await self._get(
+            f"/orders/{order_id}",
+            {"by": "id", "site": self._site},
+            settings.retailcrm_cache_ttl,
         )
-        resp.raise_for_status()
-        return resp.json()
 
-    async def get_products(self) -> List[Dict[str, Any]]:
-        resp = await self._client.get("/store/products", params={"site": self._site})
+    async def prime_order(self, raw_order: Dict[str, Any]) -> None:
+        """
+        Cache a full order document (e.g. from an `/orders` page) as the
+        `get_order` response, saving the per-order request.
+
+        A document that differs from the cached one is first invalidated on
+        every worker, so no mapped record of the old version survives.
+        """
+        key = self.order_key(raw_order["id"])
+        document = {"success": True, "order": raw_order}
+        cached = await self._cache.get(key)
+        if cached is not None and cached != document:
+            await self._cache.delete(key)
+        order_store().delete_nowait(key)
+        await self._cache.set(key, document, settings.retailcrm_cache_ttl)
+
+    async def list_products(self, page: int = 1, limit: int = 100) -> Dict[str, Any]:
+        """
+        One page of the product catalog (with offers), bypassing the cache.
+        """
+        resp = await self._request(
+            "GET",
+            "/store/products",
+            params={"filter[sites][]": self._site, "page": page, "limit": limit},
+        )
         resp.raise_for_status()
-        return resp.json().get("products", [])
+        return resp.json()
 
     async def get_payment_types(self) -> List[str]:
-        resp = await self._client.get(
-            "/reference/payment-types", params={"site": self._site}
+        resp = await self._get(
+            "/reference/payment-types",
+            {"site": self._site},
+            settings.retailcrm_reference_cache_ttl,
         )
-        resp.raise_for_status()
-        data = resp.json().get("paymentTypes", {})
+        data = resp.get("paymentTypes", {})
         if isinstance(data, dict):
             return [
                 info.get("code") for info in data.values() if isinstance(info, dict)
@@ -111,7 +256,8 @@ class RetailCRMClient:
 
     async def create_payment(self, data: Dict[str, Any]) -> Dict[str, Any]:
         form = {"site": self._site, "payment": json.dumps(data, default=str)}
-        resp = await self._client.post(
+        resp = await self._request(
+            "POST",
             "/orders/payments/create",
             data=form,
             headers={"Content-Type": "application/x-www-form-urlencoded"},
@@ -127,4 +273,30 @@ class RetailCRMClient:
             raise httpx.HTTPStatusError(
                 f"{resp.status_code}: {body}", request=err.request, response=resp
             )
+        order_id = (data.get("order") or {}).get("id")
+        if order_id is not None:
+            await self.forget_order(order_id)
+        await self._cache.delete_prefix(f"{self._prefix}/orders?")
         return resp.json()
+
+
+class RetailCRMClients:
+    """
+    The worker's RetailCRM clients, one per tenant, created on first use.
+    """
+
+    def __init__(self, cache: Optional[CacheBackend] = None) -> None:
+        self._cache = cache
+        self._clients: Dict[str, RetailCRMClient] = {}
+
+    def get(self, tenant: Optional[str] = None) -> RetailCRMClient:
+        tenant = tenant or current_tenant()
+        client = self._clients.get(tenant)
+        if client is None:
+            client = self._clients[tenant] = RetailCRMClient(self._cache, tenant)
+        return client
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
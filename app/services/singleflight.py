@@ -0,0 +1,67 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, TypeVar
+
+from app.core.metrics import registry
+
+T = TypeVar("T")
+
+singleflight_calls = registry.counter(
+    "singleflight_calls_total",
+    "Coalesced calls by group and role (leader executes, follower shares).",
+)
+
+
+class _Call(Generic[T]):
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[T]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+
+    The first caller starts `fn()` as a task; callers arriving while it runs
+    await the same task and receive its result or exception. A cancelled
+    caller only stops waiting: the shared task keeps running for the others
+    and is cancelled once nobody is waiting for it any more.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: Dict[str, _Call[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            singleflight_calls.inc(group=self.name, role="leader")
+        else:
+            singleflight_calls.inc(group=self.name, role="follower")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Forgotten first: a caller arriving before the done-callback
+                # runs must start a new call, not join the cancelled one.
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                call.task.cancel()
+
+    def _forget(self, key: str, call: _Call[Any]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.task.cancelled():
+            # Retrieve the exception so an abandoned failure is not reported
+            # as "never retrieved".
+            call.task.exception()
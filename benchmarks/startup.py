@@ -0,0 +1,73 @@
+"""
+Startup latency benchmark.
+
+Measures, in fresh interpreters, the time to import `app.main`, to build the
+application and to run its lifespan startup up to the first served request.
+
+    python benchmarks/startup.py [--runs 10] [--json]
+
+Lifespan startup needs the usual environment (`.env`); with the database
+unreachable it still completes, as the shared cache tier degrades to misses.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+application = app.main.create_app()
+t2 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(application) as client:
+    client.get("/openapi.json")
+    t3 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "create_app": t2 - t1, "first_request": t3 - t2}))
+"""
+
+
+def run_once() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="Print raw JSON.")
+    args = parser.parse_args()
+
+    samples = [run_once() for _ in range(args.runs)]
+    report = {
+        phase: {
+            "median_ms": statistics.median(s[phase] for s in samples) * 1000,
+            "max_ms": max(s[phase] for s in samples) * 1000,
+        }
+        for phase in samples[0]
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for phase, stats in report.items():
+        print(
+            f"{phase:<14} median {stats['median_ms']:8.1f} ms"
+            f"   max {stats['max_ms']:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Response-model construction benchmark.
+
+Builds pages of 100, 1k and 10k `CustomerRead` / `OrderRead` / `PaymentRead`
+from row-like objects, once through full validation and once through the
+trusted path (`app.schemas.base.trusted`), and serializes them as the list
+endpoints do.
+
+    python benchmarks/trusted_models.py [--runs 5] [--sizes 100 1000 10000] [--json]
+
+Reads settings like the application does (`.env`); no services are needed.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.db.models import PaymentMethod, PaymentStatus  # noqa: E402
+from app.schemas.base import trusted  # noqa: E402
+from app.schemas.customers import CustomerRead  # noqa: E402
+from app.schemas.orders import OrderRead, ProductItem  # noqa: E402
+from app.schemas.payments import PaymentRead  # noqa: E402
+from app.services.customer_service import CustomerService  # noqa: E402
+from app.services.payment_service import PaymentService  # noqa: E402
+from app.services.records import OrderRecord  # noqa: E402
+
+START = datetime(2025, 1, 1, 9, 30)
+
+
+def customer_rows(n: int) -> List[Any]:
+    return [
+        SimpleNamespace(
+            id=i,
+            first_name="Ann",
+            last_name="Doe",
+            email=f"user{i}@example.com",
+            phone="+15551234567",
+            registered_at=START + timedelta(minutes=i),
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def payment_rows(n: int) -> List[Any]:
+    return [
+        SimpleNamespace(
+            id=i,
+            order_id=i // 3 + 1,
+            amount=Decimal("19.90"),
+            comment=None,
+            paid_at=START + timedelta(minutes=i),
+            status=PaymentStatus.COMPLETED,
+            method=PaymentMethod.CREDIT_CARD,
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def order_records(n: int) -> List[OrderRecord]:
+    return [
+        OrderRecord(
+            i,
+            f"ORD-{i:08d}",
+            START + timedelta(minutes=i),
+            i // 5 + 1,
+            tuple((100 + j, 1 + j, "9.99") for j in range(3)),
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def validated_customer(row: Any) -> CustomerRead:
+    return CustomerRead.model_validate(
+        {
+            "id": row.id,
+            "first_name": row.first_name,
+            "last_name": row.last_name,
+            "email": row.email,
+            "phone": row.phone,
+            "registered_at": row.registered_at,
+        }
+    )
+
+
+def validated_payment(row: Any) -> PaymentRead:
+    return PaymentRead(
+        id=row.id,
+        order_id=row.order_id,
+        amount=float(row.amount),
+        comment=row.comment,
+        created_at=row.paid_at,
+        status=row.status,
+        method=row.method,
+    )
+
+
+def validated_order(record: OrderRecord) -> OrderRead:
+    return OrderRead.model_validate(
+        {
+            "id": record.id,
+            "orderNumber": record.order_number,
+            "createdAt": record.created_at,
+            "customerId": record.customer_id,
+            "items": [
+                {"offerId": offer_id, "quantity": quantity, "price": Decimal(price)}
+                for offer_id, quantity, price in record.items
+            ],
+        }
+    )
+
+
+CASES: Dict[str, tuple] = {
+    "customers": (
+        customer_rows,
+        validated_customer,
+        CustomerService._from_row,
+        TypeAdapter(List[CustomerRead]),
+    ),
+    "orders": (
+        order_records,
+        validated_order,
+        OrderRecord.to_model,
+        TypeAdapter(List[OrderRead]),
+    ),
+    "payments": (
+        payment_rows,
+        validated_payment,
+        PaymentService._from_row,
+        TypeAdapter(List[PaymentRead]),
+    ),
+}
+
+
+def timed(fn: Callable[[], Any], runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--json", action="store_true", help="Print raw JSON.")
+    args = parser.parse_args()
+
+    # Sanity check: both paths produce the same response body.
+    assert trusted(ProductItem, quantity=1, price=Decimal(1)).price == Decimal(1)
+
+    report: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for name, (make, validated, fast, adapter) in CASES.items():
+        for size in args.sizes:
+            rows = make(size)
+            slow_models = [validated(r) for r in rows]
+            fast_models = [fast(r) for r in rows]
+            body = adapter.dump_json(slow_models, by_alias=True)
+            assert adapter.dump_json(fast_models, by_alias=True) == body, name
+            report.setdefault(name, {})[str(size)] = {
+                "validated_ms": timed(lambda: [validated(r) for r in rows], args.runs)
+                * 1000,
+                "trusted_ms": timed(lambda: [fast(r) for r in rows], args.runs) * 1000,
+                "serialize_ms": timed(
+                    lambda: adapter.dump_json(fast_models, by_alias=True), args.runs
+                )
+                * 1000,
+            }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{'model':<10}{'rows':>7}{'validated':>12}{'trusted':>10}{'serialize':>11}")
+    for name, sizes in report.items():
+        for size, stats in sizes.items():
+            print(
+                f"{name:<10}{size:>7}"
+                f"{stats['validated_ms']:>9.2f} ms"
+                f"{stats['trusted_ms']:>7.2f} ms"
+                f"{stats['serialize_ms']:>8.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()